@@ -22,7 +22,19 @@
 
 #include <cstring>
 #include <cwchar>
+#include <algorithm>
+#include <atomic>
 #include <climits>
+#include <cmath>
+#include <cstddef>
+#include <exception>
+#include <fstream>
+#include <functional>
+#include <limits>
+#include <queue>
+#include <thread>
+#include <utility>
+#include <vector>
 
 using std::wcsstr;
 using std::wcscmp;
@@ -420,4 +432,2912 @@ void shortest_path_n(int orig_node,
     }
 }
 
-#endif
\ No newline at end of file
+#endif
+
+/**
+ * @brief a compact and persistent representation of the network topology
+ *
+ * It is built only once from the arrays used by shortest_path_n() and kept in
+ * the engine until delete_graph() is called. Outgoing links of each node are
+ * laid out contiguously in the order of sorted_links (i.e., forward star),
+ * where each link only keeps what is needed for relaxation. Only links open to
+ * mode are kept, i.e., any bit of mode is set in their allowed uses. A graph is
+ * therefore built for each mode.
+ *
+ * The incoming links of each node are laid out in the same way (i.e., backward
+ * star) for searches from the destination, where to_node of each link is the
+ * upstream node.
+ */
+class Graph {
+public:
+    struct Link {
+        int to_node;
+        int link_no;
+        // link cost when the graph was built. It is used if no link costs are
+        // provided by the caller.
+        double cost;
+    };
+
+    Graph(int node_size_,
+          int link_size_,
+          const int* to_nodes,
+          const int* first_link_from,
+          const int* last_link_from,
+          const int* sorted_links,
+          const unsigned* allowed_uses,
+          const double* link_costs,
+          int last_thru_node_,
+          unsigned mode)
+        : node_size {node_size_},
+          link_size {link_size_},
+          last_thru_node {last_thru_node_},
+          first_link(node_size_ + 1, 0),
+          first_rlink(node_size_ + 1, 0)
+    {
+        links.reserve(link_size);
+
+        for (int i = 0; i < node_size; ++i)
+        {
+            first_link[i] = static_cast<int>(links.size());
+            // node without outgoing links
+            if (first_link_from[i] < 0)
+                continue;
+
+            for (int k = first_link_from[i]; k < last_link_from[i]; ++k)
+            {
+                int link = sorted_links[k];
+                // prune links not open to mode
+                if (!(allowed_uses[link] & mode))
+                    continue;
+
+                links.push_back({to_nodes[link], link, link_costs[link]});
+            }
+        }
+
+        first_link[node_size] = static_cast<int>(links.size());
+
+        // backward star via counting sort on the downstream node of each link
+        for (const auto& link : links)
+            ++first_rlink[link.to_node + 1];
+
+        for (int i = 0; i < node_size; ++i)
+            first_rlink[i + 1] += first_rlink[i];
+
+        rlinks.resize(links.size());
+        std::vector<int> pos {first_rlink.begin(), first_rlink.end() - 1};
+        for (int i = 0; i < node_size; ++i)
+        {
+            for (int k = first_link[i]; k < first_link[i + 1]; ++k)
+            {
+                const Link& link = links[k];
+                rlinks[pos[link.to_node]++] = {i, link.link_no, link.cost};
+            }
+        }
+    }
+
+    const int node_size;
+    const int link_size;
+    const int last_thru_node;
+    // the outgoing links of node i are links[first_link[i], first_link[i + 1])
+    std::vector<int> first_link;
+    std::vector<Link> links;
+    // the incoming links of node i are rlinks[first_rlink[i], first_rlink[i + 1])
+    std::vector<int> first_rlink;
+    std::vector<Link> rlinks;
+};
+
+namespace {
+
+/**
+ * @brief the deque implementation of MLC on Graph
+ *
+ * It is identical to shortest_path_n() except that topology comes from graph,
+ * which only consists of links open to the mode it is built for. Therefore, no
+ * allowed uses are checked in the sweep. link_costs are indexed by link_no. If
+ * it is nullptr, the link costs stored in graph will be used.
+ *
+ * If forward is false, it builds the shortest path tree to orig_node on the
+ * backward star instead, i.e., label_costs[i] is the cost from node i to
+ * orig_node, and node_preds[i] and link_preds[i] are the next node and the link
+ * from node i towards orig_node.
+ */
+void mlc_(const Graph& graph,
+          int orig_node,
+          const double* link_costs,
+          double* label_costs,
+          int* node_preds,
+          int* link_preds,
+          int* deque_next,
+          int max_label_cost,
+          int depart_time,
+          bool forward = true)
+{
+    static constexpr int nullnode = -1, was_in_deque = -3;
+
+    const auto& first = forward ? graph.first_link : graph.first_rlink;
+    const auto& links = forward ? graph.links : graph.rlinks;
+
+    for (int node_no = 0; node_no < graph.node_size; ++node_no)
+    {
+        deque_next[node_no] = nullnode;
+        label_costs[node_no] = max_label_cost;
+        link_preds[node_no] = nullnode;
+        node_preds[node_no] = nullnode;
+    }
+
+    label_costs[orig_node] = depart_time;
+    deque_next[orig_node] = was_in_deque;
+
+    for (int cur_node = orig_node, deque_head = nullnode, deque_tail = nullnode;;)
+    {
+        // filter out the TAZ-based centroids
+        if (cur_node < graph.last_thru_node || cur_node == orig_node)
+        {
+            for (int k = first[cur_node]; k < first[cur_node + 1]; ++k)
+            {
+                const Graph::Link& link = links[k];
+                int new_node = link.to_node;
+                double new_cost = label_costs[cur_node]
+                                  + (link_costs ? link_costs[link.link_no] : link.cost);
+
+                if (label_costs[new_node] > new_cost)
+                {
+                    label_costs[new_node] = new_cost;
+                    link_preds[new_node] = link.link_no;
+                    node_preds[new_node] = cur_node;
+
+                    // the same three cases as shortest_path_n()
+                    if (deque_next[new_node] == was_in_deque)
+                    {
+                        deque_next[new_node] = deque_head;
+                        deque_head = new_node;
+
+                        if (deque_tail == nullnode)
+                            deque_tail = new_node;
+                    }
+                    else if (deque_next[new_node] == nullnode && new_node != deque_tail)
+                    {
+                        if (deque_tail == nullnode)
+                        {
+                            deque_head = deque_tail = new_node;
+                            deque_next[deque_tail] = nullnode;
+                        }
+                        else
+                        {
+                            deque_next[deque_tail] = new_node;
+                            deque_tail = new_node;
+                        }
+                    }
+                }
+            }
+        }
+
+        if (deque_head < 0)
+            break;
+
+        cur_node = deque_head;
+        deque_head = deque_next[cur_node];
+        deque_next[cur_node] = was_in_deque;
+        if (deque_tail == cur_node)
+            deque_tail = nullnode;
+    }
+}
+
+/**
+ * @brief Dijkstra's algorithm on Graph using a binary heap
+ *
+ * It is a label setting algorithm, where each node is scanned only once. The
+ * heap supports no decrease-key operation. Instead, a node is pushed again on
+ * each label update and the outdated entries are skipped when they are popped.
+ * The same TAZ-based centroid filter as mlc_() is applied.
+ *
+ * If dest_node is given (i.e., not nullnode), it terminates once dest_node is
+ * popped (i.e., its label is permanent). Only labels and predecessors of the
+ * nodes popped before that are final then, which include every node along the
+ * shortest path to dest_node.
+ *
+ * If forward is false, it works on the backward star as mlc_() does.
+ */
+void dijkstra_(const Graph& graph,
+               int orig_node,
+               const double* link_costs,
+               double* label_costs,
+               int* node_preds,
+               int* link_preds,
+               int max_label_cost,
+               int depart_time,
+               int dest_node = -1,
+               bool forward = true)
+{
+    static constexpr int nullnode = -1;
+
+    const auto& first = forward ? graph.first_link : graph.first_rlink;
+    const auto& links = forward ? graph.links : graph.rlinks;
+
+    using HeapEntry = std::pair<double, int>;
+
+    for (int node_no = 0; node_no < graph.node_size; ++node_no)
+    {
+        label_costs[node_no] = max_label_cost;
+        link_preds[node_no] = nullnode;
+        node_preds[node_no] = nullnode;
+    }
+
+    label_costs[orig_node] = depart_time;
+
+    std::priority_queue<HeapEntry, std::vector<HeapEntry>, std::greater<HeapEntry>> heap;
+    heap.emplace(label_costs[orig_node], orig_node);
+
+    while (!heap.empty())
+    {
+        const HeapEntry top = heap.top();
+        heap.pop();
+
+        int cur_node = top.second;
+        // outdated entry
+        if (top.first > label_costs[cur_node])
+            continue;
+
+        if (cur_node == dest_node)
+            break;
+
+        // filter out the TAZ-based centroids
+        if (cur_node >= graph.last_thru_node && cur_node != orig_node)
+            continue;
+
+        for (int k = first[cur_node]; k < first[cur_node + 1]; ++k)
+        {
+            const Graph::Link& link = links[k];
+            int new_node = link.to_node;
+            double new_cost = label_costs[cur_node]
+                              + (link_costs ? link_costs[link.link_no] : link.cost);
+
+            if (label_costs[new_node] > new_cost)
+            {
+                label_costs[new_node] = new_cost;
+                link_preds[new_node] = link.link_no;
+                node_preds[new_node] = cur_node;
+                heap.emplace(new_cost, new_node);
+            }
+        }
+    }
+}
+
+/**
+ * @brief bidirectional Dijkstra's algorithm from orig_node to dest_node
+ *
+ * A forward search from orig_node on the forward star and a backward search
+ * from dest_node on the backward star run alternately, where the one with the
+ * smaller label on the top of its heap goes next. Each link relaxed by either
+ * search connecting the two search trees gives a path, and the shortest one is
+ * kept. The searches stop once the sum of the smallest labels of the two heaps
+ * is no less than the cost of the shortest path found so far.
+ *
+ * The TAZ-based centroid filter is applied to both searches, i.e., a centroid
+ * other than orig_node is never an intermediate node.
+ *
+ * Upon return, only labels and predecessors of the nodes along the shortest
+ * path are valid, which are in the same format as those from dijkstra_().
+ */
+void bidirectional_dijkstra_(const Graph& graph,
+                             int orig_node,
+                             int dest_node,
+                             const double* link_costs,
+                             double* label_costs,
+                             int* node_preds,
+                             int* link_preds,
+                             int max_label_cost,
+                             int depart_time)
+{
+    static constexpr int nullnode = -1;
+
+    using HeapEntry = std::pair<double, int>;
+    using Heap = std::priority_queue<HeapEntry, std::vector<HeapEntry>, std::greater<HeapEntry>>;
+
+    for (int node_no = 0; node_no < graph.node_size; ++node_no)
+    {
+        label_costs[node_no] = max_label_cost;
+        link_preds[node_no] = nullnode;
+        node_preds[node_no] = nullnode;
+    }
+
+    // labels and successors from the backward search
+    std::vector<double> rlabel_costs(graph.node_size, max_label_cost);
+    std::vector<int> node_succs(graph.node_size, nullnode);
+    std::vector<int> link_succs(graph.node_size, nullnode);
+    std::vector<double> link_succ_costs(graph.node_size, 0);
+
+    label_costs[orig_node] = depart_time;
+    rlabel_costs[dest_node] = 0;
+
+    Heap heap, rheap;
+    heap.emplace(label_costs[orig_node], orig_node);
+    rheap.emplace(rlabel_costs[dest_node], dest_node);
+
+    // the shortest path found so far goes through meet_node
+    double min_cost = orig_node == dest_node ? depart_time : max_label_cost;
+    int meet_node = orig_node == dest_node ? orig_node : nullnode;
+
+    auto is_blocked = [&](int node)
+    {
+        return node >= graph.last_thru_node && node != orig_node;
+    };
+
+    while (!heap.empty() && !rheap.empty())
+    {
+        if (heap.top().first + rheap.top().first >= min_cost)
+            break;
+
+        if (heap.top().first - depart_time <= rheap.top().first)
+        {
+            const HeapEntry top = heap.top();
+            heap.pop();
+
+            int cur_node = top.second;
+            if (top.first > label_costs[cur_node] || is_blocked(cur_node))
+                continue;
+
+            for (int k = graph.first_link[cur_node]; k < graph.first_link[cur_node + 1]; ++k)
+            {
+                const Graph::Link& link = graph.links[k];
+                int new_node = link.to_node;
+                double new_cost = label_costs[cur_node]
+                                  + (link_costs ? link_costs[link.link_no] : link.cost);
+
+                if (label_costs[new_node] > new_cost)
+                {
+                    label_costs[new_node] = new_cost;
+                    link_preds[new_node] = link.link_no;
+                    node_preds[new_node] = cur_node;
+                    heap.emplace(new_cost, new_node);
+
+                    if (new_cost + rlabel_costs[new_node] < min_cost)
+                    {
+                        min_cost = new_cost + rlabel_costs[new_node];
+                        meet_node = new_node;
+                    }
+                }
+            }
+        }
+        else
+        {
+            const HeapEntry top = rheap.top();
+            rheap.pop();
+
+            int cur_node = top.second;
+            if (top.first > rlabel_costs[cur_node])
+                continue;
+
+            for (int k = graph.first_rlink[cur_node]; k < graph.first_rlink[cur_node + 1]; ++k)
+            {
+                const Graph::Link& link = graph.rlinks[k];
+                int new_node = link.to_node;
+                // links leaving a centroid are not allowed
+                if (is_blocked(new_node))
+                    continue;
+
+                double link_cost = link_costs ? link_costs[link.link_no] : link.cost;
+                double new_cost = rlabel_costs[cur_node] + link_cost;
+
+                if (rlabel_costs[new_node] > new_cost)
+                {
+                    rlabel_costs[new_node] = new_cost;
+                    link_succs[new_node] = link.link_no;
+                    link_succ_costs[new_node] = link_cost;
+                    node_succs[new_node] = cur_node;
+                    rheap.emplace(new_cost, new_node);
+
+                    if (label_costs[new_node] + new_cost < min_cost)
+                    {
+                        min_cost = label_costs[new_node] + new_cost;
+                        meet_node = new_node;
+                    }
+                }
+            }
+        }
+    }
+
+    if (meet_node == nullnode)
+        return;
+
+    // extend the forward search tree from meet_node to dest_node
+    for (int cur_node = meet_node; cur_node != dest_node;)
+    {
+        int next_node = node_succs[cur_node];
+        node_preds[next_node] = cur_node;
+        link_preds[next_node] = link_succs[cur_node];
+        label_costs[next_node] = label_costs[cur_node] + link_succ_costs[cur_node];
+        cur_node = next_node;
+    }
+}
+
+/**
+ * @brief A* search from orig_node to dest_node guided by get_heuristic
+ *
+ * get_heuristic(i) returns a lower bound of the cost from node i to dest_node.
+ * A node is pushed again once its label is reduced, which keeps it exact even
+ * if the heuristic is not consistent for some links. It stops once dest_node is
+ * popped. See dijkstra_() for the nodes with valid labels and predecessors upon
+ * return.
+ */
+template<typename Heuristic>
+void astar_search_(const Graph& graph,
+                   int orig_node,
+                   int dest_node,
+                   const double* link_costs,
+                   double* label_costs,
+                   int* node_preds,
+                   int* link_preds,
+                   int max_label_cost,
+                   int depart_time,
+                   Heuristic& get_heuristic)
+{
+    static constexpr int nullnode = -1;
+
+    using HeapEntry = std::pair<double, int>;
+
+    for (int node_no = 0; node_no < graph.node_size; ++node_no)
+    {
+        label_costs[node_no] = max_label_cost;
+        link_preds[node_no] = nullnode;
+        node_preds[node_no] = nullnode;
+    }
+
+    label_costs[orig_node] = depart_time;
+
+    std::priority_queue<HeapEntry, std::vector<HeapEntry>, std::greater<HeapEntry>> heap;
+    heap.emplace(label_costs[orig_node] + get_heuristic(orig_node), orig_node);
+
+    while (!heap.empty())
+    {
+        const HeapEntry top = heap.top();
+        heap.pop();
+
+        int cur_node = top.second;
+        // outdated entry
+        if (top.first > label_costs[cur_node] + get_heuristic(cur_node))
+            continue;
+
+        if (cur_node == dest_node)
+            break;
+
+        // filter out the TAZ-based centroids
+        if (cur_node >= graph.last_thru_node && cur_node != orig_node)
+            continue;
+
+        for (int j = graph.first_link[cur_node]; j < graph.first_link[cur_node + 1]; ++j)
+        {
+            const Graph::Link& link = graph.links[j];
+            int new_node = link.to_node;
+            double new_cost = label_costs[cur_node]
+                              + (link_costs ? link_costs[link.link_no] : link.cost);
+
+            if (label_costs[new_node] > new_cost)
+            {
+                label_costs[new_node] = new_cost;
+                link_preds[new_node] = link.link_no;
+                node_preds[new_node] = cur_node;
+                heap.emplace(new_cost + get_heuristic(new_node), new_node);
+            }
+        }
+    }
+}
+
+/**
+ * @brief the scale of the heuristic in astar_()
+ *
+ * It is the minimum ratio of link cost to the Euclidean distance between its
+ * two end nodes over all links not incident to any centroid, which only
+ * changes with link costs. It is 0 if there is no link to derive it from.
+ */
+double get_heuristic_scale_(const Graph& graph,
+                            const double* link_costs,
+                            const double* coord_x,
+                            const double* coord_y,
+                            int max_label_cost)
+{
+    double k = max_label_cost;
+    for (int i = 0; i < graph.last_thru_node; ++i)
+    {
+        for (int j = graph.first_link[i]; j < graph.first_link[i + 1]; ++j)
+        {
+            const Graph::Link& link = graph.links[j];
+            if (link.to_node >= graph.last_thru_node)
+                continue;
+
+            double dx = coord_x[i] - coord_x[link.to_node];
+            double dy = coord_y[i] - coord_y[link.to_node];
+            double dist = std::sqrt(dx * dx + dy * dy);
+            if (dist <= 0)
+                continue;
+
+            double cost = link_costs ? link_costs[link.link_no] : link.cost;
+            k = std::min(k, cost / dist);
+        }
+    }
+
+    return k < max_label_cost ? k : 0;
+}
+
+/**
+ * @brief A* search from orig_node to dest_node using node coordinates
+ *
+ * The heuristic of node i is k * d(i), where d(i) is the Euclidean distance
+ * from i to dest_node, and k is from get_heuristic_scale_(). It never
+ * overestimates and is consistent along the links, which works with any units
+ * of coordinates and link costs. For cost in time, k is the reciprocal of the
+ * largest free-flow speed in terms of coordinates.
+ *
+ * If dest_node is a centroid, d(i) is the distance to the closest upstream
+ * node of dest_node as connectors come with zero cost.
+ */
+void astar_(const Graph& graph,
+            int orig_node,
+            int dest_node,
+            const double* link_costs,
+            const double* coord_x,
+            const double* coord_y,
+            double k,
+            double* label_costs,
+            int* node_preds,
+            int* link_preds,
+            int max_label_cost,
+            int depart_time)
+{
+    auto get_dist = [=](int i, int j)
+    {
+        double dx = coord_x[i] - coord_x[j], dy = coord_y[i] - coord_y[j];
+        return std::sqrt(dx * dx + dy * dy);
+    };
+
+    std::vector<int> targets;
+    if (dest_node < graph.last_thru_node)
+        targets.push_back(dest_node);
+    else
+    {
+        for (int j = graph.first_rlink[dest_node]; j < graph.first_rlink[dest_node + 1]; ++j)
+            targets.push_back(graph.rlinks[j].to_node);
+    }
+
+    // heuristics are evaluated on demand
+    std::vector<double> heuristics(graph.node_size, -1);
+    auto get_heuristic = [&](int node)
+    {
+        if (heuristics[node] < 0)
+        {
+            double dist = node == dest_node || targets.empty() ? 0 : max_label_cost;
+            for (int target : targets)
+                dist = std::min(dist, get_dist(node, target));
+
+            heuristics[node] = k * dist;
+        }
+
+        return heuristics[node];
+    };
+
+    astar_search_(graph,
+                  orig_node,
+                  dest_node,
+                  link_costs,
+                  label_costs,
+                  node_preds,
+                  link_preds,
+                  max_label_cost,
+                  depart_time,
+                  get_heuristic);
+}
+
+/**
+ * @brief Dial's algorithm on Graph using a circular array of buckets
+ *
+ * Link costs are scaled to integers by the bucket width, which is the smallest
+ * positive link cost, and node i goes to bucket (label_costs[i] - depart_time)
+ * / width. The width is enlarged if it leads to more than max_bucket_num
+ * buckets. As nodes within a bucket are not sorted, a node is put back to the
+ * bucket once its label is reduced by another node in the same bucket. It is
+ * label setting if the width does not exceed any positive link cost.
+ *
+ * deque_next is used to mark whether a node is in any bucket. If forward is
+ * false, it works on the backward star as mlc_() does.
+ */
+void dial_(const Graph& graph,
+           int orig_node,
+           const double* link_costs,
+           double* label_costs,
+           int* node_preds,
+           int* link_preds,
+           int* deque_next,
+           int max_label_cost,
+           int depart_time,
+           bool forward = true)
+{
+    static constexpr int nullnode = -1, in_bucket = 1;
+    static constexpr double max_bucket_num = 1024;
+
+    const auto& first = forward ? graph.first_link : graph.first_rlink;
+    const auto& links = forward ? graph.links : graph.rlinks;
+
+    double min_cost = max_label_cost, max_cost = 0;
+    for (const auto& link : links)
+    {
+        double cost = link_costs ? link_costs[link.link_no] : link.cost;
+        if (cost > 0 && cost < min_cost)
+            min_cost = cost;
+
+        if (cost > max_cost)
+            max_cost = cost;
+    }
+
+    // zero cost on every link
+    if (max_cost <= 0)
+        min_cost = max_cost = 1;
+
+    const double width = std::max(min_cost, max_cost / max_bucket_num);
+    // the label of any node in the buckets is no greater than that of the node
+    // being scanned plus max_cost, which guarantees no overlap among buckets.
+    const auto bucket_num = static_cast<std::size_t>(max_cost / width) + 2;
+    auto get_bucket = [=](double label) -> std::size_t
+    {
+        return static_cast<std::size_t>((label - depart_time) / width);
+    };
+
+    for (int node_no = 0; node_no < graph.node_size; ++node_no)
+    {
+        deque_next[node_no] = nullnode;
+        label_costs[node_no] = max_label_cost;
+        link_preds[node_no] = nullnode;
+        node_preds[node_no] = nullnode;
+    }
+
+    label_costs[orig_node] = depart_time;
+
+    // buckets are kept for the subsequent calls on the same thread to avoid
+    // repetitive memory allocations. they are always left empty.
+    thread_local std::vector<std::vector<int>> buckets;
+    if (buckets.size() < bucket_num)
+        buckets.resize(bucket_num);
+
+    buckets[0].push_back(orig_node);
+    deque_next[orig_node] = in_bucket;
+    int node_num = 1;
+
+    for (std::size_t b = 0; node_num > 0; ++b)
+    {
+        auto& bucket = buckets[b % bucket_num];
+        // nodes could be appended to the bucket under scanning
+        for (std::size_t i = 0; i < bucket.size(); ++i)
+        {
+            int cur_node = bucket[i];
+            // outdated entry
+            if (deque_next[cur_node] != in_bucket || get_bucket(label_costs[cur_node]) != b)
+                continue;
+
+            deque_next[cur_node] = nullnode;
+            --node_num;
+
+            // filter out the TAZ-based centroids
+            if (cur_node >= graph.last_thru_node && cur_node != orig_node)
+                continue;
+
+            for (int k = first[cur_node]; k < first[cur_node + 1]; ++k)
+            {
+                const Graph::Link& link = links[k];
+                int new_node = link.to_node;
+                double new_cost = label_costs[cur_node]
+                                  + (link_costs ? link_costs[link.link_no] : link.cost);
+
+                if (label_costs[new_node] > new_cost)
+                {
+                    label_costs[new_node] = new_cost;
+                    link_preds[new_node] = link.link_no;
+                    node_preds[new_node] = cur_node;
+
+                    if (deque_next[new_node] != in_bucket)
+                    {
+                        deque_next[new_node] = in_bucket;
+                        ++node_num;
+                    }
+
+                    buckets[get_bucket(new_cost) % bucket_num].push_back(new_node);
+                }
+            }
+        }
+
+        bucket.clear();
+    }
+}
+
+/**
+ * @brief budget-bounded Dijkstra's algorithm from orig_node on Graph
+ *
+ * A link is never relaxed if it leads to a label beyond budget. Therefore, the
+ * search only touches the nodes within budget and their outgoing links. The
+ * labels live in a thread-local array, which is filled once per thread and only
+ * the touched entries are reset upon return, i.e., there is no initialization
+ * over all nodes for each call as dijkstra_() does.
+ *
+ * The nodes within budget other than orig_node are appended to nodes in the
+ * order of being settled (i.e., nondecreasing label costs) along with their
+ * label costs in labels and predecessor links in links. The TAZ-based centroid
+ * filter and forward are the same as mlc_().
+ */
+void isochrone_(const Graph& graph,
+                int orig_node,
+                const double* link_costs,
+                double budget,
+                int depart_time,
+                bool forward,
+                std::vector<int>& nodes,
+                std::vector<double>& labels,
+                std::vector<int>& links)
+{
+    static constexpr double inf = std::numeric_limits<double>::infinity();
+
+    using HeapEntry = std::pair<double, int>;
+
+    const auto& first = forward ? graph.first_link : graph.first_rlink;
+    const auto& star = forward ? graph.links : graph.rlinks;
+
+    thread_local std::vector<double> label_costs;
+    thread_local std::vector<int> link_preds;
+    thread_local std::vector<int> touched;
+
+    const auto node_size = static_cast<std::size_t>(graph.node_size);
+    if (label_costs.size() < node_size)
+    {
+        label_costs.resize(node_size, inf);
+        link_preds.resize(node_size);
+    }
+
+    budget += depart_time;
+    label_costs[orig_node] = depart_time;
+    touched.push_back(orig_node);
+
+    std::priority_queue<HeapEntry, std::vector<HeapEntry>, std::greater<HeapEntry>> heap;
+    heap.emplace(label_costs[orig_node], orig_node);
+
+    while (!heap.empty())
+    {
+        const HeapEntry top = heap.top();
+        heap.pop();
+
+        int cur_node = top.second;
+        // outdated entry
+        if (top.first > label_costs[cur_node])
+            continue;
+
+        if (cur_node != orig_node)
+        {
+            nodes.push_back(cur_node);
+            labels.push_back(label_costs[cur_node]);
+            links.push_back(link_preds[cur_node]);
+        }
+
+        // filter out the TAZ-based centroids
+        if (cur_node >= graph.last_thru_node && cur_node != orig_node)
+            continue;
+
+        for (int k = first[cur_node]; k < first[cur_node + 1]; ++k)
+        {
+            const Graph::Link& link = star[k];
+            int new_node = link.to_node;
+            double new_cost = label_costs[cur_node]
+                              + (link_costs ? link_costs[link.link_no] : link.cost);
+
+            if (new_cost > budget || label_costs[new_node] <= new_cost)
+                continue;
+
+            if (label_costs[new_node] == inf)
+                touched.push_back(new_node);
+
+            label_costs[new_node] = new_cost;
+            link_preds[new_node] = link.link_no;
+            heap.emplace(new_cost, new_node);
+        }
+    }
+
+    for (int i : touched)
+        label_costs[i] = inf;
+
+    touched.clear();
+}
+
+/**
+ * @brief repair the shortest path tree from orig_node after link cost changes
+ *
+ * It follows the dynamic algorithm of Ramalingam and Reps. A node is affected
+ * if its path in the tree goes through any link in increased, i.e., the nodes
+ * in the subtrees below these links, which are collected along the tree links
+ * on the forward star without scanning all nodes. The affected nodes are reset
+ * and each of them takes its best label from its unaffected upstream nodes via
+ * the backward star. The links in decreased are then relaxed from their
+ * unaffected tails, and the nodes updated by either step seed Dijkstra's
+ * algorithm, which only revisits the nodes whose labels are improved. The
+ * TAZ-based centroid filter is the same as mlc_().
+ *
+ * label_costs, node_preds, and link_preds hold the tree under the previous link
+ * costs upon entry and the one under link_costs upon return. tails and heads
+ * are the end nodes of each link indexed by link_no. It returns false without
+ * touching the tree if more than max_affected nodes are affected, where a full
+ * sweep is expected to be cheaper.
+ */
+bool repair_tree_(const Graph& graph,
+                  int orig_node,
+                  const double* link_costs,
+                  const std::vector<int>& tails,
+                  const std::vector<int>& heads,
+                  const std::vector<int>& increased,
+                  const std::vector<int>& decreased,
+                  double* label_costs,
+                  int* node_preds,
+                  int* link_preds,
+                  int max_label_cost,
+                  int max_affected)
+{
+    static constexpr int nullnode = -1;
+    static constexpr char valid = 0;
+    static constexpr char affected = 1;
+
+    using HeapEntry = std::pair<double, int>;
+
+    thread_local std::vector<char> states;
+    thread_local std::vector<int> stack;
+    thread_local std::vector<int> affected_nodes;
+
+    // the subtrees below the links with increased costs via the forward star
+    states.assign(graph.node_size, valid);
+    affected_nodes.clear();
+    for (int link_no : increased)
+    {
+        int node = heads[link_no];
+        if (link_preds[node] != link_no || states[node] == affected)
+            continue;
+
+        states[node] = affected;
+        stack.push_back(node);
+        while (!stack.empty())
+        {
+            int cur_node = stack.back();
+            stack.pop_back();
+
+            affected_nodes.push_back(cur_node);
+            if (static_cast<int>(affected_nodes.size()) > max_affected)
+            {
+                stack.clear();
+                return false;
+            }
+
+            for (int k = graph.first_link[cur_node]; k < graph.first_link[cur_node + 1]; ++k)
+            {
+                const Graph::Link& link = graph.links[k];
+                if (link_preds[link.to_node] == link.link_no && states[link.to_node] != affected)
+                {
+                    states[link.to_node] = affected;
+                    stack.push_back(link.to_node);
+                }
+            }
+        }
+    }
+
+    auto is_open = [&](int node)
+    {
+        return states[node] == valid && label_costs[node] < max_label_cost
+               && (node < graph.last_thru_node || node == orig_node);
+    };
+
+    std::priority_queue<HeapEntry, std::vector<HeapEntry>, std::greater<HeapEntry>> heap;
+
+    for (int node : affected_nodes)
+    {
+        label_costs[node] = max_label_cost;
+        node_preds[node] = nullnode;
+        link_preds[node] = nullnode;
+
+        for (int k = graph.first_rlink[node]; k < graph.first_rlink[node + 1]; ++k)
+        {
+            const Graph::Link& link = graph.rlinks[k];
+            int pred = link.to_node;
+            if (!is_open(pred))
+                continue;
+
+            double new_cost = label_costs[pred] + link_costs[link.link_no];
+            if (label_costs[node] > new_cost)
+            {
+                label_costs[node] = new_cost;
+                node_preds[node] = pred;
+                link_preds[node] = link.link_no;
+            }
+        }
+
+        if (link_preds[node] >= 0)
+            heap.emplace(label_costs[node], node);
+    }
+
+    for (int link_no : decreased)
+    {
+        int tail = tails[link_no], head = heads[link_no];
+        if (!is_open(tail))
+            continue;
+
+        double new_cost = label_costs[tail] + link_costs[link_no];
+        if (label_costs[head] > new_cost)
+        {
+            label_costs[head] = new_cost;
+            node_preds[head] = tail;
+            link_preds[head] = link_no;
+            heap.emplace(new_cost, head);
+        }
+    }
+
+    while (!heap.empty())
+    {
+        const HeapEntry top = heap.top();
+        heap.pop();
+
+        int cur_node = top.second;
+        // outdated entry
+        if (top.first > label_costs[cur_node])
+            continue;
+
+        // filter out the TAZ-based centroids
+        if (cur_node >= graph.last_thru_node && cur_node != orig_node)
+            continue;
+
+        for (int k = graph.first_link[cur_node]; k < graph.first_link[cur_node + 1]; ++k)
+        {
+            const Graph::Link& link = graph.links[k];
+            int new_node = link.to_node;
+            double new_cost = label_costs[cur_node] + link_costs[link.link_no];
+
+            if (label_costs[new_node] > new_cost)
+            {
+                label_costs[new_node] = new_cost;
+                link_preds[new_node] = link.link_no;
+                node_preds[new_node] = cur_node;
+                heap.emplace(new_cost, new_node);
+            }
+        }
+    }
+
+    return true;
+}
+
+/**
+ * @brief accumulate link attributes along the shortest path tree from orig_node
+ *
+ * It gives secondary labels (e.g., distance and toll) of the shortest paths
+ * along with the label costs. link_attrs holds attr_num attributes in a row,
+ * i.e., attribute k of link j is link_attrs[k * link_size + j], and attr_labels
+ * is arranged in the same way by node. A node not reachable from orig_node
+ * comes with max_label_cost.
+ *
+ * Each node is visited once by walking up the tree to its first visited
+ * predecessor and filling the nodes in between on the way back. It takes
+ * O(node_size * attr_num) regardless of the shortest path algorithm.
+ */
+void accumulate_attrs_(const int* node_preds,
+                       const int* link_preds,
+                       int node_size,
+                       int link_size,
+                       int orig_node,
+                       const double* link_attrs,
+                       int attr_num,
+                       double* attr_labels,
+                       int max_label_cost)
+{
+    static constexpr char reachable = 1;
+    static constexpr char unreachable = 2;
+
+    thread_local std::vector<char> states;
+    thread_local std::vector<int> stack;
+
+    states.assign(node_size, 0);
+    states[orig_node] = reachable;
+    for (int k = 0; k < attr_num; ++k)
+        attr_labels[static_cast<std::size_t>(k) * node_size + orig_node] = 0;
+
+    for (int i = 0; i < node_size; ++i)
+    {
+        int cur_node = i;
+        while (!states[cur_node] && link_preds[cur_node] >= 0)
+        {
+            stack.push_back(cur_node);
+            cur_node = node_preds[cur_node];
+        }
+
+        // the root of a node not reachable from orig_node
+        if (!states[cur_node])
+        {
+            states[cur_node] = unreachable;
+            for (int k = 0; k < attr_num; ++k)
+                attr_labels[static_cast<std::size_t>(k) * node_size + cur_node] = max_label_cost;
+        }
+
+        while (!stack.empty())
+        {
+            int node = stack.back();
+            stack.pop_back();
+
+            int pred = node_preds[node];
+            states[node] = states[pred];
+            for (int k = 0; k < attr_num; ++k)
+            {
+                double* labels = attr_labels + static_cast<std::size_t>(k) * node_size;
+                labels[node] = states[node] == reachable
+                               ? labels[pred] + link_attrs[static_cast<std::size_t>(k) * link_size + link_preds[node]]
+                               : max_label_cost;
+            }
+        }
+    }
+}
+
+/**
+ * @brief dispatch the shortest path calculation on Graph to engine
+ *
+ * deque_next is only used by MLC and Dial's algorithm. If forward is false,
+ * orig_node is the root of the shortest path tree on the backward star (see
+ * mlc_()). The link attributes are accumulated in the same way as the next
+ * node and link towards orig_node take the place of the predecessors.
+ */
+void shortest_path_graph_(const Graph& graph,
+                          int orig_node,
+                          const double* link_costs,
+                          double* label_costs,
+                          int* node_preds,
+                          int* link_preds,
+                          int* deque_next,
+                          int engine,
+                          int max_label_cost,
+                          int depart_time,
+                          const double* link_attrs,
+                          int attr_num,
+                          double* attr_labels,
+                          bool forward)
+{
+    switch (engine)
+    {
+    case DIJKSTRA:
+        dijkstra_(graph, orig_node, link_costs, label_costs, node_preds, link_preds,
+                  max_label_cost, depart_time, -1, forward);
+        break;
+    case DIAL:
+        dial_(graph, orig_node, link_costs, label_costs, node_preds, link_preds,
+              deque_next, max_label_cost, depart_time, forward);
+        break;
+    default:
+        mlc_(graph, orig_node, link_costs, label_costs, node_preds, link_preds,
+             deque_next, max_label_cost, depart_time, forward);
+    }
+
+    if (attr_num > 0)
+    {
+        accumulate_attrs_(node_preds, link_preds, graph.node_size, graph.link_size,
+                          orig_node, link_attrs, attr_num, attr_labels, max_label_cost);
+    }
+}
+
+} // namespace
+
+Graph* create_graph(int node_size,
+                    int link_size,
+                    const int* to_nodes,
+                    const int* first_link_from,
+                    const int* last_link_from,
+                    const int* sorted_links,
+                    const unsigned* allowed_uses,
+                    const double* link_costs,
+                    int last_thru_node,
+                    unsigned mode)
+{
+    return new Graph {node_size,
+                      link_size,
+                      to_nodes,
+                      first_link_from,
+                      last_link_from,
+                      sorted_links,
+                      allowed_uses,
+                      link_costs,
+                      last_thru_node,
+                      mode};
+}
+
+void delete_graph(Graph* graph)
+{
+    delete graph;
+}
+
+void shortest_path_graph(const Graph* graph,
+                         int orig_node,
+                         const double* link_costs,
+                         double* label_costs,
+                         int* node_preds,
+                         int* link_preds,
+                         int* deque_next,
+                         int engine,
+                         int max_label_cost,
+                         int depart_time,
+                         const double* link_attrs,
+                         int attr_num,
+                         double* attr_labels,
+                         bool forward)
+{
+    shortest_path_graph_(*graph,
+                         orig_node,
+                         link_costs,
+                         label_costs,
+                         node_preds,
+                         link_preds,
+                         deque_next,
+                         engine,
+                         max_label_cost,
+                         depart_time,
+                         link_attrs,
+                         attr_num,
+                         attr_labels,
+                         forward);
+}
+
+/**
+ * @brief the scale of the heuristic used by ASTAR in shortest_path_p2p()
+ *
+ * It takes one sweep over all links and only has to be recomputed once
+ * link_costs change.
+ */
+double astar_heuristic_scale(const Graph* graph,
+                             const double* link_costs,
+                             const double* coord_x,
+                             const double* coord_y,
+                             int max_label_cost)
+{
+    return get_heuristic_scale_(*graph,
+                                link_costs,
+                                coord_x,
+                                coord_y,
+                                max_label_cost);
+}
+
+/**
+ * @brief compute the shortest path from orig_node to dest_node
+ *
+ * engine is DIJKSTRA, BIDIRECTIONAL_DIJKSTRA, or ASTAR, which stops as soon
+ * as the shortest path to dest_node is found rather than building the whole
+ * shortest path tree. Only labels and predecessors of the nodes along the
+ * shortest path are guaranteed to be valid upon return.
+ *
+ * coord_x and coord_y are the node coordinates required by ASTAR only, as
+ * well as heuristic_scale from astar_heuristic_scale() under link_costs. It is
+ * computed on the fly if heuristic_scale is negative.
+ */
+void shortest_path_p2p(const Graph* graph,
+                       int orig_node,
+                       int dest_node,
+                       const double* link_costs,
+                       const double* coord_x,
+                       const double* coord_y,
+                       double* label_costs,
+                       int* node_preds,
+                       int* link_preds,
+                       int engine,
+                       int max_label_cost,
+                       int depart_time,
+                       double heuristic_scale)
+{
+    if (engine == BIDIRECTIONAL_DIJKSTRA)
+    {
+        bidirectional_dijkstra_(*graph,
+                                orig_node,
+                                dest_node,
+                                link_costs,
+                                label_costs,
+                                node_preds,
+                                link_preds,
+                                max_label_cost,
+                                depart_time);
+        return;
+    }
+
+    if (engine == ASTAR)
+    {
+        if (heuristic_scale < 0)
+        {
+            heuristic_scale = get_heuristic_scale_(*graph,
+                                                   link_costs,
+                                                   coord_x,
+                                                   coord_y,
+                                                   max_label_cost);
+        }
+
+        astar_(*graph,
+               orig_node,
+               dest_node,
+               link_costs,
+               coord_x,
+               coord_y,
+               heuristic_scale,
+               label_costs,
+               node_preds,
+               link_preds,
+               max_label_cost,
+               depart_time);
+        return;
+    }
+
+    dijkstra_(*graph,
+              orig_node,
+              link_costs,
+              label_costs,
+              node_preds,
+              link_preds,
+              max_label_cost,
+              depart_time,
+              dest_node);
+}
+
+/**
+ * @brief compute the shortest path trees from multiple source nodes in one call
+ *
+ * It runs engine (i.e., MLC, DIJKSTRA, or DIAL) on graph for each source node
+ * in orig_nodes using up to thread_num threads. The results of the i-th source
+ * node are stored in label_costs, node_preds, and link_preds starting from
+ * i * node_size. Therefore, the caller is responsible for allocating these
+ * three with size of orig_size * node_size, and deque_next with size of
+ * thread_num * node_size as each thread works on its own deque.
+ *
+ * If attr_num is positive, link_attrs are accumulated along each tree as well
+ * (see accumulate_attrs_()). The secondary labels of the i-th source node start
+ * from i * attr_num * node_size in attr_labels.
+ *
+ * If forward is false, orig_nodes are the destinations of the shortest path
+ * trees built on the backward star instead.
+ */
+void shortest_path_batch(const Graph* graph,
+                         const int* orig_nodes,
+                         int orig_size,
+                         const double* link_costs,
+                         double* label_costs,
+                         int* node_preds,
+                         int* link_preds,
+                         int* deque_next,
+                         int engine,
+                         int max_label_cost,
+                         int depart_time,
+                         int thread_num,
+                         const double* link_attrs,
+                         int attr_num,
+                         double* attr_labels,
+                         bool forward)
+{
+    const int node_size = graph->node_size;
+    // source nodes are dispatched to threads one at a time for load balancing
+    std::atomic<int> next_orig {0};
+
+    auto sweep = [&](int t)
+    {
+        int* deq = deque_next + static_cast<std::size_t>(t) * node_size;
+        for (int i = next_orig++; i < orig_size; i = next_orig++)
+        {
+            const auto offset = static_cast<std::size_t>(i) * node_size;
+            shortest_path_graph_(*graph,
+                                 orig_nodes[i],
+                                 link_costs,
+                                 label_costs + offset,
+                                 node_preds + offset,
+                                 link_preds + offset,
+                                 deq,
+                                 engine,
+                                 max_label_cost,
+                                 depart_time,
+                                 link_attrs,
+                                 attr_num,
+                                 attr_labels + offset * attr_num,
+                                 forward);
+        }
+    };
+
+    // no need to launch more threads than source nodes
+    thread_num = std::max(1, std::min(thread_num, orig_size));
+
+    std::vector<std::thread> threads;
+    for (int t = 1; t < thread_num; ++t)
+        threads.emplace_back(sweep, t);
+
+    // the calling thread takes its share as well
+    sweep(0);
+
+    for (auto& th : threads)
+        th.join();
+}
+
+/**
+ * @brief update the shortest path trees from orig_nodes after link cost changes
+ *
+ * The shortest path trees from orig_nodes under prev_link_costs are stored in
+ * label_costs, node_preds, and link_preds in the same layout as
+ * shortest_path_batch(). Each of them is repaired by repair_tree_() if no more
+ * than max_affected_ratio of its nodes are affected by the links with their
+ * costs changed in link_costs. Otherwise, it is rebuilt by engine. All trees
+ * are rebuilt if more than max_affected_ratio of links are changed.
+ *
+ * A link cost is taken as changed only if it differs from the previous one by
+ * more than tolerance of the latter. The smaller changes are ignored and keep
+ * accumulating in link_costs against prev_link_costs, where only the changed
+ * ones are brought up to date upon return. With a positive tolerance, the
+ * repaired trees are therefore the shortest ones under link costs within
+ * tolerance of link_costs rather than link_costs.
+ *
+ * It returns the number of trees repaired. Note that the repaired trees could
+ * differ from the rebuilt ones in the choice among paths of equal cost.
+ */
+int repair_shortest_path_batch(const Graph* graph,
+                               const int* orig_nodes,
+                               int orig_size,
+                               double* prev_link_costs,
+                               const double* link_costs,
+                               double* label_costs,
+                               int* node_preds,
+                               int* link_preds,
+                               int* deque_next,
+                               int engine,
+                               int max_label_cost,
+                               int thread_num,
+                               double max_affected_ratio,
+                               double tolerance)
+{
+    const int node_size = graph->node_size;
+
+    std::vector<int> tails(graph->link_size), heads(graph->link_size);
+    std::vector<int> increased, decreased;
+    for (int i = 0; i < node_size; ++i)
+    {
+        for (int k = graph->first_link[i]; k < graph->first_link[i + 1]; ++k)
+        {
+            int link_no = graph->links[k].link_no;
+            tails[link_no] = i;
+            heads[link_no] = graph->links[k].to_node;
+
+            const double change = link_costs[link_no] - prev_link_costs[link_no];
+            if (std::fabs(change) <= tolerance * std::fabs(prev_link_costs[link_no]))
+                continue;
+
+            if (change > 0)
+                increased.push_back(link_no);
+            else
+                decreased.push_back(link_no);
+        }
+    }
+
+    const bool rebuild = increased.size() + decreased.size()
+                         > max_affected_ratio * graph->link_size;
+    const int max_affected = static_cast<int>(max_affected_ratio * node_size);
+
+    std::atomic<int> next_orig {0};
+    std::atomic<int> repaired {0};
+
+    auto sweep = [&](int t)
+    {
+        int* deq = deque_next + static_cast<std::size_t>(t) * node_size;
+        for (int i = next_orig++; i < orig_size; i = next_orig++)
+        {
+            const auto offset = static_cast<std::size_t>(i) * node_size;
+            if (!rebuild && repair_tree_(*graph,
+                                         orig_nodes[i],
+                                         link_costs,
+                                         tails,
+                                         heads,
+                                         increased,
+                                         decreased,
+                                         label_costs + offset,
+                                         node_preds + offset,
+                                         link_preds + offset,
+                                         max_label_cost,
+                                         max_affected))
+            {
+                ++repaired;
+                continue;
+            }
+
+            shortest_path_graph_(*graph,
+                                 orig_nodes[i],
+                                 link_costs,
+                                 label_costs + offset,
+                                 node_preds + offset,
+                                 link_preds + offset,
+                                 deq,
+                                 engine,
+                                 max_label_cost,
+                                 0,
+                                 nullptr,
+                                 0,
+                                 nullptr,
+                                 true);
+        }
+    };
+
+    thread_num = std::max(1, std::min(thread_num, orig_size));
+
+    std::vector<std::thread> threads;
+    for (int t = 1; t < thread_num; ++t)
+        threads.emplace_back(sweep, t);
+
+    sweep(0);
+
+    for (auto& th : threads)
+        th.join();
+
+    if (rebuild)
+    {
+        std::copy(link_costs, link_costs + graph->link_size, prev_link_costs);
+    }
+    else
+    {
+        for (int link_no : increased)
+            prev_link_costs[link_no] = link_costs[link_no];
+
+        for (int link_no : decreased)
+            prev_link_costs[link_no] = link_costs[link_no];
+    }
+
+    return repaired;
+}
+
+/**
+ * @brief all-or-nothing loading of dest_vols onto a shortest path tree
+ *
+ * The volume to each reachable destination (other than the origin) is pushed
+ * up the tree from the leaves to the root. Each node passes the total volume
+ * of its subtree to its predecessor once all its children are done, which adds
+ * it to the flow of the link in between. It takes O(node_size) rather than the
+ * total length of the paths to all destinations. It works with links of zero
+ * cost as the order is derived from the tree rather than the label costs.
+ *
+ * The flows are accumulated to link_flows indexed by link_no, which shall be
+ * reset by the caller. It returns the sum of volume times label cost over all
+ * loaded destinations, i.e., the total cost of the all-or-nothing assignment.
+ */
+double load_shortest_path_tree(const double* label_costs,
+                               const int* node_preds,
+                               const int* link_preds,
+                               int node_size,
+                               const int* dest_nodes,
+                               const double* dest_vols,
+                               int dest_size,
+                               double* link_flows)
+{
+    std::vector<double> node_flows(node_size, 0);
+    std::vector<int> child_nums(node_size, 0);
+
+    double total_cost = 0;
+    for (int i = 0; i < dest_size; ++i)
+    {
+        int dest_node = dest_nodes[i];
+        // not reachable or the origin itself
+        if (link_preds[dest_node] < 0)
+            continue;
+
+        node_flows[dest_node] += dest_vols[i];
+        total_cost += dest_vols[i] * label_costs[dest_node];
+    }
+
+    for (int i = 0; i < node_size; ++i)
+    {
+        if (link_preds[i] >= 0)
+            ++child_nums[node_preds[i]];
+    }
+
+    // start from the leaves
+    std::vector<int> queue;
+    queue.reserve(node_size);
+    for (int i = 0; i < node_size; ++i)
+    {
+        if (!child_nums[i] && link_preds[i] >= 0)
+            queue.push_back(i);
+    }
+
+    for (std::size_t k = 0; k < queue.size(); ++k)
+    {
+        int cur_node = queue[k];
+        int pred_node = node_preds[cur_node];
+
+        if (node_flows[cur_node])
+        {
+            link_flows[link_preds[cur_node]] += node_flows[cur_node];
+            node_flows[pred_node] += node_flows[cur_node];
+        }
+
+        if (!--child_nums[pred_node] && link_preds[pred_node] >= 0)
+            queue.push_back(pred_node);
+    }
+
+    return total_cost;
+}
+
+/**
+ * @brief retrieve the shortest paths to dest_nodes from a shortest path tree
+ *
+ * The links along the path to dest_nodes[i] are stored in links from
+ * offsets[i] to offsets[i + 1] in the order of retrieval, i.e., from the
+ * destination back to the origin. Its cost is label_costs[dest_nodes[i]] and
+ * its distance is the sum of link_lengths (indexed by link_no) along it, which
+ * is accumulated in the same order. A destination not reachable or identical to
+ * the origin comes with an empty path.
+ *
+ * The caller is responsible for allocating offsets with size of dest_size + 1,
+ * and costs and dists with size of dest_size. It returns the total number of
+ * links of all paths. If it is larger than link_capacity, links only holds the
+ * ones within link_capacity and the caller shall call it again with a larger
+ * buffer.
+ */
+int backtrace_paths(const double* label_costs,
+                    const int* node_preds,
+                    const int* link_preds,
+                    const double* link_lengths,
+                    const int* dest_nodes,
+                    int dest_size,
+                    int* offsets,
+                    int* links,
+                    int link_capacity,
+                    double* costs,
+                    double* dists)
+{
+    int link_num = 0;
+    for (int i = 0; i < dest_size; ++i)
+    {
+        offsets[i] = link_num;
+
+        double dist = 0;
+        for (int cur_node = dest_nodes[i]; cur_node >= 0; cur_node = node_preds[cur_node])
+        {
+            int link_no = link_preds[cur_node];
+            if (link_no < 0)
+                continue;
+
+            if (link_num < link_capacity)
+                links[link_num] = link_no;
+
+            ++link_num;
+            dist += link_lengths[link_no];
+        }
+
+        costs[i] = label_costs[dest_nodes[i]];
+        dists[i] = dist;
+    }
+
+    offsets[dest_size] = link_num;
+    return link_num;
+}
+
+/**
+ * @brief find the nodes reachable from orig_node within budget
+ *
+ * It runs isochrone_() and returns the number of nodes within budget excluding
+ * orig_node. These nodes are stored in node_nos in ascending order along with
+ * their predecessor links in link_nos and their label costs in label_costs (if
+ * not nullptr). The caller is responsible for allocating them with size of
+ * node_size. If forward is false, they are the nodes from which orig_node can
+ * be reached within budget, and link_nos are the next links towards orig_node.
+ */
+int isochrone(const Graph* graph,
+              int orig_node,
+              const double* link_costs,
+              double budget,
+              int* node_nos,
+              int* link_nos,
+              double* label_costs,
+              int depart_time,
+              bool forward)
+{
+    std::vector<int> nodes, links;
+    std::vector<double> labels;
+    isochrone_(*graph, orig_node, link_costs, budget, depart_time, forward,
+               nodes, labels, links);
+
+    std::vector<int> order(nodes.size());
+    for (std::size_t i = 0; i < order.size(); ++i)
+        order[i] = static_cast<int>(i);
+
+    std::sort(order.begin(), order.end(),
+              [&](int i, int j) { return nodes[i] < nodes[j]; });
+
+    for (std::size_t i = 0; i < order.size(); ++i)
+    {
+        node_nos[i] = nodes[order[i]];
+        link_nos[i] = links[order[i]];
+        if (label_costs)
+            label_costs[i] = labels[order[i]];
+    }
+
+    return static_cast<int>(nodes.size());
+}
+
+/**
+ * @brief find the nodes reachable from multiple source nodes within budgets
+ *
+ * It runs isochrone_() once for each source node in orig_nodes under the
+ * largest one in budgets using up to thread_num threads. The nodes within it
+ * are stored in node_nos starting from i * node_size for the i-th source node
+ * in the order of being settled, along with their predecessor links in
+ * link_nos. Therefore, the nodes within budgets[k] are always the first
+ * cutoffs[i * budget_num + k] ones, where budgets need not be sorted.
+ *
+ * The caller is responsible for allocating node_nos and link_nos with size of
+ * orig_size * node_size, and cutoffs with size of orig_size * budget_num.
+ */
+void isochrone_batch(const Graph* graph,
+                     const int* orig_nodes,
+                     int orig_size,
+                     const double* link_costs,
+                     const double* budgets,
+                     int budget_num,
+                     int* cutoffs,
+                     int* node_nos,
+                     int* link_nos,
+                     int depart_time,
+                     int thread_num,
+                     bool forward)
+{
+    if (budget_num <= 0)
+        return;
+
+    const double max_budget = *std::max_element(budgets, budgets + budget_num);
+    const int node_size = graph->node_size;
+    std::atomic<int> next_orig {0};
+
+    auto sweep = [&]()
+    {
+        std::vector<int> nodes, links;
+        std::vector<double> labels;
+        for (int i = next_orig++; i < orig_size; i = next_orig++)
+        {
+            nodes.clear();
+            links.clear();
+            labels.clear();
+            isochrone_(*graph, orig_nodes[i], link_costs, max_budget, depart_time,
+                       forward, nodes, labels, links);
+
+            const auto offset = static_cast<std::size_t>(i) * node_size;
+            std::copy(nodes.begin(), nodes.end(), node_nos + offset);
+            std::copy(links.begin(), links.end(), link_nos + offset);
+
+            // labels are nondecreasing in the order of being settled
+            for (int k = 0; k < budget_num; ++k)
+            {
+                auto it = std::upper_bound(labels.begin(), labels.end(),
+                                           budgets[k] + depart_time);
+                cutoffs[static_cast<std::size_t>(i) * budget_num + k] =
+                    static_cast<int>(it - labels.begin());
+            }
+        }
+    };
+
+    thread_num = std::max(1, std::min(thread_num, orig_size));
+
+    std::vector<std::thread> threads;
+    for (int t = 1; t < thread_num; ++t)
+        threads.emplace_back(sweep);
+
+    sweep();
+
+    for (auto& th : threads)
+        th.join();
+}
+
+/**
+ * @brief contraction hierarchy (CH) of Graph for repeated queries on fixed link costs
+ *
+ * Nodes are contracted one at a time in the order of edge difference (i.e.,
+ * number of shortcuts added minus number of edges removed) plus number of
+ * contracted neighbors, which is updated lazily. Contracting node v adds a
+ * shortcut u -> w for each pair of its remaining neighbors u -> v -> w unless
+ * a witness path from u to w not via v is found by a local Dijkstra search
+ * with limited settled nodes. As a TAZ-based centroid can never be an
+ * intermediate node, it adds no shortcuts and any witness path goes through
+ * no centroids.
+ *
+ * edges are the original links (in the order of graph.links) followed by
+ * shortcuts, where a shortcut is unpacked via its two child edges. A node only
+ * keeps its edges to higher ranked nodes (i.e., up arcs) and its edges from
+ * higher ranked nodes (i.e., down arcs).
+ *
+ * The link costs upon construction are kept along with the original links so
+ * that the caller can check whether it still complies with graph and the
+ * current link costs.
+ */
+class CH {
+public:
+    struct Edge {
+        int from;
+        int to;
+        // nullnode for shortcut
+        int link_no;
+        int child1;
+        int child2;
+        double cost;
+    };
+
+    struct Arc {
+        // head of up arc or tail of down arc
+        int node;
+        int edge;
+        double cost;
+    };
+
+    CH() = default;
+
+    CH(const Graph& graph, const double* link_costs)
+        : node_size {graph.node_size},
+          link_size {graph.link_size},
+          last_thru_node {graph.last_thru_node},
+          orig_size {static_cast<int>(graph.links.size())},
+          first_link {graph.first_link}
+    {
+        edges.reserve(graph.links.size());
+        for (int i = 0; i < node_size; ++i)
+        {
+            for (int k = graph.first_link[i]; k < graph.first_link[i + 1]; ++k)
+            {
+                const Graph::Link& link = graph.links[k];
+                double cost = link_costs ? link_costs[link.link_no] : link.cost;
+                edges.push_back({i, link.to_node, link.link_no, nullnode, nullnode, cost});
+            }
+        }
+
+        contract();
+        build_arcs();
+    }
+
+    bool is_valid(const Graph& graph, const double* link_costs) const
+    {
+        if (graph.node_size != node_size || graph.link_size != link_size
+            || graph.last_thru_node != last_thru_node
+            || static_cast<int>(graph.links.size()) != orig_size
+            || graph.first_link != first_link)
+            return false;
+
+        for (int k = 0; k < orig_size; ++k)
+        {
+            const Graph::Link& link = graph.links[k];
+            const Edge& e = edges[k];
+            double cost = link_costs ? link_costs[link.link_no] : link.cost;
+            if (e.to != link.to_node || e.link_no != link.link_no || e.cost != cost)
+                return false;
+        }
+
+        return true;
+    }
+
+    bool is_blocked(int node, int orig_node) const
+    {
+        return node >= last_thru_node && node != orig_node;
+    }
+
+    /** @brief append the original edges of edge e to path in order */
+    void unpack(int e, std::vector<int>& path) const
+    {
+        std::vector<int> stack {e};
+        while (!stack.empty())
+        {
+            int cur = stack.back();
+            stack.pop_back();
+
+            if (edges[cur].link_no != nullnode)
+            {
+                path.push_back(cur);
+                continue;
+            }
+
+            stack.push_back(edges[cur].child2);
+            stack.push_back(edges[cur].child1);
+        }
+    }
+
+    bool save(const char* file_path) const;
+    bool load(const char* file_path);
+
+    static constexpr int nullnode = -1;
+    // "P4CH" to identify files saved by save()
+    static constexpr int ch_file_tag = 0x48433450;
+
+    int node_size = 0;
+    int link_size = 0;
+    int last_thru_node = 0;
+    int orig_size = 0;
+    // forward star of the original edges
+    std::vector<int> first_link;
+    std::vector<Edge> edges;
+    std::vector<int> ranks;
+    // nodes in descending order of ranks
+    std::vector<int> order;
+    std::vector<int> first_up;
+    std::vector<Arc> ups;
+    std::vector<int> first_down;
+    std::vector<Arc> downs;
+
+private:
+    struct Shortcut {
+        int from;
+        int to;
+        int child1;
+        int child2;
+        double cost;
+    };
+
+    void contract();
+    void build_arcs();
+    bool is_consistent() const;
+};
+
+constexpr int CH::nullnode;
+constexpr int CH::ch_file_tag;
+
+namespace {
+
+/**
+ * @brief local Dijkstra search for witness paths from source
+ *
+ * It runs on the remaining nodes except skipped_node and stops once the label
+ * on the top of the heap exceeds max_cost or max_settled nodes are settled. The
+ * labels are kept in dists, which are reset by the next search.
+ */
+class WitnessSearch {
+public:
+    explicit WitnessSearch(int node_size) : dists(node_size, inf)
+    {
+    }
+
+    void run(const CH& ch,
+             const std::vector<std::vector<int>>& out_edges,
+             const std::vector<char>& contracted,
+             int source,
+             int skipped_node,
+             double max_cost)
+    {
+        static constexpr int max_settled = 500;
+
+        for (int node : touched)
+            dists[node] = inf;
+        touched.clear();
+
+        dists[source] = 0;
+        touched.push_back(source);
+        heap.emplace(0, source);
+
+        for (int settled = 0; !heap.empty() && settled < max_settled; ++settled)
+        {
+            const HeapEntry top = heap.top();
+            heap.pop();
+
+            int cur_node = top.second;
+            if (top.first > dists[cur_node])
+                continue;
+
+            if (top.first > max_cost)
+                break;
+
+            if (ch.is_blocked(cur_node, source))
+                continue;
+
+            for (int e : out_edges[cur_node])
+            {
+                const CH::Edge& edge = ch.edges[e];
+                if (contracted[edge.to] || edge.to == skipped_node)
+                    continue;
+
+                double new_cost = dists[cur_node] + edge.cost;
+                if (dists[edge.to] > new_cost)
+                {
+                    if (dists[edge.to] == inf)
+                        touched.push_back(edge.to);
+
+                    dists[edge.to] = new_cost;
+                    heap.emplace(new_cost, edge.to);
+                }
+            }
+        }
+
+        heap = Heap();
+    }
+
+    static constexpr double inf = std::numeric_limits<double>::infinity();
+    std::vector<double> dists;
+
+private:
+    using HeapEntry = std::pair<double, int>;
+    using Heap = std::priority_queue<HeapEntry, std::vector<HeapEntry>, std::greater<HeapEntry>>;
+
+    std::vector<int> touched;
+    Heap heap;
+};
+
+constexpr double WitnessSearch::inf;
+
+/** @brief keep the cheapest edge to or from each neighbor */
+void keep_cheapest_edges(const CH& ch, std::vector<int>& edge_ids, bool head)
+{
+    std::sort(edge_ids.begin(), edge_ids.end(), [&](int i, int j)
+    {
+        int ni = head ? ch.edges[i].to : ch.edges[i].from;
+        int nj = head ? ch.edges[j].to : ch.edges[j].from;
+        return ni < nj || (ni == nj && ch.edges[i].cost < ch.edges[j].cost);
+    });
+
+    auto last = std::unique(edge_ids.begin(), edge_ids.end(), [&](int i, int j)
+    {
+        return head ? ch.edges[i].to == ch.edges[j].to : ch.edges[i].from == ch.edges[j].from;
+    });
+
+    edge_ids.erase(last, edge_ids.end());
+}
+
+} // namespace
+
+void CH::contract()
+{
+    std::vector<std::vector<int>> out_edges(node_size), in_edges(node_size);
+    for (int e = 0; e < orig_size; ++e)
+    {
+        // self loops are never used
+        if (edges[e].from == edges[e].to)
+            continue;
+
+        out_edges[edges[e].from].push_back(e);
+        in_edges[edges[e].to].push_back(e);
+    }
+
+    std::vector<char> contracted(node_size, 0);
+    std::vector<int> deleted_neighbors(node_size, 0);
+    std::vector<Shortcut> shortcuts;
+    WitnessSearch ws {node_size};
+
+    // find the shortcuts needed to contract node v
+    auto simulate = [&](int v)
+    {
+        shortcuts.clear();
+        // centroid is never an intermediate node
+        if (v >= last_thru_node)
+            return;
+
+        std::vector<int> ins, outs;
+        for (int e : in_edges[v])
+        {
+            if (!contracted[edges[e].from])
+                ins.push_back(e);
+        }
+
+        for (int e : out_edges[v])
+        {
+            if (!contracted[edges[e].to])
+                outs.push_back(e);
+        }
+
+        keep_cheapest_edges(*this, ins, false);
+        keep_cheapest_edges(*this, outs, true);
+
+        for (int e1 : ins)
+        {
+            int u = edges[e1].from;
+            double max_cost = 0;
+            for (int e2 : outs)
+            {
+                if (edges[e2].to != u)
+                    max_cost = std::max(max_cost, edges[e1].cost + edges[e2].cost);
+            }
+
+            ws.run(*this, out_edges, contracted, u, v, max_cost);
+
+            for (int e2 : outs)
+            {
+                int w = edges[e2].to;
+                double cost = edges[e1].cost + edges[e2].cost;
+                if (w != u && ws.dists[w] > cost)
+                    shortcuts.push_back({u, w, e1, e2, cost});
+            }
+        }
+    };
+
+    auto get_priority = [&](int v)
+    {
+        simulate(v);
+
+        int edge_num = 0;
+        for (int e : in_edges[v])
+            edge_num += !contracted[edges[e].from];
+
+        for (int e : out_edges[v])
+            edge_num += !contracted[edges[e].to];
+
+        return static_cast<int>(shortcuts.size()) - edge_num + deleted_neighbors[v];
+    };
+
+    using QueueEntry = std::pair<int, int>;
+    std::priority_queue<QueueEntry, std::vector<QueueEntry>, std::greater<QueueEntry>> queue;
+    for (int v = 0; v < node_size; ++v)
+        queue.emplace(get_priority(v), v);
+
+    ranks.assign(node_size, 0);
+    for (int rank = 0; !queue.empty();)
+    {
+        int v = queue.top().second;
+        queue.pop();
+
+        if (contracted[v])
+            continue;
+
+        // lazy update
+        int priority = get_priority(v);
+        if (!queue.empty() && priority > queue.top().first)
+        {
+            queue.emplace(priority, v);
+            continue;
+        }
+
+        for (const auto& s : shortcuts)
+        {
+            int e = static_cast<int>(edges.size());
+            edges.push_back({s.from, s.to, nullnode, s.child1, s.child2, s.cost});
+            out_edges[s.from].push_back(e);
+            in_edges[s.to].push_back(e);
+        }
+
+        contracted[v] = 1;
+        ranks[v] = rank++;
+
+        // drop edges to the contracted node from its neighbors
+        for (int e : in_edges[v])
+        {
+            int u = edges[e].from;
+            if (contracted[u])
+                continue;
+
+            ++deleted_neighbors[u];
+            auto& es = out_edges[u];
+            es.erase(std::remove_if(es.begin(), es.end(), [&](int i)
+            {
+                return contracted[edges[i].to];
+            }), es.end());
+        }
+
+        for (int e : out_edges[v])
+        {
+            int w = edges[e].to;
+            if (contracted[w])
+                continue;
+
+            ++deleted_neighbors[w];
+            auto& es = in_edges[w];
+            es.erase(std::remove_if(es.begin(), es.end(), [&](int i)
+            {
+                return contracted[edges[i].from];
+            }), es.end());
+        }
+    }
+}
+
+void CH::build_arcs()
+{
+    order.resize(node_size);
+    for (int v = 0; v < node_size; ++v)
+        order[node_size - 1 - ranks[v]] = v;
+
+    first_up.assign(node_size + 1, 0);
+    first_down.assign(node_size + 1, 0);
+    for (const auto& e : edges)
+    {
+        if (e.from == e.to)
+            continue;
+
+        if (ranks[e.from] < ranks[e.to])
+            ++first_up[e.from + 1];
+        else
+            ++first_down[e.to + 1];
+    }
+
+    for (int i = 0; i < node_size; ++i)
+    {
+        first_up[i + 1] += first_up[i];
+        first_down[i + 1] += first_down[i];
+    }
+
+    ups.resize(first_up[node_size]);
+    downs.resize(first_down[node_size]);
+    std::vector<int> up_pos {first_up.begin(), first_up.end() - 1};
+    std::vector<int> down_pos {first_down.begin(), first_down.end() - 1};
+    for (int k = 0, n = static_cast<int>(edges.size()); k < n; ++k)
+    {
+        const Edge& e = edges[k];
+        if (e.from == e.to)
+            continue;
+
+        if (ranks[e.from] < ranks[e.to])
+            ups[up_pos[e.from]++] = {e.to, k, e.cost};
+        else
+            downs[down_pos[e.to]++] = {e.from, k, e.cost};
+    }
+}
+
+/**
+ * The file starts with a tag and the sizes, followed by the forward star of the
+ * original edges, all edges, and ranks of nodes. The up and down arcs are
+ * rebuilt upon loading.
+ */
+bool CH::save(const char* file_path) const
+{
+    std::ofstream ofs {file_path, std::ios::binary};
+    if (!ofs)
+        return false;
+
+    const int edge_size = static_cast<int>(edges.size());
+    const int header[] = {ch_file_tag, node_size, link_size, last_thru_node, orig_size, edge_size};
+
+    ofs.write(reinterpret_cast<const char*>(header), sizeof(header));
+    ofs.write(reinterpret_cast<const char*>(first_link.data()), sizeof(int) * first_link.size());
+    ofs.write(reinterpret_cast<const char*>(edges.data()), sizeof(Edge) * edges.size());
+    ofs.write(reinterpret_cast<const char*>(ranks.data()), sizeof(int) * ranks.size());
+
+    return static_cast<bool>(ofs);
+}
+
+/**
+ * The sizes in the header are checked against the file length before any
+ * allocation, and the content is checked by is_consistent() before the up and
+ * down arcs are rebuilt. It returns false for any file not saved by save().
+ */
+bool CH::load(const char* file_path)
+{
+    std::ifstream ifs {file_path, std::ios::binary | std::ios::ate};
+    if (!ifs)
+        return false;
+
+    const long long file_size = ifs.tellg();
+    ifs.seekg(0);
+
+    int header[6];
+    if (!ifs.read(reinterpret_cast<char*>(header), sizeof(header)) || header[0] != ch_file_tag)
+        return false;
+
+    const int edge_size = header[5];
+    if (header[1] <= 0 || header[2] < 0 || header[3] < 0 || header[3] > header[1]
+        || header[4] < 0 || header[4] > edge_size)
+        return false;
+
+    const long long expected_size = static_cast<long long>(sizeof(header))
+                                    + static_cast<long long>(sizeof(int)) * (2LL * header[1] + 1)
+                                    + static_cast<long long>(sizeof(Edge)) * edge_size;
+    if (file_size != expected_size)
+        return false;
+
+    node_size = header[1];
+    link_size = header[2];
+    last_thru_node = header[3];
+    orig_size = header[4];
+    first_link.resize(node_size + 1);
+    edges.resize(edge_size);
+    ranks.resize(node_size);
+
+    ifs.read(reinterpret_cast<char*>(first_link.data()), sizeof(int) * first_link.size());
+    ifs.read(reinterpret_cast<char*>(edges.data()), sizeof(Edge) * edges.size());
+    ifs.read(reinterpret_cast<char*>(ranks.data()), sizeof(int) * ranks.size());
+    if (!ifs || !is_consistent())
+        return false;
+
+    build_arcs();
+    return true;
+}
+
+/**
+ * @brief check the forward star, edges, and ranks from load()
+ *
+ * The original edges shall follow the forward star, each shortcut shall only
+ * refer to edges before it so that unpack() terminates, and ranks shall be a
+ * permutation of nodes.
+ */
+bool CH::is_consistent() const
+{
+    if (first_link[0] != 0 || first_link[node_size] != orig_size)
+        return false;
+
+    for (int i = 0; i < node_size; ++i)
+    {
+        if (first_link[i] > first_link[i + 1])
+            return false;
+
+        for (int k = first_link[i]; k < first_link[i + 1]; ++k)
+        {
+            if (edges[k].from != i)
+                return false;
+        }
+    }
+
+    for (int k = 0, n = static_cast<int>(edges.size()); k < n; ++k)
+    {
+        const Edge& e = edges[k];
+        if (e.from < 0 || e.from >= node_size || e.to < 0 || e.to >= node_size)
+            return false;
+
+        if (k < orig_size)
+        {
+            if (e.link_no < 0 || e.link_no >= link_size
+                || e.child1 != nullnode || e.child2 != nullnode)
+                return false;
+        }
+        else if (e.link_no != nullnode || e.child1 < 0 || e.child1 >= k
+                 || e.child2 < 0 || e.child2 >= k)
+            return false;
+    }
+
+    std::vector<char> ranked(node_size, 0);
+    for (int r : ranks)
+    {
+        if (r < 0 || r >= node_size || ranked[r])
+            return false;
+
+        ranked[r] = 1;
+    }
+
+    return true;
+}
+
+namespace {
+
+using CHHeapEntry = std::pair<double, int>;
+using CHHeap = std::priority_queue<CHHeapEntry, std::vector<CHHeapEntry>, std::greater<CHHeapEntry>>;
+
+/**
+ * @brief the shortest path tree from orig_node using CH
+ *
+ * It is a PHAST-style query. A Dijkstra search on up arcs from orig_node is
+ * followed by a sweep over all nodes in descending order of ranks relaxing
+ * down arcs, which gives the exact labels. The predecessors come from a BFS
+ * on the original edges that are tight with the labels. It leads to a tree even
+ * with links of zero cost, where the shortest path to each node is the same as
+ * that of the graph.
+ */
+void shortest_path_ch_(const CH& ch,
+                       int orig_node,
+                       double* label_costs,
+                       int* node_preds,
+                       int* link_preds,
+                       int max_label_cost,
+                       int depart_time)
+{
+    static constexpr int nullnode = -1;
+    static constexpr double tolerance = 1e-9;
+
+    for (int node_no = 0; node_no < ch.node_size; ++node_no)
+    {
+        label_costs[node_no] = max_label_cost;
+        link_preds[node_no] = nullnode;
+        node_preds[node_no] = nullnode;
+    }
+
+    label_costs[orig_node] = depart_time;
+
+    CHHeap heap;
+    heap.emplace(label_costs[orig_node], orig_node);
+    while (!heap.empty())
+    {
+        const CHHeapEntry top = heap.top();
+        heap.pop();
+
+        int cur_node = top.second;
+        if (top.first > label_costs[cur_node] || ch.is_blocked(cur_node, orig_node))
+            continue;
+
+        for (int k = ch.first_up[cur_node]; k < ch.first_up[cur_node + 1]; ++k)
+        {
+            const CH::Arc& arc = ch.ups[k];
+            double new_cost = label_costs[cur_node] + arc.cost;
+            if (label_costs[arc.node] > new_cost)
+            {
+                label_costs[arc.node] = new_cost;
+                heap.emplace(new_cost, arc.node);
+            }
+        }
+    }
+
+    for (int cur_node : ch.order)
+    {
+        for (int k = ch.first_down[cur_node]; k < ch.first_down[cur_node + 1]; ++k)
+        {
+            const CH::Arc& arc = ch.downs[k];
+            if (ch.is_blocked(arc.node, orig_node))
+                continue;
+
+            double new_cost = label_costs[arc.node] + arc.cost;
+            if (label_costs[cur_node] > new_cost)
+                label_costs[cur_node] = new_cost;
+        }
+    }
+
+    // tree of tight edges, where each node is visited only once
+    std::vector<int> queue {orig_node};
+    std::vector<char> visited(ch.node_size, 0);
+    visited[orig_node] = 1;
+    for (std::size_t i = 0; i < queue.size(); ++i)
+    {
+        int cur_node = queue[i];
+        if (ch.is_blocked(cur_node, orig_node))
+            continue;
+
+        for (int k = ch.first_link[cur_node]; k < ch.first_link[cur_node + 1]; ++k)
+        {
+            const CH::Edge& e = ch.edges[k];
+            if (visited[e.to])
+                continue;
+
+            double new_cost = label_costs[cur_node] + e.cost;
+            if (new_cost > label_costs[e.to] + tolerance * (1 + std::fabs(label_costs[e.to])))
+                continue;
+
+            visited[e.to] = 1;
+            node_preds[e.to] = cur_node;
+            link_preds[e.to] = e.link_no;
+            queue.push_back(e.to);
+        }
+    }
+}
+
+/**
+ * @brief the shortest path from orig_node to dest_node using CH
+ *
+ * A bidirectional Dijkstra search on up arcs from orig_node and down arcs from
+ * dest_node, each of which stops once the label on the top of its heap is no
+ * less than the cost of the shortest path found so far. The path is unpacked
+ * into the original links, and only labels and predecessors of the nodes along
+ * it are valid upon return.
+ */
+void shortest_path_ch_p2p_(const CH& ch,
+                           int orig_node,
+                           int dest_node,
+                           double* label_costs,
+                           int* node_preds,
+                           int* link_preds,
+                           int max_label_cost,
+                           int depart_time)
+{
+    static constexpr int nullnode = -1;
+    static constexpr double inf = std::numeric_limits<double>::infinity();
+
+    for (int node_no = 0; node_no < ch.node_size; ++node_no)
+    {
+        label_costs[node_no] = max_label_cost;
+        link_preds[node_no] = nullnode;
+        node_preds[node_no] = nullnode;
+    }
+
+    std::vector<double> dists(ch.node_size, inf), rdists(ch.node_size, inf);
+    std::vector<int> edge_preds(ch.node_size, nullnode), edge_succs(ch.node_size, nullnode);
+
+    dists[orig_node] = 0;
+    rdists[dest_node] = 0;
+
+    CHHeap heap, rheap;
+    heap.emplace(0, orig_node);
+    rheap.emplace(0, dest_node);
+
+    double min_cost = inf;
+    int meet_node = nullnode;
+
+    while (!heap.empty() || !rheap.empty())
+    {
+        if (!heap.empty() && heap.top().first >= min_cost)
+            heap = CHHeap();
+
+        if (!rheap.empty() && rheap.top().first >= min_cost)
+            rheap = CHHeap();
+
+        if (!heap.empty())
+        {
+            const CHHeapEntry top = heap.top();
+            heap.pop();
+
+            int cur_node = top.second;
+            if (top.first <= dists[cur_node])
+            {
+                if (dists[cur_node] + rdists[cur_node] < min_cost)
+                {
+                    min_cost = dists[cur_node] + rdists[cur_node];
+                    meet_node = cur_node;
+                }
+
+                if (!ch.is_blocked(cur_node, orig_node))
+                {
+                    for (int k = ch.first_up[cur_node]; k < ch.first_up[cur_node + 1]; ++k)
+                    {
+                        const CH::Arc& arc = ch.ups[k];
+                        double new_cost = dists[cur_node] + arc.cost;
+                        if (dists[arc.node] > new_cost)
+                        {
+                            dists[arc.node] = new_cost;
+                            edge_preds[arc.node] = arc.edge;
+                            heap.emplace(new_cost, arc.node);
+                        }
+                    }
+                }
+            }
+        }
+
+        if (!rheap.empty())
+        {
+            const CHHeapEntry top = rheap.top();
+            rheap.pop();
+
+            int cur_node = top.second;
+            if (top.first <= rdists[cur_node])
+            {
+                if (dists[cur_node] + rdists[cur_node] < min_cost)
+                {
+                    min_cost = dists[cur_node] + rdists[cur_node];
+                    meet_node = cur_node;
+                }
+
+                for (int k = ch.first_down[cur_node]; k < ch.first_down[cur_node + 1]; ++k)
+                {
+                    const CH::Arc& arc = ch.downs[k];
+                    // links leaving a centroid are not allowed
+                    if (ch.is_blocked(arc.node, orig_node))
+                        continue;
+
+                    double new_cost = rdists[cur_node] + arc.cost;
+                    if (rdists[arc.node] > new_cost)
+                    {
+                        rdists[arc.node] = new_cost;
+                        edge_succs[arc.node] = arc.edge;
+                        rheap.emplace(new_cost, arc.node);
+                    }
+                }
+            }
+        }
+    }
+
+    label_costs[orig_node] = depart_time;
+    if (meet_node == nullnode)
+        return;
+
+    // edges along the path from orig_node to dest_node
+    std::vector<int> path_edges;
+    for (int cur_node = meet_node; cur_node != orig_node;)
+    {
+        path_edges.push_back(edge_preds[cur_node]);
+        cur_node = ch.edges[edge_preds[cur_node]].from;
+    }
+    std::reverse(path_edges.begin(), path_edges.end());
+
+    for (int cur_node = meet_node; cur_node != dest_node;)
+    {
+        path_edges.push_back(edge_succs[cur_node]);
+        cur_node = ch.edges[edge_succs[cur_node]].to;
+    }
+
+    std::vector<int> links;
+    for (int e : path_edges)
+        ch.unpack(e, links);
+
+    for (int e : links)
+    {
+        const CH::Edge& edge = ch.edges[e];
+        label_costs[edge.to] = label_costs[edge.from] + edge.cost;
+        node_preds[edge.to] = edge.from;
+        link_preds[edge.to] = edge.link_no;
+    }
+}
+
+} // namespace
+
+CH* create_ch(const Graph* graph, const double* link_costs)
+{
+    return new CH {*graph, link_costs};
+}
+
+CH* load_ch(const char* file_path)
+{
+    auto ch = new CH {};
+    try
+    {
+        if (ch->load(file_path))
+            return ch;
+    }
+    catch (const std::exception&)
+    {
+        // e.g., std::bad_alloc, which shall not cross the C interface
+    }
+
+    delete ch;
+    return nullptr;
+}
+
+bool save_ch(const CH* ch, const char* file_path)
+{
+    return ch->save(file_path);
+}
+
+void delete_ch(CH* ch)
+{
+    delete ch;
+}
+
+bool is_ch_valid(const CH* ch, const Graph* graph, const double* link_costs)
+{
+    return ch->is_valid(*graph, link_costs);
+}
+
+void shortest_path_ch(const CH* ch,
+                      int orig_node,
+                      double* label_costs,
+                      int* node_preds,
+                      int* link_preds,
+                      int max_label_cost,
+                      int depart_time)
+{
+    shortest_path_ch_(*ch,
+                      orig_node,
+                      label_costs,
+                      node_preds,
+                      link_preds,
+                      max_label_cost,
+                      depart_time);
+}
+
+void shortest_path_ch_p2p(const CH* ch,
+                          int orig_node,
+                          int dest_node,
+                          double* label_costs,
+                          int* node_preds,
+                          int* link_preds,
+                          int max_label_cost,
+                          int depart_time)
+{
+    shortest_path_ch_p2p_(*ch,
+                          orig_node,
+                          dest_node,
+                          label_costs,
+                          node_preds,
+                          link_preds,
+                          max_label_cost,
+                          depart_time);
+}
+
+/**
+ * @brief the shortest path trees from multiple source nodes using CH
+ *
+ * It is the counterpart of shortest_path_batch() with the same layout of
+ * label_costs, node_preds, link_preds, and attr_labels.
+ */
+void shortest_path_ch_batch(const CH* ch,
+                            const int* orig_nodes,
+                            int orig_size,
+                            double* label_costs,
+                            int* node_preds,
+                            int* link_preds,
+                            int max_label_cost,
+                            int depart_time,
+                            int thread_num,
+                            const double* link_attrs,
+                            int attr_num,
+                            double* attr_labels)
+{
+    const int node_size = ch->node_size;
+    std::atomic<int> next_orig {0};
+
+    auto sweep = [&]()
+    {
+        for (int i = next_orig++; i < orig_size; i = next_orig++)
+        {
+            const auto offset = static_cast<std::size_t>(i) * node_size;
+            shortest_path_ch_(*ch,
+                              orig_nodes[i],
+                              label_costs + offset,
+                              node_preds + offset,
+                              link_preds + offset,
+                              max_label_cost,
+                              depart_time);
+
+            if (attr_num > 0)
+            {
+                accumulate_attrs_(node_preds + offset, link_preds + offset, node_size,
+                                  ch->link_size, orig_nodes[i], link_attrs, attr_num,
+                                  attr_labels + offset * attr_num, max_label_cost);
+            }
+        }
+    };
+
+    thread_num = std::max(1, std::min(thread_num, orig_size));
+
+    std::vector<std::thread> threads;
+    for (int t = 1; t < thread_num; ++t)
+        threads.emplace_back(sweep);
+
+    sweep();
+
+    for (auto& th : threads)
+        th.join();
+}
+
+/**
+ * @brief landmarks of Graph for the ALT (A*, landmarks, and triangle
+ * inequality) search
+ *
+ * For each landmark L, it keeps d(L, i) and d(i, L) of every node i under the
+ * link costs upon construction, where TAZ-based centroids are never used as
+ * intermediate nodes as any other shortest path. By the triangle inequality,
+ * both d(L, t) - d(L, i) and d(i, L) - d(t, L) are lower bounds of d(i, t) for
+ * a thru node i, while the latter requires t not be a centroid as it is an
+ * intermediate node of the path from i to L via t. They stay as lower bounds
+ * under any link costs no less than the ones used for construction (e.g.,
+ * congested travel times against free-flow travel times), which is checked by
+ * is_lower_bound().
+ *
+ * The landmarks are selected one by one as the node farthest away from the
+ * selected ones, which tends to spread them over the boundary of the network.
+ */
+class Landmarks {
+public:
+    Landmarks(const Graph& graph, const double* link_costs, int landmark_num)
+        : node_size {graph.node_size}, last_thru_node {graph.last_thru_node}
+    {
+        std::vector<double> costs_by_no(graph.link_size, 0);
+        costs.reserve(graph.links.size());
+        for (const auto& link : graph.links)
+        {
+            costs.push_back(link_costs ? link_costs[link.link_no] : link.cost);
+            costs_by_no[link.link_no] = costs.back();
+        }
+
+        // landmarks are thru nodes
+        const int cand_size = last_thru_node;
+        if (cand_size == 0)
+            return;
+
+        // start with the node farthest away from an arbitrary node
+        std::vector<double> min_dists(node_size, inf);
+        compute_dists(graph, costs_by_no, 0, true, &min_dists[0]);
+
+        for (int i = 0; i < landmark_num; ++i)
+        {
+            int landmark = nullnode;
+            double max_dist = 0;
+            for (int j = 0; j < cand_size; ++j)
+            {
+                if (min_dists[j] < inf && min_dists[j] > max_dist)
+                {
+                    max_dist = min_dists[j];
+                    landmark = j;
+                }
+            }
+
+            if (landmark == nullnode)
+                break;
+
+            nodes.push_back(landmark);
+            const std::size_t offset = dists.size();
+            dists.resize(offset + node_size, inf);
+            rdists.resize(offset + node_size, inf);
+            compute_dists(graph, costs_by_no, landmark, true, &dists[offset]);
+            compute_dists(graph, costs_by_no, landmark, false, &rdists[offset]);
+
+            // drop the distances from the arbitrary node
+            for (int j = 0; j < node_size; ++j)
+                min_dists[j] = i ? std::min(min_dists[j], dists[offset + j]) : dists[offset + j];
+        }
+    }
+
+    bool is_lower_bound(const Graph& graph, const double* link_costs) const
+    {
+        if (graph.node_size != node_size || graph.links.size() != costs.size())
+            return false;
+
+        for (std::size_t k = 0; k < costs.size(); ++k)
+        {
+            const Graph::Link& link = graph.links[k];
+            if ((link_costs ? link_costs[link.link_no] : link.cost) < costs[k])
+                return false;
+        }
+
+        return true;
+    }
+
+    /** @brief lower bound of d(i, t) from landmark l */
+    double get_lower_bound(int l, int i, int t) const
+    {
+        const std::size_t offset = static_cast<std::size_t>(l) * node_size;
+        double bound = 0;
+        // skip the ones involving unreachable nodes
+        if (dists[offset + i] < inf && dists[offset + t] < inf)
+            bound = std::max(bound, dists[offset + t] - dists[offset + i]);
+
+        if (t < last_thru_node && rdists[offset + i] < inf && rdists[offset + t] < inf)
+            bound = std::max(bound, rdists[offset + i] - rdists[offset + t]);
+
+        return bound;
+    }
+
+    static constexpr int nullnode = -1;
+    static constexpr double inf = std::numeric_limits<double>::infinity();
+
+    const int node_size;
+    const int last_thru_node;
+    std::vector<int> nodes;
+    // d(L, i) of the l-th landmark L starts from l * node_size
+    std::vector<double> dists;
+    // d(i, L) of the l-th landmark L starts from l * node_size
+    std::vector<double> rdists;
+
+private:
+    /**
+     * @brief Dijkstra's algorithm from (forward) or to (backward) source
+     *
+     * source is a thru node and link costs are indexed by link_no.
+     */
+    void compute_dists(const Graph& graph,
+                       const std::vector<double>& link_costs,
+                       int source,
+                       bool forward,
+                       double* labels) const
+    {
+        using HeapEntry = std::pair<double, int>;
+
+        const auto& first = forward ? graph.first_link : graph.first_rlink;
+        const auto& links = forward ? graph.links : graph.rlinks;
+
+        std::fill(labels, labels + node_size, inf);
+        labels[source] = 0;
+
+        std::priority_queue<HeapEntry, std::vector<HeapEntry>, std::greater<HeapEntry>> heap;
+        heap.emplace(0, source);
+
+        while (!heap.empty())
+        {
+            const HeapEntry top = heap.top();
+            heap.pop();
+
+            int cur_node = top.second;
+            if (top.first > labels[cur_node])
+                continue;
+
+            // filter out the TAZ-based centroids
+            if (cur_node >= last_thru_node)
+                continue;
+
+            for (int k = first[cur_node]; k < first[cur_node + 1]; ++k)
+            {
+                const Graph::Link& link = links[k];
+                double new_cost = labels[cur_node] + link_costs[link.link_no];
+                if (labels[link.to_node] > new_cost)
+                {
+                    labels[link.to_node] = new_cost;
+                    heap.emplace(new_cost, link.to_node);
+                }
+            }
+        }
+    }
+
+    // link costs upon construction following the order of graph.links
+    std::vector<double> costs;
+};
+
+constexpr int Landmarks::nullnode;
+constexpr double Landmarks::inf;
+
+namespace {
+
+/**
+ * @brief the ALT search from orig_node to dest_node
+ *
+ * It is A* search with the heuristic of node i as the largest lower bound of
+ * d(i, dest_node) from up to active_num landmarks, which give the largest lower
+ * bounds of d(orig_node, dest_node). It falls back to Dijkstra's algorithm if
+ * any link cost is less than the one upon the construction of landmarks, which
+ * is given by lower_bound (see shortest_path_alt()).
+ */
+void alt_(const Graph& graph,
+          const Landmarks& landmarks,
+          int orig_node,
+          int dest_node,
+          const double* link_costs,
+          double* label_costs,
+          int* node_preds,
+          int* link_preds,
+          int max_label_cost,
+          int depart_time,
+          int lower_bound)
+{
+    static constexpr int active_num = 4;
+
+    if (lower_bound < 0)
+        lower_bound = landmarks.is_lower_bound(graph, link_costs);
+
+    if (!lower_bound)
+    {
+        dijkstra_(graph,
+                  orig_node,
+                  link_costs,
+                  label_costs,
+                  node_preds,
+                  link_preds,
+                  max_label_cost,
+                  depart_time,
+                  dest_node);
+        return;
+    }
+
+    std::vector<std::pair<double, int>> bounds;
+    for (int l = 0, n = static_cast<int>(landmarks.nodes.size()); l < n; ++l)
+        bounds.emplace_back(landmarks.get_lower_bound(l, orig_node, dest_node), l);
+
+    std::sort(bounds.begin(), bounds.end(), std::greater<std::pair<double, int>>());
+    if (bounds.size() > active_num)
+        bounds.resize(active_num);
+
+    // heuristics are evaluated on demand
+    std::vector<double> heuristics(graph.node_size, -1);
+    auto get_heuristic = [&](int node)
+    {
+        if (heuristics[node] < 0)
+        {
+            double bound = 0;
+            for (const auto& b : bounds)
+                bound = std::max(bound, landmarks.get_lower_bound(b.second, node, dest_node));
+
+            heuristics[node] = bound;
+        }
+
+        return heuristics[node];
+    };
+
+    astar_search_(graph,
+                  orig_node,
+                  dest_node,
+                  link_costs,
+                  label_costs,
+                  node_preds,
+                  link_preds,
+                  max_label_cost,
+                  depart_time,
+                  get_heuristic);
+}
+
+} // namespace
+
+Landmarks* create_landmarks(const Graph* graph, const double* link_costs, int landmark_num)
+{
+    return new Landmarks {*graph, link_costs, landmark_num};
+}
+
+void delete_landmarks(Landmarks* landmarks)
+{
+    delete landmarks;
+}
+
+bool are_landmarks_valid(const Landmarks* landmarks, const Graph* graph, const double* link_costs)
+{
+    return landmarks->is_lower_bound(*graph, link_costs);
+}
+
+/**
+ * lower_bound is 1 if landmarks are known to be valid under link_costs (see
+ * are_landmarks_valid()) and 0 if not. It is checked on the fly if it is
+ * negative, which takes a sweep over all links.
+ */
+void shortest_path_alt(const Graph* graph,
+                       const Landmarks* landmarks,
+                       int orig_node,
+                       int dest_node,
+                       const double* link_costs,
+                       double* label_costs,
+                       int* node_preds,
+                       int* link_preds,
+                       int max_label_cost,
+                       int depart_time,
+                       int lower_bound)
+{
+    alt_(*graph,
+         *landmarks,
+         orig_node,
+         dest_node,
+         link_costs,
+         label_costs,
+         node_preds,
+         link_preds,
+         max_label_cost,
+         depart_time,
+         lower_bound);
+}
\ No newline at end of file
@@ -42,4 +42,212 @@ extern "C" PATH_ENGINE_API void shortest_path_n(int orig_node,
                                                 int last_thru_node,
                                                 int depart_time = 0);
 
+// opaque to the callers
+class Graph;
+
+// shortest path algorithms supported by shortest_path_graph() and shortest_path_batch().
+// both can optionally accumulate attr_num link attributes (e.g., distance and toll)
+// along the shortest path tree into attr_labels.
+// BIDIRECTIONAL_DIJKSTRA and ASTAR are only for shortest_path_p2p().
+enum SPEngine {MLC = 0, DIJKSTRA = 1, DIAL = 2, BIDIRECTIONAL_DIJKSTRA = 3, ASTAR = 4};
+
+extern "C" PATH_ENGINE_API Graph* create_graph(int node_size,
+                                               int link_size,
+                                               const int* to_nodes,
+                                               const int* first_link_from,
+                                               const int* last_link_from,
+                                               const int* sorted_links,
+                                               const unsigned* allowed_uses,
+                                               const double* link_costs,
+                                               int last_thru_node,
+                                               unsigned mode);
+
+extern "C" PATH_ENGINE_API void delete_graph(Graph* graph);
+
+extern "C" PATH_ENGINE_API void shortest_path_graph(const Graph* graph,
+                                                    int orig_node,
+                                                    const double* link_costs,
+                                                    double* label_costs,
+                                                    int* node_preds,
+                                                    int* link_preds,
+                                                    int* deque_next,
+                                                    int engine,
+                                                    int max_label_cost,
+                                                    int depart_time = 0,
+                                                    const double* link_attrs = nullptr,
+                                                    int attr_num = 0,
+                                                    double* attr_labels = nullptr,
+                                                    bool forward = true);
+
+extern "C" PATH_ENGINE_API void shortest_path_p2p(const Graph* graph,
+                                                  int orig_node,
+                                                  int dest_node,
+                                                  const double* link_costs,
+                                                  const double* coord_x,
+                                                  const double* coord_y,
+                                                  double* label_costs,
+                                                  int* node_preds,
+                                                  int* link_preds,
+                                                  int engine,
+                                                  int max_label_cost,
+                                                  int depart_time = 0,
+                                                  double heuristic_scale = -1);
+
+extern "C" PATH_ENGINE_API double astar_heuristic_scale(const Graph* graph,
+                                                        const double* link_costs,
+                                                        const double* coord_x,
+                                                        const double* coord_y,
+                                                        int max_label_cost);
+
+extern "C" PATH_ENGINE_API void shortest_path_batch(const Graph* graph,
+                                                    const int* orig_nodes,
+                                                    int orig_size,
+                                                    const double* link_costs,
+                                                    double* label_costs,
+                                                    int* node_preds,
+                                                    int* link_preds,
+                                                    int* deque_next,
+                                                    int engine,
+                                                    int max_label_cost,
+                                                    int depart_time = 0,
+                                                    int thread_num = 1,
+                                                    const double* link_attrs = nullptr,
+                                                    int attr_num = 0,
+                                                    double* attr_labels = nullptr,
+                                                    bool forward = true);
+
+// return the number of trees repaired rather than rebuilt
+extern "C" PATH_ENGINE_API int repair_shortest_path_batch(const Graph* graph,
+                                                          const int* orig_nodes,
+                                                          int orig_size,
+                                                          double* prev_link_costs,
+                                                          const double* link_costs,
+                                                          double* label_costs,
+                                                          int* node_preds,
+                                                          int* link_preds,
+                                                          int* deque_next,
+                                                          int engine,
+                                                          int max_label_cost,
+                                                          int thread_num = 1,
+                                                          double max_affected_ratio = 0.1,
+                                                          double tolerance = 0);
+
+// accumulate link flows to link_flows and return the total cost of loaded volumes
+extern "C" PATH_ENGINE_API double load_shortest_path_tree(const double* label_costs,
+                                                          const int* node_preds,
+                                                          const int* link_preds,
+                                                          int node_size,
+                                                          const int* dest_nodes,
+                                                          const double* dest_vols,
+                                                          int dest_size,
+                                                          double* link_flows);
+
+// return the total number of links along the paths, which might exceed link_capacity
+extern "C" PATH_ENGINE_API int backtrace_paths(const double* label_costs,
+                                               const int* node_preds,
+                                               const int* link_preds,
+                                               const double* link_lengths,
+                                               const int* dest_nodes,
+                                               int dest_size,
+                                               int* offsets,
+                                               int* links,
+                                               int link_capacity,
+                                               double* costs,
+                                               double* dists);
+
+// return the number of nodes within budget from (or to if not forward) orig_node
+extern "C" PATH_ENGINE_API int isochrone(const Graph* graph,
+                                         int orig_node,
+                                         const double* link_costs,
+                                         double budget,
+                                         int* node_nos,
+                                         int* link_nos,
+                                         double* label_costs = nullptr,
+                                         int depart_time = 0,
+                                         bool forward = true);
+
+extern "C" PATH_ENGINE_API void isochrone_batch(const Graph* graph,
+                                                const int* orig_nodes,
+                                                int orig_size,
+                                                const double* link_costs,
+                                                const double* budgets,
+                                                int budget_num,
+                                                int* cutoffs,
+                                                int* node_nos,
+                                                int* link_nos,
+                                                int depart_time = 0,
+                                                int thread_num = 1,
+                                                bool forward = true);
+
+// contraction hierarchy of Graph under fixed link costs, which is opaque to the callers
+class CH;
+
+extern "C" PATH_ENGINE_API CH* create_ch(const Graph* graph, const double* link_costs);
+
+// return nullptr if file_path is not a valid CH file
+extern "C" PATH_ENGINE_API CH* load_ch(const char* file_path);
+
+extern "C" PATH_ENGINE_API bool save_ch(const CH* ch, const char* file_path);
+
+extern "C" PATH_ENGINE_API void delete_ch(CH* ch);
+
+// check if ch is built on graph under link_costs
+extern "C" PATH_ENGINE_API bool is_ch_valid(const CH* ch, const Graph* graph, const double* link_costs);
+
+extern "C" PATH_ENGINE_API void shortest_path_ch(const CH* ch,
+                                                 int orig_node,
+                                                 double* label_costs,
+                                                 int* node_preds,
+                                                 int* link_preds,
+                                                 int max_label_cost,
+                                                 int depart_time = 0);
+
+extern "C" PATH_ENGINE_API void shortest_path_ch_p2p(const CH* ch,
+                                                     int orig_node,
+                                                     int dest_node,
+                                                     double* label_costs,
+                                                     int* node_preds,
+                                                     int* link_preds,
+                                                     int max_label_cost,
+                                                     int depart_time = 0);
+
+extern "C" PATH_ENGINE_API void shortest_path_ch_batch(const CH* ch,
+                                                       const int* orig_nodes,
+                                                       int orig_size,
+                                                       double* label_costs,
+                                                       int* node_preds,
+                                                       int* link_preds,
+                                                       int max_label_cost,
+                                                       int depart_time = 0,
+                                                       int thread_num = 1,
+                                                       const double* link_attrs = nullptr,
+                                                       int attr_num = 0,
+                                                       double* attr_labels = nullptr);
+
+// landmarks of Graph for the ALT search, which is opaque to the callers
+class Landmarks;
+
+extern "C" PATH_ENGINE_API Landmarks* create_landmarks(const Graph* graph,
+                                                       const double* link_costs,
+                                                       int landmark_num);
+
+extern "C" PATH_ENGINE_API void delete_landmarks(Landmarks* landmarks);
+
+// landmarks remain valid for any link_costs no less than the ones upon construction
+extern "C" PATH_ENGINE_API bool are_landmarks_valid(const Landmarks* landmarks,
+                                                    const Graph* graph,
+                                                    const double* link_costs);
+
+extern "C" PATH_ENGINE_API void shortest_path_alt(const Graph* graph,
+                                                  const Landmarks* landmarks,
+                                                  int orig_node,
+                                                  int dest_node,
+                                                  const double* link_costs,
+                                                  double* label_costs,
+                                                  int* node_preds,
+                                                  int* link_preds,
+                                                  int max_label_cost,
+                                                  int depart_time = 0,
+                                                  int lower_bound = -1);
+
 #endif
\ No newline at end of file
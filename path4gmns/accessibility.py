@@ -3,12 +3,19 @@ import csv
 import threading
 
 from .classes import AccessNetwork
-from .path import single_source_shortest_path
+from .path import multi_source_shortest_path
 from .consts import MAX_LABEL_COST, MIN_TIME_BUDGET, \
                     BUDGET_TIME_INTVL, MAX_TIME_BUDGET
+from .utils import _import_numpy
 
 
-__all__ = ['evaluate_accessibility', 'evaluate_equity']
+__all__ = [
+    'evaluate_accessibility',
+    'evaluate_equity',
+    'compute_skims',
+    'save_skims',
+    'load_skims'
+]
 
 
 def _get_interval_id(t):
@@ -28,24 +35,29 @@ def _get_interval_id(t):
     return int((t-MIN_TIME_BUDGET) / BUDGET_TIME_INTVL) + 1
 
 
-def _update_min_travel_time(an, at, min_travel_times, time_dependent, demand_period_id):
+def _update_min_travel_time(an, at, min_travel_times, time_dependent,
+                            demand_period_id, engine='mlc'):
     an.update_generalized_link_cost(at, time_dependent, demand_period_id)
 
     at_str = at.get_type_str()
     max_min = 0
-    for c in an.get_centroids():
-        node_id = c.get_node_id()
+    centroids = list(an.get_centroids())
+    # the shortest path distances come along with the trees as secondary labels
+    sp_trees = multi_source_shortest_path(
+        an, [c.get_node_id() for c in centroids], engine=engine,
+        attrs=['distance']
+    )
+
+    for c, (label_costs, _, _, dists) in zip(centroids, sp_trees):
         zone_id = c.get_zone_id()
-        single_source_shortest_path(an, node_id)
-        for c_ in an.get_centroids():
+        for c_ in centroids:
             if c_ == c:
                 continue
 
             node_no = c_.get_node_no()
             to_zone_id = c_.get_zone_id()
-            min_tt = an.get_node_label_cost(node_no)
-            # this function will dramatically slow down the whole process
-            min_dist = an.get_sp_distance(node_no)
+            min_tt = label_costs[node_no]
+            min_dist = dists[node_no]
             min_travel_times[(zone_id, to_zone_id, at_str)] = min_tt, min_dist
 
             if min_tt < MAX_LABEL_COST and max_min < min_tt:
@@ -190,7 +202,8 @@ def evaluate_accessibility(ui,
                            mode='auto',
                            time_dependent=False,
                            demand_period_id=0,
-                           output_dir='.'):
+                           output_dir='.',
+                           engine='mlc'):
     """ perform accessibility evaluation for a target mode or more
 
     Parameters
@@ -238,6 +251,12 @@ def evaluate_accessibility(ui,
         The directory path where zone_accessibility.csv and od_accessibility.csv
         are output. The default is the current working directory (CDW).
 
+    engine
+        the shortest path algorithm to build the shortest path trees between
+        zones, which can be 'mlc', 'dijkstra', 'dial', or 'ch'. 'ch' builds the
+        contraction hierarchy for each mode first, which pays off with a large
+        number of zones. The default is 'mlc'.
+
     Returns
     -------
     None
@@ -271,7 +290,8 @@ def evaluate_accessibility(ui,
                                                at,
                                                min_travel_times,
                                                time_dependent,
-                                               demand_period_id)
+                                               demand_period_id,
+                                               engine)
             if max_min_ > max_min:
                 max_min = max_min_
     else:
@@ -281,7 +301,8 @@ def evaluate_accessibility(ui,
                                           at,
                                           min_travel_times,
                                           time_dependent,
-                                          demand_period_id)
+                                          demand_period_id,
+                                          engine)
         ats = [at]
 
     interval_num = _get_interval_id(min(max_min, MAX_TIME_BUDGET)) + 1
@@ -431,4 +452,175 @@ def evaluate_equity(ui, single_mode=False, mode='auto', time_dependent=False,
 
             equity_metrics[(bin_index, at_str)][4] += count
 
-    _output_equity(output_dir, time_budget, equity_metrics, equity_zones)
\ No newline at end of file
+    _output_equity(output_dir, time_budget, equity_metrics, equity_zones)
+
+
+def compute_skims(ui, mode='auto', cost_type='time', attrs=('distance',),
+                  time_dependent=False, demand_period_id=0, engine='mlc'):
+    """ compute zone-to-zone skims as dense matrices
+
+    Parameters
+    ----------
+    ui
+        network object generated by pg.read_network()
+
+    mode
+        target mode with its default value as 'auto'. It can be
+        either agent type or its name. For example, 'w' and 'walk' are
+        equivalent inputs.
+
+    cost_type
+        'time' or 'distance'. The shortest paths between zones are found by
+        the generalized travel time of the target mode (as in
+        evaluate_accessibility()) if it is 'time', or by link length if it is
+        'distance'. The default is 'time'.
+
+    attrs
+        link attributes accumulated along the shortest paths as additional
+        skims, which can be any of 'distance', 'toll', and 'time' (i.e.,
+        free-flow travel time). 'time' can not be used with cost_type as 'time'
+        as the generalized travel time takes its key, while 'distance' with
+        cost_type as 'distance' is the same skim. The default is ('distance',).
+
+    time_dependent
+        True or False. Its default value is False. See evaluate_accessibility()
+        for details. It only works with cost_type as 'time'.
+
+    demand_period_id
+        The sequence number of demand period listed in demand_periods in
+        settings.yml. Use it with time_dependent. Its default value is 0.
+
+    engine
+        the shortest path algorithm to build the shortest path trees between
+        zones, which can be 'mlc', 'dijkstra', 'dial', or 'ch'. The default is
+        'mlc'.
+
+    Returns
+    -------
+    zone_ids
+        list of zone ids, which gives the row and column order of each matrix.
+
+    skims
+        dict of 2D numpy arrays with cost_type and each of attrs as keys, where
+        skims[k][i, j] is the skim from zone_ids[i] to zone_ids[j] and it is inf
+        if zone_ids[j] is not reachable from zone_ids[i]. Skims in distance are
+        in the length unit of read_network() as find_shortest_path() does.
+
+    Note
+    ----
+    The zone ids are ordered as the zones are read in, which stays the same for
+    the same network. The origins are processed in batches and each batch is
+    spread over multiple threads by the path engine.
+
+    NumPy is required, which can be installed along with path4gmns via
+    pip install path4gmns[numpy].
+    """
+    np = _import_numpy()
+
+    base = ui._base_assignment
+    at_name, at_str = base._convert_mode(mode)
+    at = base.get_agent_type(at_str)
+
+    attrs = list(attrs)
+    if cost_type == 'time':
+        if 'time' in attrs:
+            raise Exception(
+                'time in attrs is free-flow travel time, which conflicts with '
+                'the generalized travel time from cost_type as time'
+            )
+    elif cost_type == 'distance':
+        if time_dependent:
+            raise Exception('time_dependent only works with cost_type as time')
+    else:
+        raise Exception(
+            f'{cost_type} is not a valid cost type! '
+            'Please choose one from time and distance'
+        )
+
+    an = AccessNetwork(base.network)
+    an.set_target_mode(at_name)
+    if cost_type == 'time':
+        an.update_generalized_link_cost(at, time_dependent, demand_period_id)
+
+    centroids = list(an.get_centroids())
+    zone_ids = [c.get_zone_id() for c in centroids]
+    centroid_nos = np.array([c.get_node_no() for c in centroids])
+
+    keys = [cost_type] + [x for x in attrs if x != cost_type]
+    zone_size = len(zone_ids)
+    skims = {k: np.empty((zone_size, zone_size)) for k in keys}
+
+    node_size = an.get_node_size()
+    sp_trees = multi_source_shortest_path(
+        an, [c.get_node_id() for c in centroids], cost_type, engine, attrs
+    )
+
+    for i, sp_tree in enumerate(sp_trees):
+        skims[cost_type][i] = np.ctypeslib.as_array(sp_tree[0])[centroid_nos]
+        if attrs:
+            labels = np.ctypeslib.as_array(sp_tree[3])
+            for k, attr in enumerate(attrs):
+                if attr == cost_type:
+                    continue
+                skims[attr][i] = labels[k * node_size + centroid_nos]
+
+    for v in skims.values():
+        v[v >= MAX_LABEL_COST] = np.inf
+
+    if 'distance' in skims:
+        skims['distance'] *= base.network.len_unit_cf
+
+    return zone_ids, skims
+
+
+def save_skims(zone_ids, skims, file_path='skims.npz'):
+    """ save skims from compute_skims() to a compressed binary file
+
+    Parameters
+    ----------
+    zone_ids
+        list of zone ids from compute_skims()
+
+    skims
+        dict of 2D numpy arrays from compute_skims()
+
+    file_path
+        path of the output file, which is in the NumPy .npz format. The default
+        is skims.npz in the current working directory.
+
+    Returns
+    -------
+    None
+    """
+    np = _import_numpy()
+
+    if 'zone_ids' in skims:
+        raise Exception('zone_ids is reserved and cannot be used as a skim name')
+
+    np.savez_compressed(file_path, zone_ids=np.array(zone_ids, dtype=str), **skims)
+
+
+def load_skims(file_path='skims.npz'):
+    """ load skims saved by save_skims()
+
+    Parameters
+    ----------
+    file_path
+        path of the file saved by save_skims(). The default is skims.npz in the
+        current working directory.
+
+    Returns
+    -------
+    zone_ids
+        list of zone ids, which gives the row and column order of each matrix.
+
+    skims
+        dict of 2D numpy arrays keyed by skim names.
+    """
+    np = _import_numpy()
+
+    with np.load(file_path, allow_pickle=False) as f:
+        zone_ids = f['zone_ids'].tolist()
+        skims = {k: f[k] for k in f.files if k != 'zone_ids'}
+
+    return zone_ids, skims
\ No newline at end of file
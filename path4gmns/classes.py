@@ -1,13 +1,20 @@
 import ctypes
+import os
 from collections import deque
 from copy import deepcopy
 from datetime import datetime
 from math import ceil, floor
 from random import choice, randint
 
-from .consts import EPSILON, MAX_LABEL_COST, SECONDS_IN_MINUTE, SECONDS_IN_HOUR
-from .path import benchmark_apsp, find_path_for_agents, find_shortest_path, \
-                  get_shortest_path_tree, single_source_shortest_path
+from .consts import ALLOWED_USES_ALL_MASK, EPSILON, LANDMARK_NUM, MAX_LABEL_COST, \
+                   MAX_MODE_NUM, MODE_ALL_MASK, MODE_OTHER_MASK, SECONDS_IN_MINUTE, \
+                   SECONDS_IN_HOUR, SP_TREE_CACHE_MEMORY
+from .path import benchmark_apsp, build_contraction_hierarchy, build_landmarks, \
+                  find_isochrone, find_path_for_agents, find_shortest_path, \
+                  find_shortest_paths, get_shortest_path_tree, \
+                  get_shortest_path_tree_arrays, get_sp_tree_cache_info, \
+                  multi_source_isochrones, set_sp_tree_cache, EngineGraph
+from .utils import _get_hilbert_index, _make_ctypes_array, _make_full_ctypes_array
 
 
 __all__ = ['UI']
@@ -78,7 +85,8 @@ class Link:
                  toll = 0,
                  allowed_uses='all',
                  geometry='',
-                 demand_period_size=1):
+                 demand_period_size=1,
+                 allowed_use_mask=ALLOWED_USES_ALL_MASK):
         """ the attributes of link """
         self.id = id
         self.link_no = link_no
@@ -98,6 +106,8 @@ class Link:
         # capacity is lane capacity per hour
         self.link_capacity = capacity * lanes
         self.allowed_uses = allowed_uses
+        # allowed_uses in terms of bit mask for the path engine
+        self.allowed_use_mask = allowed_use_mask
         self.geometry = geometry
         # add for CG
         self.demand_period_size = demand_period_size
@@ -420,8 +430,29 @@ class Network:
         self.node_label_cost = None
         self.node_preds = None
         self.link_preds = None
+        # key: mode mask, value: handle to the graph object in the C++ path
+        # engine, which only consists of links open to this mode
+        self.graphs = {}
         self.capi_allocated = False
+        # number of source nodes and threads that the batch buffers can hold
+        self.batch_size = 0
+        self.thread_num = 0
+        # number of secondary labels that the batch buffer can hold
+        self.batch_attr_size = 0
+        # number of paths and links that the path buffers can hold
+        self.path_size = 0
+        self.path_link_size = 0
+        # shortest path trees kept for repair (see DynamicSPTrees)
+        self.dynamic_sp_trees = None
+        # key: tuple of link attribute names, value: their values in a row
+        self.link_attrs = {}
+        # key: link cost key (see get_link_cost_key()), value: link costs
+        self.link_cost_arrays = {}
+        self.link_cost_version = 0
+        self.cost_type = 'time'
         self.agent_type_name = 'all'
+        # key: mode (i.e., agent type name), value: bit mask for allowed uses
+        self.mode_masks = {}
         # key: zone id, value: zone object
         self.zones = {}
         self.activity_node_num = 0
@@ -438,31 +469,143 @@ class Network:
             z.get_activity_nodes_num() for z in self.zones.values()
         )
 
+    def reorder_nodes(self, node_order):
+        """ renumber nodes such that adjacent nodes have close node no's
+
+        node_order is either 'rcm' (reverse Cuthill-McKee on the topology
+        regardless of link directions) or 'hilbert' (Hilbert curve on node
+        coordinates). The labels and predecessors of adjacent nodes are then
+        close to each other in the buffers of the path engine.
+
+        node_no of each node, map_id_to_no, map_no_to_id, and the end nodes of
+        each link are updated accordingly while node ids and link seq no's stay
+        the same. It must be called before allocate_for_CAPI() and
+        add_centroids_connectors() such that centroids still come after all
+        other nodes.
+        """
+        if self.capi_allocated or self.centroids_added:
+            raise Exception(
+                'nodes can only be reordered before the network is in use'
+            )
+
+        if node_order == 'rcm':
+            order = self._get_rcm_order()
+        elif node_order == 'hilbert':
+            order = self._get_hilbert_order()
+        else:
+            raise Exception(
+                f'{node_order} is not a valid node order! '
+                "Please choose one from ['rcm', 'hilbert']"
+            )
+
+        self.nodes[:] = [self.nodes[i] for i in order]
+        self.map_id_to_no.clear()
+        self.map_no_to_id.clear()
+        for node_no, node in enumerate(self.nodes):
+            node.node_no = node_no
+            self.map_id_to_no[node.node_id] = node_no
+            self.map_no_to_id[node_no] = node.node_id
+
+        for link in self.links:
+            link.from_node_no = self.map_id_to_no[link.from_node_id]
+            link.to_node_no = self.map_id_to_no[link.to_node_id]
+
+    def _get_rcm_order(self):
+        """ node no's in the reverse Cuthill-McKee order
+
+        each connected component is traversed in breadth-first order from a
+        node of the minimum degree, where the neighbors of a node are visited in
+        ascending order of degree.
+        """
+        node_size = self.get_node_size()
+        neighbors = [set() for _ in range(node_size)]
+        for link in self.links:
+            if link.from_node_no != link.to_node_no:
+                neighbors[link.from_node_no].add(link.to_node_no)
+                neighbors[link.to_node_no].add(link.from_node_no)
+
+        degrees = [len(x) for x in neighbors]
+        visited = [False] * node_size
+        order = []
+
+        for start in sorted(range(node_size), key=degrees.__getitem__):
+            if visited[start]:
+                continue
+
+            visited[start] = True
+            queue = deque([start])
+            while queue:
+                node_no = queue.popleft()
+                order.append(node_no)
+                for x in sorted(neighbors[node_no], key=degrees.__getitem__):
+                    if not visited[x]:
+                        visited[x] = True
+                        queue.append(x)
+
+        order.reverse()
+        return order
+
+    def _get_hilbert_order(self, grid_order=16):
+        """ node no's in the order along the Hilbert curve
+
+        the bounding box of node coordinates is divided into a grid of
+        2^grid_order by 2^grid_order cells.
+        """
+        try:
+            xs = [float(node.coord_x) for node in self.nodes]
+            ys = [float(node.coord_y) for node in self.nodes]
+        except (TypeError, ValueError):
+            raise Exception(
+                'Hilbert curve order requires valid coordinates of all nodes'
+            )
+
+        if not xs:
+            return []
+
+        cell_num = (1 << grid_order) - 1
+        min_x, min_y = min(xs), min(ys)
+        scale = cell_num / max(max(xs) - min_x, max(ys) - min_y, EPSILON)
+
+        indices = [
+            _get_hilbert_index(
+                grid_order, int((x - min_x) * scale), int((y - min_y) * scale)
+            ) for x, y in zip(xs, ys)
+        ]
+
+        return sorted(range(len(indices)), key=indices.__getitem__)
+
     def allocate_for_CAPI(self):
         # execute only on the first call
         if self.capi_allocated:
             return
 
-        node_size = self.get_node_size()
-        link_size = self.get_link_size()
+        self._allocate_topology()
+        self._allocate_sp_buffers()
 
-        # initialization for predecessors and label costs
-        node_preds = [-1] * node_size
-        link_preds = [-1] * node_size
-        node_label_cost = [MAX_LABEL_COST] * node_size
+        self.capi_allocated = True
 
-        # initialize from_node_no_array, to_node_no_array, and link_cost_array
-        from_node_no_array = [link.from_node_no for link in self.links]
-        to_node_no_array = [link.to_node_no for link in self.links]
-        link_cost_array = [link.fftt for link in self.links]
+    def _allocate_topology(self):
+        """ allocate the arrays of network topology for the C++ path engine
+
+        they are immutable and shared by SPNetworks built on this network.
+        """
+        node_size = self.get_node_size()
+        link_size = self.get_link_size()
 
-        # initialize others
-        queue_next = [0] * node_size
-        first_link_from = [-1] * node_size
-        last_link_from = [-1] * node_size
-        sorted_link_no_array = [-1] * link_size
+        # the arrays are filled in C through array.array rather than from
+        # Python lists (see _make_ctypes_array())
+        self.from_node_no_array = _make_ctypes_array(
+            ctypes.c_int, (link.from_node_no for link in self.links)
+        )
+        self.to_node_no_array = _make_ctypes_array(
+            ctypes.c_int, (link.to_node_no for link in self.links)
+        )
 
         # internal link index used for shortest path calculation only
+        first_link_from = _make_full_ctypes_array(ctypes.c_int, node_size, -1)
+        last_link_from = _make_full_ctypes_array(ctypes.c_int, node_size, -1)
+        sorted_link_no_array = _make_full_ctypes_array(ctypes.c_int, link_size, -1)
+
         j = 0
         for i, node in enumerate(self.nodes):
             if not node.outgoing_links:
@@ -474,39 +617,157 @@ class Network:
                 j += 1
             last_link_from[i] = j
 
+        self.first_link_from = first_link_from
+        self.last_link_from = last_link_from
+        self.sorted_link_no_array = sorted_link_no_array
+        self.link_length_array = _make_ctypes_array(
+            ctypes.c_double, (link.length for link in self.links)
+        )
         # setup allowed uses
-        allowed_uses = [link.allowed_uses for link in self.links]
-
-        # set up arrays using ctypes
-        int_arr_node = ctypes.c_int * node_size
-        int_arr_link = ctypes.c_int * link_size
-        double_arr_node = ctypes.c_double * node_size
-        double_arr_link = ctypes.c_double * link_size
-        # for allowed_uses
-        char_arr_link = ctypes.c_wchar_p * link_size
-
-        self.from_node_no_array = int_arr_link(*from_node_no_array)
-        self.to_node_no_array = int_arr_link(*to_node_no_array)
-        self.first_link_from = int_arr_node(*first_link_from)
-        self.last_link_from = int_arr_node(*last_link_from)
-        self.sorted_link_no_array = int_arr_link(*sorted_link_no_array)
-        self.link_cost_array = double_arr_link(*link_cost_array)
-        self.node_label_cost = double_arr_node(*node_label_cost)
-        self.node_preds = int_arr_node(*node_preds)
-        self.link_preds = int_arr_node(*link_preds)
-        self.queue_next = int_arr_node(*queue_next)
-        self.allowed_uses = char_arr_link(*allowed_uses)
+        self.allowed_use_masks = _make_ctypes_array(
+            ctypes.c_uint, (link.allowed_use_mask for link in self.links)
+        )
 
-        self.capi_allocated = True
+        # node coordinates for A* search, which are left as None if any of
+        # them is not valid
+        try:
+            self.coord_x_array = _make_ctypes_array(
+                ctypes.c_double, (float(node.coord_x) for node in self.nodes)
+            )
+            self.coord_y_array = _make_ctypes_array(
+                ctypes.c_double, (float(node.coord_y) for node in self.nodes)
+            )
+        except (TypeError, ValueError):
+            self.coord_x_array = None
+            self.coord_y_array = None
+
+    def _share_topology(self, other):
+        """ use the topology arrays of other rather than allocating them """
+        self.from_node_no_array = other.from_node_no_array
+        self.to_node_no_array = other.to_node_no_array
+        self.first_link_from = other.first_link_from
+        self.last_link_from = other.last_link_from
+        self.sorted_link_no_array = other.sorted_link_no_array
+        self.link_length_array = other.link_length_array
+        self.allowed_use_masks = other.allowed_use_masks
+        self.coord_x_array = other.coord_x_array
+        self.coord_y_array = other.coord_y_array
+
+    def _allocate_sp_buffers(self):
+        """ allocate the link costs, labels, and predecessors of this network """
+        node_size = self.get_node_size()
+
+        # link costs of the current cost type, which are resident ones built on
+        # the previous topology otherwise
+        self.link_cost_arrays = {}
+        self.link_cost_version += 1
+        self.init_link_costs(self.cost_type)
+
+        # initialization for predecessors and label costs
+        self.node_label_cost = _make_full_ctypes_array(
+            ctypes.c_double, node_size, MAX_LABEL_COST
+        )
+        self.node_preds = _make_full_ctypes_array(ctypes.c_int, node_size, -1)
+        self.link_preds = _make_full_ctypes_array(ctypes.c_int, node_size, -1)
+        self.queue_next = (ctypes.c_int * node_size)()
+        # nodes within a time budget and their predecessor links
+        self.isochrone_nodes = (ctypes.c_int * node_size)()
+        self.isochrone_links = (ctypes.c_int * node_size)()
+
+    def allocate_for_batch(self, batch_size, thread_num=1, attr_num=0):
+        """ allocate buffers for shortest path trees from multiple source nodes
+
+        the shortest path tree of the i-th source node in a batch is stored in
+        each buffer starting from i * node_size. each thread has its own deque
+        in batch_queue_next. the secondary labels of attr_num link attributes
+        are stored in batch_attr_labels starting from i * attr_num * node_size.
+        the buffers are reallocated only if they are not large enough.
+        """
+        node_size = self.get_node_size()
+
+        if batch_size > self.batch_size:
+            buffer_size = batch_size * node_size
+
+            self.batch_label_costs = (ctypes.c_double * buffer_size)()
+            self.batch_node_preds = (ctypes.c_int * buffer_size)()
+            self.batch_link_preds = (ctypes.c_int * buffer_size)()
+
+            self.batch_size = batch_size
+
+        if thread_num > self.thread_num:
+            self.batch_queue_next = (ctypes.c_int * (thread_num * node_size))()
+            self.thread_num = thread_num
+
+        attr_size = batch_size * attr_num * node_size
+        if attr_size > self.batch_attr_size:
+            self.batch_attr_labels = (ctypes.c_double * attr_size)()
+            self.batch_attr_size = attr_size
+
+    def allocate_for_paths(self, path_size, link_num):
+        """ allocate buffers for the shortest paths retrieved by the C++ path engine
+
+        the links along the i-th path are stored in path_links from
+        path_offsets[i] to path_offsets[i + 1]. the buffers are reallocated
+        only if they are not large enough.
+        """
+        if path_size > self.path_size:
+            self.path_offsets = (ctypes.c_int * (path_size + 1))()
+            self.path_costs = (ctypes.c_double * path_size)()
+            self.path_dists = (ctypes.c_double * path_size)()
+            self.path_size = path_size
+
+        if link_num > self.path_link_size:
+            self.path_links = (ctypes.c_int * link_num)()
+            self.path_link_size = link_num
+
+    def _select_link_costs(self, key, get_link_costs, cost_type='time'):
+        """ point link_cost_array to the resident link costs under key
+
+        the link costs are only built from get_link_costs() on the first
+        request. cost_type is the one they count as, e.g., 'time' for the
+        generalized link costs.
+        """
+        if key not in self.link_cost_arrays:
+            self.link_cost_arrays[key] = _make_ctypes_array(
+                ctypes.c_double, get_link_costs()
+            )
+
+        self.link_cost_array = self.link_cost_arrays[key]
+        self.link_cost_key = key
+        self.cost_type = cost_type
 
     def init_link_costs(self, cost_type='time'):
+        """ switch link costs to free-flow travel time or length by cost_type
+
+        the link costs of each cost type are built once and kept resident. They
+        are selected without any copy afterwards.
+        """
         if cost_type == 'time':
-            link_costs = [link.fftt for link in self.links]
+            self._select_link_costs(
+                cost_type, lambda: (link.fftt for link in self.links), cost_type
+            )
         else:
-            link_costs = [link.length for link in self.links]
+            self._select_link_costs(
+                cost_type, lambda: (link.length for link in self.links), cost_type
+            )
 
-        double_arr_link = ctypes.c_double * self.get_link_size()
-        self.link_cost_array = double_arr_link(*link_costs)
+    def invalidate_link_costs(self):
+        """ discard the resident link costs once any link attribute changes
+
+        the link costs of the current cost type are rebuilt at once and the
+        others upon request.
+        """
+        self.link_cost_arrays = {}
+        self.link_cost_version += 1
+        self.init_link_costs(self.cost_type)
+
+    def update_link_cost_version(self):
+        """ mark the link costs in link_cost_array as modified in place
+
+        anything built on the previous link costs (e.g., the cached shortest
+        path trees) is outdated then.
+        """
+        self.link_cost_version += 1
 
     def add_centroids_connectors(self):
         if self.centroids_added:
@@ -584,6 +845,15 @@ class Network:
             node_no += 1
 
         self.centroids_added = True
+        # the topology has changed. force reallocation on the next call of
+        # allocate_for_CAPI() and allocate_for_batch(), and discard graphs
+        # built on the previous topology.
+        self.capi_allocated = False
+        self.graphs = {}
+        self.batch_size = 0
+        self.thread_num = 0
+        self.batch_attr_size = 0
+        self.link_attrs = {}
 
     def setup_agents(self, column_pool):
         agent_id = 1
@@ -762,11 +1032,73 @@ class Network:
     def get_link_costs(self):
         return self.link_cost_array
 
+    def get_link_lengths(self):
+        return self.link_length_array
+
+    def get_cost_type(self):
+        """ the cost type of the latest call of init_link_costs() """
+        return self.cost_type
+
+    def get_link_cost_key(self):
+        """ identify the link costs currently in link_cost_array
+
+        it consists of the key of the resident link costs and their version,
+        which is bumped once they are rebuilt or updated in place (see
+        update_link_cost_version()). The former is the cost type
+        (i.e., 'time' or 'distance') if the link costs come from
+        init_link_costs(), or the agent type, value of time, free-flow speed,
+        time_dependent, and demand period id of the generalized link costs for
+        accessibility evaluation.
+        """
+        return self.link_cost_key, self.link_cost_version
+
+    def get_link_attrs(self, attr_names):
+        """ values of link attributes in a row as one array for the path engine
+
+        attr_names can be any of 'distance', 'toll', and 'time' (i.e., free-flow
+        travel time). the array is set up on the first request.
+        """
+        attr_names = tuple(attr_names)
+        if attr_names not in self.link_attrs:
+            values = []
+            for name in attr_names:
+                if name.startswith('dis'):
+                    values.extend(link.get_length() for link in self.get_links())
+                elif name == 'toll':
+                    values.extend(link.get_toll() for link in self.get_links())
+                elif name == 'time':
+                    values.extend(
+                        link.get_free_flow_travel_time() for link in self.get_links()
+                    )
+                else:
+                    raise Exception(
+                        f'{name} is not a valid link attribute! '
+                        'Please choose one from distance, toll, and time'
+                    )
+
+            self.link_attrs[attr_names] = _make_ctypes_array(ctypes.c_double, values)
+
+        return self.link_attrs[attr_names]
+
     def get_queue_next(self):
         return self.queue_next
 
-    def get_allowed_uses(self):
-        return self.allowed_uses
+    def get_allowed_use_masks(self):
+        return self.allowed_use_masks
+
+    def get_node_coords(self):
+        return self.coord_x_array, self.coord_y_array
+
+    def get_graph(self):
+        """ graph in the path engine pruned to links open to the current mode
+
+        it is built on the first request and cached for subsequent calls.
+        """
+        mode_mask = self.get_mode_mask()
+        if mode_mask not in self.graphs:
+            self.graphs[mode_mask] = EngineGraph(self, mode_mask)
+
+        return self.graphs[mode_mask]
 
     def get_link(self, seq_no):
         return self.links[seq_no]
@@ -784,6 +1116,24 @@ class Network:
     def get_agents(self):
         return self.agents
 
+    def get_mode_masks(self):
+        return self.mode_masks
+
+    def get_mode_mask(self):
+        """ bit mask of agent type name for allowed uses in path engine
+
+        links open to all modes will be the only choices if agent type name is
+        not in settings.yml.
+        """
+        at_name = self.get_agent_type_name()
+        if at_name == 'all':
+            return MODE_ALL_MASK
+
+        try:
+            return self.get_mode_masks()[at_name]
+        except KeyError:
+            return MODE_OTHER_MASK
+
     def get_last_thru_node(self):
         """ node no of the first potential centroid """
         return self.last_thru_node
@@ -791,6 +1141,16 @@ class Network:
     def set_agent_type_name(self, at_name):
         self.agent_type_name = at_name
 
+    def set_mode_masks(self, modes):
+        """ assign one bit to each mode (i.e., agent type name) for allowed uses
+
+        the lowest bit is reserved for mode 'all'.
+        """
+        if len(modes) > MAX_MODE_NUM:
+            raise Exception(f'the number of agent types exceeds {MAX_MODE_NUM}')
+
+        self.mode_masks = {x: 1 << (i + 1) for i, x in enumerate(modes)}
+
     def get_centroids(self):
         for k, v in self.zones.items():
             if not k:
@@ -1129,8 +1489,24 @@ class SPNetwork(Network):
         self.demand_period = dp
         # zone sequence no
         self.orig_zones = []
-        self.capi_allocated = False
-        super().allocate_for_CAPI()
+        # graphs, topology arrays, and link attributes are shared by all
+        # SPNetworks as they have the same topology. each SPNetwork only owns
+        # its link costs, labels, and predecessors.
+        self.graphs = self.base.graphs
+        self.base.allocate_for_CAPI()
+        self._share_topology(self.base)
+        self.link_attrs = self.base.link_attrs
+        self.link_cost_arrays = {}
+        self.link_cost_version = 0
+        self.cost_type = 'time'
+        self.batch_size = 0
+        self.thread_num = 0
+        self.batch_attr_size = 0
+        self.path_size = 0
+        self.path_link_size = 0
+        self.dynamic_sp_trees = None
+        self._allocate_sp_buffers()
+        self.capi_allocated = True
 
     def allocate_for_CAPI(self):
         pass
@@ -1178,8 +1554,11 @@ class SPNetwork(Network):
     def get_sorted_link_no_arr(self):
         return super().get_sorted_link_no_arr()
 
-    def get_allowed_uses(self):
-        return super().get_allowed_uses()
+    def get_allowed_use_masks(self):
+        return super().get_allowed_use_masks()
+
+    def get_mode_masks(self):
+        return self.base.get_mode_masks()
 
     def get_node_preds(self):
         return super().get_node_preds()
@@ -1193,6 +1572,9 @@ class SPNetwork(Network):
     def get_link_costs(self):
         return super().get_link_costs()
 
+    def get_link_lengths(self):
+        return super().get_link_lengths()
+
     def get_queue_next(self):
         return super().get_queue_next()
 
@@ -1221,11 +1603,25 @@ class AccessNetwork(Network):
         self.map_id_to_no = self.base.map_id_to_no
         self.map_no_to_id = self.base.map_no_to_id
         self.centroids_added = self.base.centroids_added
+        # graphs will be reset if centroids and connectors are added
+        self.graphs = self.base.graphs
+        self.link_attrs = {}
+        self.link_cost_arrays = {}
+        self.link_cost_version = 0
+        # the link cost version of base which the resident link costs are
+        # built upon, as they are derived from the same links
+        self.base_link_cost_version = self.base.link_cost_version
+        self.cost_type = 'time'
         self.agent_type_name = 'all'
-        self.pre_source_node_id = ''
         if add_cc:
             self._add_centroids_connectors()
         self.capi_allocated = False
+        self.batch_size = 0
+        self.thread_num = 0
+        self.batch_attr_size = 0
+        self.path_size = 0
+        self.path_link_size = 0
+        self.dynamic_sp_trees = None
         super().allocate_for_CAPI()
 
     def _add_centroids_connectors(self):
@@ -1261,9 +1657,6 @@ class AccessNetwork(Network):
         """
         self.agent_type_name = mode
 
-    def set_source_node_id(self, node_id):
-        self.pre_source_node_id = node_id
-
     def get_agent_type_name(self):
         return self.agent_type_name
 
@@ -1312,11 +1705,17 @@ class AccessNetwork(Network):
     def get_link_costs(self):
         return super().get_link_costs()
 
+    def get_link_lengths(self):
+        return super().get_link_lengths()
+
     def get_queue_next(self):
         return super().get_queue_next()
 
-    def get_allowed_uses(self):
-        return super().get_allowed_uses()
+    def get_allowed_use_masks(self):
+        return super().get_allowed_use_masks()
+
+    def get_mode_masks(self):
+        return self.base.get_mode_masks()
 
     def get_last_thru_node(self):
         """ node no of the first centroid """
@@ -1327,54 +1726,82 @@ class AccessNetwork(Network):
         link_no = self.link_preds[self.get_node_no(node_id)]
         return self.links[link_no].get_link_id()
 
-    def get_sp_distance(self, node_no):
-        """ get the shortest path distance """
-        if self.link_preds[node_no] == -1:
+    def get_sp_distance(self, node_no, node_preds=None, link_preds=None):
+        """ get the shortest path distance
+
+        node_preds and link_preds are from the latest shortest path calculation
+        on this network if they are not specified.
+        """
+        if node_preds is None:
+            node_preds = self.node_preds
+        if link_preds is None:
+            link_preds = self.link_preds
+
+        if link_preds[node_no] == -1:
             return MAX_LABEL_COST
 
         dist = 0
         while node_no >= 0:
-            link_no = self.link_preds[node_no]
+            link_no = link_preds[node_no]
             if link_no >= 0:
                 dist += self.get_link(link_no).get_length()
 
-            node_no = self.node_preds[node_no]
+            node_no = node_preds[node_no]
 
         return dist
 
     def update_generalized_link_cost(self, at, time_dependent, demand_period_id):
-        """ update generalized link costs to calculate accessibility """
+        """ update generalized link costs to calculate accessibility
+
+        the generalized link costs of each agent type (and demand period if
+        time_dependent) are built once and kept resident along with those from
+        init_link_costs(). they are keyed by the value of time and free-flow
+        speed of the agent type as well, and discarded once any link attribute
+        changes, i.e., the link cost version of base is bumped (see
+        Network.invalidate_link_costs()).
+        """
+        if self.base_link_cost_version != self.base.link_cost_version:
+            self.base_link_cost_version = self.base.link_cost_version
+            self.invalidate_link_costs()
+
         vot = at.get_vot()
 
         if time_dependent:
-            for link in self.get_links():
-                # do not update connectors
-                if link.get_link_id().startswith('conn_'):
-                    continue
-
-                self.link_cost_array[link.get_seq_no()] = (
-                    link.get_period_fftt(demand_period_id)
+            key = (at.get_type_str(), vot, None, time_dependent, demand_period_id)
+
+            def get_link_costs():
+                return (
+                    # do not update connectors
+                    link.get_free_flow_travel_time()
+                    if link.get_link_id().startswith('conn_')
+                    else link.get_period_fftt(demand_period_id)
                     + link.get_route_choice_cost()
                     + link.get_toll() / max(EPSILON, vot) * 60
+                    for link in self.get_links()
                 )
         else:
-            if not at.use_link_ffs:
-                ffs = at.get_free_flow_speed()
+            ffs = None if at.use_link_ffs else at.get_free_flow_speed()
+            key = (at.get_type_str(), vot, ffs, time_dependent, 0)
 
-                for link in self.get_links():
-                    self.link_cost_array[link.get_seq_no()] = (
+            if not at.use_link_ffs:
+                def get_link_costs():
+                    return (
                         (link.get_length() / max(EPSILON, ffs) * 60)
                         + link.get_route_choice_cost()
                         + link.get_toll() / max(EPSILON, vot) * 60
+                        for link in self.get_links()
                     )
             else:
-                for link in self.get_links():
-                    self.link_cost_array[link.get_seq_no()] = (
+                def get_link_costs():
+                    return (
                         link.get_free_flow_travel_time()
                         + link.get_route_choice_cost()
                         + link.get_toll() / max(EPSILON, vot) * 60
+                        for link in self.get_links()
                     )
 
+        self._select_link_costs(key, get_link_costs)
+
 
 class Assignment:
 
@@ -1540,15 +1967,16 @@ class Assignment:
 
         raise Exception(f'{mode} is not existing in settings.yml! Please provide a valid mode!')
 
-    def find_path_for_agents(self, mode, cost_type):
+    def find_path_for_agents(self, mode, cost_type, engine='mlc'):
         """ find and set up shortest path for each agent """
         # reset agent type str or mode according to user's input
         at_name, _ = self._convert_mode(mode)
         self.network.set_agent_type_name(at_name)
 
-        find_path_for_agents(self.network, self.column_pool, cost_type)
+        find_path_for_agents(self.network, self.column_pool, cost_type, engine)
 
-    def find_shortest_path(self, from_node_id, to_node_id, mode, seq_type, cost_type):
+    def find_shortest_path(self, from_node_id, to_node_id, mode, seq_type,
+                           cost_type, engine='mlc'):
         """ call find_shortest_path() from path.py
 
         exceptions will be handled in find_shortest_path()
@@ -1562,9 +1990,21 @@ class Assignment:
         to_node_id = str(to_node_id)
 
         return find_shortest_path(self.network, from_node_id,
-                                  to_node_id, seq_type, cost_type)
+                                  to_node_id, seq_type, cost_type, engine)
 
-    def get_shortest_path_tree(self, from_node_id, mode, seq_type, cost_type):
+    def find_shortest_paths(self, od_pairs, mode, cost_type, engine='mlc'):
+        # reset agent type str or mode according to user's input
+        at_name, _ = self._convert_mode(mode)
+        self.network.set_agent_type_name(at_name)
+
+        costs, offsets, links = find_shortest_paths(self.network, od_pairs,
+                                                    cost_type, engine)
+        link_ids = [link.get_link_id() for link in self.get_links()]
+
+        return costs, offsets, links, link_ids
+
+    def get_shortest_path_tree(self, from_node_id, mode, seq_type, cost_type,
+                               engine='mlc'):
         # reset agent type str or mode according to user's input
         at_name, _ = self._convert_mode(mode)
         self.network.set_agent_type_name(at_name)
@@ -1574,10 +2014,43 @@ class Assignment:
         from_node_id = str(from_node_id)
 
         return get_shortest_path_tree(self.network, from_node_id,
-                                      seq_type, cost_type, is_int)
+                                      seq_type, cost_type, is_int, engine)
+
+    def get_shortest_path_tree_arrays(self, from_node_id, mode, cost_type,
+                                      engine='mlc'):
+        # reset agent type str or mode according to user's input
+        at_name, _ = self._convert_mode(mode)
+        self.network.set_agent_type_name(at_name)
+
+        # add backward compatibility in case the user still use integer node id's
+        from_node_id = str(from_node_id)
+
+        return get_shortest_path_tree_arrays(self.network, from_node_id,
+                                             cost_type, engine)
+
+    def benchmark_apsp(self, engine='mlc'):
+        benchmark_apsp(self.network, engine)
+
+    def build_contraction_hierarchy(self, mode, cost_type, input_dir):
+        # reset agent type str or mode according to user's input
+        at_name, _ = self._convert_mode(mode)
+        self.network.set_agent_type_name(at_name)
+
+        file_path = os.path.join(input_dir, f'ch_{at_name}_{cost_type}.bin')
+        build_contraction_hierarchy(self.network, cost_type, file_path)
+
+    def build_landmarks(self, mode, cost_type, landmark_num):
+        # reset agent type str or mode according to user's input
+        at_name, _ = self._convert_mode(mode)
+        self.network.set_agent_type_name(at_name)
+
+        build_landmarks(self.network, cost_type, landmark_num)
 
-    def benchmark_apsp(self):
-        benchmark_apsp(self.network)
+    def set_sp_tree_cache(self, max_memory, clear):
+        set_sp_tree_cache(max_memory, clear)
+
+    def get_sp_tree_cache_info(self):
+        return get_sp_tree_cache_info()
 
     def _has_outgoing_links(self, zone_id):
         return self.network.zones[zone_id].get_centroid().has_outgoing_links()
@@ -1636,24 +2109,10 @@ class Assignment:
     def get_node_label_cost(self, node_no):
         return self.accessnetwork.get_node_label_cost(node_no)
 
-    def get_accessible_nodes(self, source_node_id, time_budget,
-                             mode, time_dependent, tau):
-        source_node_id = str(source_node_id)
-        if source_node_id not in self.network.map_id_to_no:
-            raise Exception(f'Node ID: {source_node_id} not in the network')
-
-        if time_budget <= 0:
-            return []
-
+    def _update_access_network(self, mode, time_dependent, tau):
         if not self.accessnetwork:
             self.accessnetwork = AccessNetwork(self.network, False)
 
-        # simple caching to avoid duplicate shortest path calculation
-        run_sp = False
-        if self.accessnetwork.pre_source_node_id != source_node_id:
-            self.accessnetwork.set_source_node_id(source_node_id)
-            run_sp = True
-
         at_name, at_str = self._convert_mode(mode)
         if self.accessnetwork.agent_type_name != at_name:
             self.accessnetwork.set_target_mode(at_name)
@@ -1661,32 +2120,56 @@ class Assignment:
             self.accessnetwork.update_generalized_link_cost(at,
                                                             time_dependent,
                                                             tau)
-            run_sp = True
 
-        if run_sp:
-            single_source_shortest_path(self.accessnetwork, source_node_id)
+    def _find_isochrone(self, source_node_id, time_budget,
+                        mode, time_dependent, tau, reverse):
+        """ node no's within time_budget and their predecessor link no's """
+        source_node_id = str(source_node_id)
+        if source_node_id not in self.network.map_id_to_no:
+            raise Exception(f'Node ID: {source_node_id} not in the network')
 
-        # if max min travel time is less than or equal to time_budget,
-        # output the entire node set directly without the following check?
-        nodes = []
-        for node in self.accessnetwork.get_nodes():
-            # do not include the source node itself
-            if node.get_node_id() == source_node_id:
-                continue
+        if time_budget <= 0:
+            return [], []
+
+        self._update_access_network(mode, time_dependent, tau)
 
-            node_no = node.get_node_no()
-            if self.accessnetwork.get_node_label_cost(node_no) <= time_budget:
-                nodes.append(node.get_node_id())
+        # only the nodes within time_budget are touched by the path engine.
+        # for reverse, they are the ones reaching source_node_id in one sweep.
+        return find_isochrone(self.accessnetwork, source_node_id, time_budget,
+                              reverse=reverse)
 
-        return nodes
+    def get_accessible_nodes(self, source_node_id, time_budget,
+                             mode, time_dependent, tau, reverse=False):
+        node_nos, _ = self._find_isochrone(source_node_id, time_budget,
+                                           mode, time_dependent, tau, reverse)
+
+        return [self.accessnetwork.map_no_to_id[x] for x in node_nos]
 
     def get_accessible_links(self, source_node_id, time_budget,
-                             mode, time_dependent, tau):
-        # node id's
-        nodes = self.get_accessible_nodes(source_node_id, time_budget,
-                                          mode, time_dependent, tau)
-        # convert to link id's
-        return [self.accessnetwork.get_pred_link_id(x) for x in nodes]
+                             mode, time_dependent, tau, reverse=False):
+        # predecessor links of the accessible nodes, which are the first links
+        # of the paths to source_node_id for reverse
+        _, link_nos = self._find_isochrone(source_node_id, time_budget,
+                                           mode, time_dependent, tau, reverse)
+
+        return [self.accessnetwork.get_link(x).get_link_id() for x in link_nos]
+
+    def get_isochrones(self, source_node_ids, time_budgets,
+                       mode, time_dependent, tau, reverse=False):
+        source_node_ids = [str(x) for x in source_node_ids]
+        for x in source_node_ids:
+            if x not in self.network.map_id_to_no:
+                raise Exception(f'Node ID: {x} not in the network')
+
+        self._update_access_network(mode, time_dependent, tau)
+
+        offsets, counts, nodes, links = multi_source_isochrones(
+            self.accessnetwork, source_node_ids, time_budgets, reverse=reverse
+        )
+        node_ids = [node.get_node_id() for node in self.accessnetwork.get_nodes()]
+        link_ids = [link.get_link_id() for link in self.accessnetwork.get_links()]
+
+        return offsets, counts, nodes, links, node_ids, link_ids
 
     def get_total_simu_intervals(self):
         return ceil(self.simu_dur * 60 / self.simu_rez)
@@ -1801,6 +2284,7 @@ class Assignment:
 
         link = self.get_link(link_no)
         link.set_capacity_ratio(tau, r)
+        self.network.update_link_cost_version()
 
     def cast_interval_to_minute(self, i):
         return floor(i * self.simu_rez / SECONDS_IN_MINUTE)
@@ -1848,8 +2332,8 @@ class UI:
     def get_agent_num(self):
         return self._base_assignment.network.get_agent_count()
 
-    def get_shortest_path_tree(self, from_node_id,
-                               mode='all', seq_type='node', cost_type='time'):
+    def get_shortest_path_tree(self, from_node_id, mode='all', seq_type='node',
+                               cost_type='time', engine='mlc'):
         """ return the shorest path tree from the source node (from_node_id)
 
         Parameters
@@ -1872,6 +2356,15 @@ class UI:
             'time' or 'distance'. find the shortest path according travel time
             or travel distance.
 
+        engine
+            the shortest path algorithm, which can be 'mlc' (deque implementation
+            of the modified label correcting algorithm), 'dijkstra' (Dijkstra's
+            algorithm with binary heap), or 'dial' (Dial's algorithm with buckets).
+            They give the same path costs. The default is 'mlc'.
+
+            It can also be 'ch', which runs on the contraction hierarchy of the
+            network. See build_contraction_hierarchy() for details.
+
         Returns
         -------
         dictionary
@@ -1886,10 +2379,67 @@ class UI:
         """
 
         return self._base_assignment.get_shortest_path_tree(
-            from_node_id, mode, seq_type, cost_type
+            from_node_id, mode, seq_type, cost_type, engine
         )
 
-    def find_path_for_agents(self, mode='all', cost_type='time'):
+    def get_shortest_path_tree_arrays(self, from_node_id, mode='all',
+                                      cost_type='time', engine='mlc'):
+        """ get the shortest path tree from a node as NumPy arrays
+
+        Parameters
+        ----------
+        from_node_id
+            the starting node id
+
+        mode
+            the target transportation mode which is defined in settings.yml. It
+            can be either agent type or its name. For example, 'w' and 'walk'
+            are equivalent inputs.
+
+            The default is 'all', which means that links are open to all modes.
+
+        cost_type
+            'time' or 'distance'. find the shortest path tree according to
+            travel time or travel distance.
+
+        engine
+            the shortest path algorithm, which can be 'mlc', 'dijkstra',
+            'dial', or 'ch'. The default is 'mlc'.
+
+        Returns
+        -------
+        node_ids
+            NumPy array of node ids, where node_ids[i] is the one of node i.
+
+        label_costs
+            NumPy array of the shortest path cost to each node i, which is in
+            minutes for time or miles for distance.
+
+        node_preds
+            NumPy array of the predecessor node i of each node on the tree.
+
+        link_preds
+            NumPy array of the predecessor link no of each node on the tree.
+
+        Note
+        ----
+            label_costs, node_preds, and link_preds are views on the buffers of
+            the network without any copy. They are overwritten by the next call
+            of this function, find_shortest_path(), or get_shortest_path_tree().
+            Use numpy.copy() to keep them.
+
+            Both node_preds and link_preds are -1 for the starting node and any
+            node not accessible from it.
+
+            NumPy is required, which can be installed along with path4gmns via
+            pip install path4gmns[numpy].
+        """
+        return self._base_assignment.get_shortest_path_tree_arrays(from_node_id,
+                                                                   mode,
+                                                                   cost_type,
+                                                                   engine)
+
+    def find_path_for_agents(self, mode='all', cost_type='time', engine='mlc'):
         """ DEPRECATED
 
         find and set up shortest path for each agent
@@ -1907,15 +2457,24 @@ class UI:
             'time' or 'distance'. find the shortest path according travel time
             or travel distance.
 
+        engine
+            the shortest path algorithm, which can be 'mlc' (deque implementation
+            of the modified label correcting algorithm), 'dijkstra' (Dijkstra's
+            algorithm with binary heap), or 'dial' (Dial's algorithm with buckets).
+            They give the same path costs. The default is 'mlc'.
+
+            It can also be 'ch', which runs on the contraction hierarchy of the
+            network. See build_contraction_hierarchy() for details.
+
         Returns
         -------
         None
         """
         self._agent_cost_type = cost_type
-        return self._base_assignment.find_path_for_agents(mode, cost_type)
+        return self._base_assignment.find_path_for_agents(mode, cost_type, engine)
 
-    def find_shortest_path(self, from_node_id, to_node_id,
-                           mode='all', seq_type='node', cost_type='time'):
+    def find_shortest_path(self, from_node_id, to_node_id, mode='all',
+                           seq_type='node', cost_type='time', engine='mlc'):
         """ return shortest path between from_node_id and to_node_id
 
         Parameters
@@ -1941,6 +2500,24 @@ class UI:
             'time' or 'distance'. find the shortest path according travel time
             or travel distance.
 
+        engine
+            the shortest path algorithm, which can be 'mlc' (deque implementation
+            of the modified label correcting algorithm), 'dijkstra' (Dijkstra's
+            algorithm with binary heap), or 'dial' (Dial's algorithm with buckets).
+            They give the same path costs. The default is 'mlc'.
+
+            It can also be 'ch', which runs on the contraction hierarchy of the
+            network. See build_contraction_hierarchy() for details.
+
+            'dijkstra' stops as soon as to_node_id is reached rather than
+            building the whole shortest path tree from from_node_id, which is
+            preferred for a large number of individual queries. It can also be
+            'bidirectional' (bidirectional Dijkstra's algorithm), which searches
+            from both nodes and usually visits even fewer nodes, or 'astar' (A*
+            search), which is guided by node coordinates in node.csv. 'alt' is
+            A* search guided by landmarks. See build_landmarks() for details.
+            'ch' also stops early in this case.
+
         Returns
         -------
         str
@@ -1956,15 +2533,73 @@ class UI:
             to_node_id,
             mode,
             seq_type,
-            cost_type
+            cost_type,
+            engine
         )
 
+    def find_shortest_paths(self, od_pairs, mode='all', cost_type='time',
+                            engine='mlc'):
+        """ find the shortest paths between many OD pairs at once
+
+        The OD pairs are grouped by origin and the shortest path tree from each
+        origin is only built once. The origins are processed in batches over
+        multiple threads by the C++ path engine.
+
+        Parameters
+        ----------
+        od_pairs
+            a sequence of (from_node_id, to_node_id), e.g., a list of tuples
+            or a 2D array with two columns.
+
+        mode
+            the target transportation mode which is defined in settings.yml. It
+            can be either agent type or its name. For example, 'w' and 'walk'
+            are equivalent inputs.
+
+            The default is 'all', which means that links are open to all modes.
+
+        cost_type
+            'time' or 'distance'. find the shortest paths according to travel
+            time or travel distance.
+
+        engine
+            the shortest path algorithm to build the shortest path trees, which
+            can be 'mlc', 'dijkstra', 'dial', or 'ch'. The default is 'mlc'.
+
+        Returns
+        -------
+        costs
+            NumPy array of the shortest path cost of each OD pair, which is inf
+            if the destination is not accessible from the origin.
+
+        offsets
+            NumPy array of size len(od_pairs) + 1. See links.
+
+        links
+            NumPy array of link seq no's, where the shortest path of the i-th
+            OD pair is links[offsets[i]:offsets[i+1]] from origin to
+            destination.
+
+        link_ids
+            list of link ids, where link_ids[j] is the one of link seq no j.
+
+        Note
+        ----
+            NumPy is required, which can be installed along with path4gmns via
+            pip install path4gmns[numpy].
+        """
+        return self._base_assignment.find_shortest_paths(od_pairs,
+                                                         mode,
+                                                         cost_type,
+                                                         engine)
+
     def get_accessible_nodes(self,
                              source_node_id,
                              time_budget,
                              mode='auto',
                              time_dependent=False,
-                             demand_period_id=0):
+                             demand_period_id=0,
+                             reverse=False):
         """ get the accessible nodes from a node given mode and time budget
 
         Parameters
@@ -1999,6 +2634,13 @@ class UI:
             Use it with time_dependent when there are multiple demand periods.
             Its default value is 0.
 
+        reverse
+            True or False. Its default value is False.
+
+            If True, get the nodes that can reach source_node_id within
+            time_budget instead, which are found in one sweep on the incoming
+            links rather than one sweep per upstream node.
+
         Returns
         -------
         int
@@ -2009,7 +2651,8 @@ class UI:
                                                            time_budget,
                                                            mode,
                                                            time_dependent,
-                                                           demand_period_id)
+                                                           demand_period_id,
+                                                           reverse)
 
         node_strs = ';'.join(str(x) for x in nodes)
 
@@ -2021,7 +2664,8 @@ class UI:
                              time_budget,
                              mode='auto',
                              time_dependent=False,
-                             demand_period_id=0):
+                             demand_period_id=0,
+                             reverse=False):
         """ get the accessible links from a node given mode and time budget
 
         Parameters
@@ -2056,6 +2700,13 @@ class UI:
             Use it with time_dependent when there are multiple demand periods.
             Its default value is 0.
 
+        reverse
+            True or False. Its default value is False.
+
+            If True, get the links from which source_node_id can be reached
+            within time_budget instead, which are found in one sweep on the
+            incoming links rather than one sweep per upstream node.
+
         Returns
         -------
         int
@@ -2066,13 +2717,106 @@ class UI:
                                                            time_budget,
                                                            mode,
                                                            time_dependent,
-                                                           demand_period_id)
+                                                           demand_period_id,
+                                                           reverse)
 
         link_strs = ';'.join(str(x) for x in links)
 
         print(f'number of accessible links is {len(links)}')
         print(f'accessible links are: {link_strs}')
 
+    def get_isochrones(self,
+                       source_node_ids,
+                       time_budgets,
+                       mode='auto',
+                       time_dependent=False,
+                       demand_period_id=0,
+                       reverse=False):
+        """ get the accessible nodes and links from many nodes given time budgets
+
+        Each source node only takes one search under the largest time budget,
+        and the source nodes are processed over multiple threads by the C++ path
+        engine.
+
+        Parameters
+        ----------
+        source_node_ids
+            a sequence of the starting node ids for evaluation
+
+        time_budgets
+            a sequence of the amounts of time to travel in minutes, e.g.,
+            [15, 30, 45, 60]
+
+        mode
+            the target transportation mode which is defined in settings.yml. It
+            can be either agent type or its name. For example, 'w' and 'walk'
+            are equivalent inputs.
+
+            The default is 'auto'.
+
+        time_dependent
+            True or False. Its default value is False.
+
+            If True, the accessibility will be evaluated using the period link
+            free-flow travel time (i.e., VDF_fftt). In other words, the
+            accessibility is time-dependent.
+
+            If False, the accessibility will be evaluated using the link length
+            and the free flow travel speed of each mode.
+
+        demand_period_id
+            The sequence number of demand period listed in demand_periods in
+            settings.yml. demand_period_id of the first demand_period is 0.
+
+            Use it with time_dependent when there are multiple demand periods.
+            Its default value is 0.
+
+        reverse
+            True or False. Its default value is False.
+
+            If True, get the nodes and links from which each source node can be
+            reached within the time budgets instead.
+
+        Returns
+        -------
+        offsets
+            NumPy array of size len(source_node_ids) + 1. See nodes.
+
+        counts
+            NumPy array of shape (len(source_node_ids), len(time_budgets)). See
+            nodes.
+
+        nodes
+            NumPy array of node seq no's, where the nodes accessible from the
+            i-th source node within the k-th time budget are
+            nodes[offsets[i]:offsets[i]+counts[i, k]] in ascending order of
+            travel time.
+
+        links
+            NumPy array of link seq no's in the same layout as nodes, which are
+            the last links of the paths to nodes (or the first links of the
+            paths from nodes if reverse is True).
+
+        node_ids
+            list of node ids, where node_ids[j] is the one of node seq no j.
+
+        link_ids
+            list of link ids, where link_ids[j] is the one of link seq no j.
+
+        Note
+        ----
+            The source node itself is not included.
+
+            NumPy is required, which can be installed along with path4gmns via
+            pip install path4gmns[numpy].
+        """
+        return self._base_assignment.get_isochrones(source_node_ids,
+                                                    time_budgets,
+                                                    mode,
+                                                    time_dependent,
+                                                    demand_period_id,
+                                                    reverse)
+
     def get_demand_period_str(self, demand_period_id):
         """ return the demand period name given its id
 
@@ -2093,5 +2837,131 @@ class UI:
         """
         self._base_assignment.get_demand_period_str(demand_period_id)
 
-    def benchmark_apsp(self):
-        self._base_assignment.benchmark_apsp()
+    def benchmark_apsp(self, engine='mlc'):
+        self._base_assignment.benchmark_apsp(engine)
+
+    def build_contraction_hierarchy(self, mode='all', cost_type='time',
+                                    input_dir='.'):
+        """ build the contraction hierarchy (CH) of the network
+
+        CH preprocesses the network under fixed link costs, after which each
+        query only searches a small portion of it. It is used by any shortest
+        path function with engine='ch' and shall be considered for a large
+        number of queries with static link costs (e.g., distance or free-flow
+        travel time).
+
+        Parameters
+        ----------
+        mode
+            the target transportation mode which is defined in settings.yml. It
+            can be either agent type or its name. For example, 'w' and 'walk'
+            are equivalent inputs.
+
+            The default is 'all', which means that links are open to all modes.
+
+        cost_type
+            'time' or 'distance'. build CH according to travel time or travel
+            distance.
+
+        input_dir
+            The directory of node.csv and link.csv. CH is saved to it as
+            ch_[mode]_[cost_type].bin and will be reused next time as long as
+            the network and link costs are unchanged. The default is the current
+            working directory (CDW).
+
+        Returns
+        -------
+        None
+
+        Note
+        ----
+            Without calling this function, CH will be built on the first query
+            with engine='ch' but not saved. CH is rebuilt automatically once
+            the link costs change.
+        """
+        self._base_assignment.build_contraction_hierarchy(mode, cost_type,
+                                                          input_dir)
+
+
+    def build_landmarks(self, mode='all', cost_type='time',
+                        landmark_num=LANDMARK_NUM):
+        """ build landmarks of the network for the ALT search
+
+        The ALT search is A* search using the shortest path costs from and to
+        each landmark as lower bounds (via the triangle inequality), which is
+        used by find_shortest_path() with engine='alt'.
+
+        Unlike contraction hierarchy, landmarks built under free-flow conditions
+        remain valid for any congested link costs (e.g., after find_ue()) as
+        they are still lower bounds. Therefore, they are never rebuilt. Instead,
+        the ALT search falls back to Dijkstra's algorithm once any link cost
+        drops below the one upon construction.
+
+        Parameters
+        ----------
+        mode
+            the target transportation mode which is defined in settings.yml. It
+            can be either agent type or its name. For example, 'w' and 'walk'
+            are equivalent inputs.
+
+            The default is 'all', which means that links are open to all modes.
+
+        cost_type
+            'time' or 'distance'. build landmarks according to travel time or
+            travel distance.
+
+        landmark_num
+            the number of landmarks. More landmarks usually give tighter lower
+            bounds at the cost of memory (two arrays of node size for each). The
+            default is 8.
+
+        Returns
+        -------
+        None
+
+        Note
+        ----
+            Without calling this function, landmarks will be built using the
+            link costs upon the first query with engine='alt'.
+        """
+        self._base_assignment.build_landmarks(mode, cost_type, landmark_num)
+
+    def set_sp_tree_cache(self, max_memory=SP_TREE_CACHE_MEMORY, clear=False):
+        """ set up the cache of shortest path trees
+
+        The shortest path trees from find_shortest_path() and
+        get_shortest_path_tree() are cached in a least recently used (LRU)
+        manner and reused by the subsequent calls with the same source node,
+        mode, and link costs.
+
+        Parameters
+        ----------
+        max_memory
+            the maximum memory in bytes taken by the cached trees, where each
+            tree takes 16 bytes per node. The caching is disabled if it is 0.
+            The default is 64 MB.
+
+        clear
+            True or False. If True, remove all the cached trees and reset the
+            hit and miss counters. The default is False.
+
+        Returns
+        -------
+        None
+        """
+        self._base_assignment.set_sp_tree_cache(max_memory, clear)
+
+    def get_sp_tree_cache_info(self):
+        """ get the statistics of the cache of shortest path trees
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            the number of hits and misses, the number of cached trees, the
+            memory taken by them in bytes, and the maximum memory allowed.
+        """
+        return self._base_assignment.get_sp_tree_cache_info()
\ No newline at end of file
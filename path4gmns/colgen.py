@@ -1,6 +1,7 @@
 from time import time
 
-from .path import single_source_shortest_path
+from .path import backtrace_shortest_paths, dynamic_multi_source_shortest_path, \
+                  multi_source_shortest_path
 from .classes import Column
 from .consts import EPSILON, MAX_LABEL_COST, MIN_COL_VOL
 
@@ -22,6 +23,8 @@ def _update_link_cost_array(spnetworks):
                 link.get_generalized_cost(tau, vot)
             )
 
+        sp.update_link_cost_version()
+
 
 def _update_link_travel_time(links):
     for link in links:
@@ -126,7 +129,8 @@ def _update_column_gradient_cost_and_flow(column_pool, links, agent_types, iter_
 
 def _backtrace_shortest_path_tree(centroid,
                                   centroids,
-                                  links,
+                                  spn,
+                                  node_costs,
                                   node_preds,
                                   link_preds,
                                   at_id,
@@ -137,31 +141,30 @@ def _backtrace_shortest_path_tree(centroid,
     oz_id = centroid.get_zone_id()
     k_path_prob = 1 / (iter_num + 1)
 
-    for c in centroids:
+    dest_centroids = [
+        c for c in centroids if c.get_zone_id() != oz_id
+        and (at_id, dp_id, oz_id, c.get_zone_id()) in column_pool
+    ]
+
+    # retrieve all paths in one call to the path engine
+    offsets, path_links, _, path_dists = backtrace_shortest_paths(
+        spn,
+        [c.get_node_no() for c in dest_centroids],
+        node_costs,
+        node_preds,
+        link_preds
+    )
+
+    for i, c in enumerate(dest_centroids):
         dz_id = c.get_zone_id()
-        if dz_id == oz_id:
-            continue
-
-        if (at_id, dp_id, oz_id, dz_id) not in column_pool:
-            continue
-
         cv = column_pool[(at_id, dp_id, oz_id, dz_id)]
         # disable it as it is always false
         # if cv.is_route_fixed():
         #     continue
 
-        link_path = []
-        dist = 0
-
-        curr_node_no = c.get_node_no()
-        # retrieve the sequence backwards
-        while curr_node_no >= 0:
-            curr_link_no = link_preds[curr_node_no]
-            if curr_link_no >= 0:
-                link_path.append(curr_link_no)
-                dist += links[curr_link_no].length
-
-            curr_node_no = node_preds[curr_node_no]
+        # the link sequence is backwards
+        link_path = path_links[offsets[i]:offsets[i+1]]
+        dist = path_dists[i]
 
         # make sure this is a valid path
         if not link_path:
@@ -259,15 +262,26 @@ def _update_column_attributes(column_pool, links, agent_types, spnetworks):
     return rel_gap
 
 
-def _generate(spn, column_pool, iter_num):
-    for c in spn.get_orig_centroids():
-        single_source_shortest_path(spn, c.get_node_id())
+def _generate(spn, column_pool, iter_num, dynamic_sp=False):
+    orig_centroids = list(spn.get_orig_centroids())
+    # repair the trees from the previous iteration rather than rebuilding them
+    if dynamic_sp:
+        sp_trees = dynamic_multi_source_shortest_path(
+            spn, [c.get_node_id() for c in orig_centroids]
+        )
+    else:
+        sp_trees = multi_source_shortest_path(
+            spn, [c.get_node_id() for c in orig_centroids]
+        )
+
+    for c, (node_costs, node_preds, link_preds) in zip(orig_centroids, sp_trees):
         _backtrace_shortest_path_tree(
             c,
             spn.get_centroids(),
-            spn.get_links(),
-            spn.get_node_preds(),
-            spn.get_link_preds(),
+            spn,
+            node_costs,
+            node_preds,
+            link_preds,
             spn.get_agent_type().get_id(),
             spn.get_demand_period().get_id(),
             column_pool,
@@ -275,11 +289,11 @@ def _generate(spn, column_pool, iter_num):
         )
 
 
-def _generate_column_pool(spnetworks, column_pool, iter_num):
+def _generate_column_pool(spnetworks, column_pool, iter_num, dynamic_sp=False):
     # single processing
     # it could be multiprocessing
     for spn in spnetworks:
-        _generate(spn, column_pool, iter_num)
+        _generate(spn, column_pool, iter_num, dynamic_sp)
 
 
 def update_links_using_columns(network):
@@ -294,7 +308,8 @@ def update_links_using_columns(network):
     _update_link_travel_time(links)
 
 
-def find_ue(ui, column_gen_num, column_upd_num, rel_gap_tolerance=1e-04):
+def find_ue(ui, column_gen_num, column_upd_num, rel_gap_tolerance=1e-04,
+            dynamic_sp=False):
     """ find user equilibrium (UE)
 
     WARNING
@@ -320,6 +335,14 @@ def find_ue(ui, column_gen_num, column_upd_num, rel_gap_tolerance=1e-04):
         target relative gap. find_ue() stops when either column_upd_num or
         rel_gap_tolerance is reached.
 
+    dynamic_sp
+        True or False. If True, the shortest path trees from the previous
+        column generation iteration (or the previous call of find_ue()) are
+        kept and only repaired for the links with their costs changed, which
+        falls back to rebuilding a tree once too many of its nodes are
+        affected. The repaired trees are exact shortest path trees under the
+        current generalized link costs. The default is False.
+
     Returns
     -------
     rel_gap
@@ -355,7 +378,7 @@ def find_ue(ui, column_gen_num, column_upd_num, rel_gap_tolerance=1e-04):
         # update generalized link cost before assignment
         _update_link_cost_array(A.get_spnetworks())
         # loop through all centroids on the base network
-        _generate_column_pool(A.get_spnetworks(), column_pool, i)
+        _generate_column_pool(A.get_spnetworks(), column_pool, i, dynamic_sp)
 
     print(f'\nprocessing time of generating columns: {time()-st:.2f}s\n')
     st = time()
@@ -2,6 +2,23 @@
 # for shortest path calculation
 MAX_LABEL_COST = 2147483647
 EPSILON = 0.00001
+# maximum number of source nodes processed in one call of the C++ path engine
+MAX_SP_BATCH_SIZE = 64
+# maximum memory in bytes taken by the cached shortest path trees
+SP_TREE_CACHE_MEMORY = 64 * 1024 * 1024
+# maximum memory in bytes taken by the shortest path trees kept for repair
+DYNAMIC_SP_MEMORY = 256 * 1024 * 1024
+# a tree is rebuilt rather than repaired beyond this share of affected nodes
+DYNAMIC_SP_AFFECTED_RATIO = 0.1
+# default number of landmarks for the ALT search
+LANDMARK_NUM = 8
+# allowed uses of links in terms of bit masks, where the lowest bit is reserved
+# for mode 'all' (i.e., every link is open to it) and the highest bit is for
+# modes not in settings.yml (i.e., only links open to all modes are available)
+MODE_ALL_MASK = 1
+MODE_OTHER_MASK = 1 << 31
+ALLOWED_USES_ALL_MASK = 0xFFFFFFFF
+MAX_MODE_NUM = 30
 # for column generation
 MIN_COL_VOL = 0.1
 # for accessibility evaluation
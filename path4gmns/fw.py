@@ -1,8 +1,9 @@
+import ctypes
 from time import time
 
 from .colgen import _update_link_cost_array, _update_link_travel_time
 from .consts import EPSILON, LINE_SEARCH_MAX_ITER
-from .path import single_source_shortest_path
+from .path import load_shortest_path_tree, multi_source_shortest_path
 
 
 __all__ = ['find_ue_fw']
@@ -12,46 +13,43 @@ _total_sys_travel_time = dict()
 _total_min_sys_travel_time = dict()
 
 
-def _aon_assignment(centroid,
-                    centroids,
-                    links,
-                    node_preds,
-                    link_preds,
-                    node_costs,
-                    at_id,
-                    dp_id,
-                    column_pool):
+def _get_aon_demands(spn, column_pool):
+    """ destination centroids and volumes from each origin centroid of spn
 
-    oz_id = centroid.get_zone_id()
-    for c in centroids:
-        dz_id = c.get_zone_id()
-        if dz_id == oz_id:
-            continue
-
-        if (at_id, dp_id, oz_id, dz_id) not in column_pool:
-            continue
-
-        link_path = []
-        curr_node_no = c.get_node_no()
-        cost = node_costs[curr_node_no]
-
-        # retrieve the sequence backwards
-        while curr_node_no >= 0:
-            curr_link_no = link_preds[curr_node_no]
-            if curr_link_no >= 0:
-                link_path.append(curr_link_no)
-
-            curr_node_no = node_preds[curr_node_no]
-
-        # make sure this is a valid path
-        if not link_path:
-            continue
-
-        cv = column_pool[(at_id, dp_id, oz_id, dz_id)]
-        vol = cv.get_od_volume()
-        _total_min_sys_travel_time[dp_id] += vol * cost
+    they are set up as ctypes arrays only once for all-or-nothing loading
+    in each iteration.
+    """
+    at_id = spn.get_agent_type().get_id()
+    dp_id = spn.get_demand_period().get_id()
+    centroids = list(spn.get_centroids())
+
+    aon_demands = []
+    for c in spn.get_orig_centroids():
+        oz_id = c.get_zone_id()
+
+        dest_node_nos = []
+        dest_vols = []
+        for c_ in centroids:
+            dz_id = c_.get_zone_id()
+            if dz_id == oz_id:
+                continue
+
+            if (at_id, dp_id, oz_id, dz_id) not in column_pool:
+                continue
+
+            cv = column_pool[(at_id, dp_id, oz_id, dz_id)]
+            dest_node_nos.append(c_.get_node_no())
+            dest_vols.append(cv.get_od_volume())
+
+        dest_size = len(dest_node_nos)
+        aon_demands.append(
+            (
+                (ctypes.c_int * dest_size)(*dest_node_nos),
+                (ctypes.c_double * dest_size)(*dest_vols)
+            )
+        )
 
-        [links[i].update_aux_flows(dp_id, vol) for i in link_path[1:-1]]
+    return aon_demands
 
 
 def _get_derivative(links, tau, vot, alpha):
@@ -78,34 +76,45 @@ def _update_link_flows(spnetworks, enables_line_search=True):
             link.calculate_td_vdf()
 
 
-def _update_auxiliary_flows(spnetworks, links, column_pool):
-    # reset auxiliary flows for all links (except connectors)
-    for link in links:
-        if not link.length:
-            break
-
-        link.reset_period_aux_flows()
-
+def _update_auxiliary_flows(spnetworks, links, aon_demands):
     # reset the minimum total travel time for each demand period
     for tau in _total_min_sys_travel_time:
         _total_min_sys_travel_time[tau] = 0
 
+    # auxiliary flows of all links by demand period
+    aux_flows = {
+        tau: (ctypes.c_double * len(links))() for tau in _total_min_sys_travel_time
+    }
+
     # find the new shortest paths
-    for spn in spnetworks:
-        for c in spn.get_orig_centroids():
-            single_source_shortest_path(spn, c.get_node_id())
-            _aon_assignment(
-                c,
-                spn.get_centroids(),
-                spn.get_links(),
-                spn.get_node_preds(),
-                spn.get_link_preds(),
-                spn.get_node_label_costs(),
-                spn.get_agent_type().get_id(),
-                spn.get_demand_period().get_id(),
-                column_pool
+    for spn, demands in zip(spnetworks, aon_demands):
+        tau = spn.get_demand_period().get_id()
+        orig_centroids = list(spn.get_orig_centroids())
+        sp_trees = multi_source_shortest_path(
+            spn, [c.get_node_id() for c in orig_centroids]
+        )
+
+        # all-or-nothing loading on each shortest path tree
+        for sp_tree, (dest_node_nos, dest_vols) in zip(sp_trees, demands):
+            node_costs, node_preds, link_preds = sp_tree
+            _total_min_sys_travel_time[tau] += load_shortest_path_tree(
+                spn,
+                node_costs,
+                node_preds,
+                link_preds,
+                dest_node_nos,
+                dest_vols,
+                aux_flows[tau]
             )
 
+    # update auxiliary flows for all links (except connectors)
+    for link in links:
+        if not link.length:
+            break
+
+        for tau, flows in aux_flows.items():
+            link.period_aux_flows[tau] = flows[link.get_seq_no()]
+
 
 def _line_search(links, tau, vot, tolerance=1e-06):
     """ conduct demand period specific line search """
@@ -217,15 +226,16 @@ def find_ue_fw(ui, max_iter=40, rel_gap_tolerance=1e-04):
 
     # initialization
     _init_sys_tt(demand_period_count)
+    aon_demands = [_get_aon_demands(spn, column_pool) for spn in A.get_spnetworks()]
     _update_link_travel_time(links)
     _update_link_cost_array(A.get_spnetworks())
-    _update_auxiliary_flows(A.get_spnetworks(), links, column_pool)
+    _update_auxiliary_flows(A.get_spnetworks(), links, aon_demands)
     _update_link_flows(A.get_spnetworks(), enables_line_search=False)
 
     for i in range(max_iter):
         _update_link_travel_time(links)
         _update_link_cost_array(A.get_spnetworks())
-        _update_auxiliary_flows(A.get_spnetworks(), links, column_pool)
+        _update_auxiliary_flows(A.get_spnetworks(), links, aon_demands)
         _update_link_flows(A.get_spnetworks())
 
         max_gap = _compute_relative_gap(A, i)
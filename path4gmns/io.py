@@ -7,9 +7,9 @@ from .classes import Node, Link, Zone, Network, Column, ColumnVec, VDFPeriod, \
 
 from .colgen import update_links_using_columns
 from .consts import EPSILON
-from .utils import InvalidRecord, _convert_boundaries, _convert_str_to_float, \
-                   _convert_str_to_int, _get_time_stamp, get_len_unit_conversion_factor, \
-                   get_spd_unit_conversion_factor
+from .utils import InvalidRecord, _convert_allowed_uses, _convert_boundaries, \
+                   _convert_str_to_float, _convert_str_to_int, _get_time_stamp, \
+                   get_len_unit_conversion_factor, get_spd_unit_conversion_factor
 from .zonesyn import network_to_zones
 
 
@@ -157,6 +157,7 @@ def read_links(input_dir,
                demand_period_size,
                len_conversion_factor,
                spd_conversion_factor,
+               mode_masks,
                load_demand):
     """ step 2: read input_link """
     with open(input_dir+'/link.csv', 'r') as fp:
@@ -244,6 +245,8 @@ def read_links(input_dir,
             except (KeyError, InvalidRecord):
                 allowed_uses = 'all'
 
+            allowed_use_mask = _convert_allowed_uses(allowed_uses, mode_masks)
+
             # if link.csv does not have no column 'geometry',
             # set geometry to ''
             try:
@@ -272,7 +275,8 @@ def read_links(input_dir,
                         toll,
                         allowed_uses,
                         geometry,
-                        demand_period_size)
+                        demand_period_size,
+                        allowed_use_mask)
 
             # VDF Attributes
             for i in range(demand_period_size):
@@ -685,7 +689,8 @@ def read_settings(input_dir, assignment):
         raise e
 
 
-def read_network(length_unit='mile', speed_unit='mph', input_dir='.'):
+def read_network(length_unit='mile', speed_unit='mph', input_dir='.',
+                 node_order=None):
     # exception handlings on units are taken care by the following two functions
     len_cf = get_len_unit_conversion_factor(length_unit)
     spd_cf = get_spd_unit_conversion_factor(speed_unit)
@@ -697,6 +702,7 @@ def read_network(length_unit='mile', speed_unit='mph', input_dir='.'):
     network.len_unit_cf = len_cf
 
     read_settings(input_dir, assignm)
+    network.set_mode_masks([at.get_name() for at in assignm.get_agent_types()])
 
     read_nodes(input_dir,
                network.nodes,
@@ -713,8 +719,14 @@ def read_network(length_unit='mile', speed_unit='mph', input_dir='.'):
                assignm.get_demand_period_count(),
                len_cf,
                spd_cf,
+               network.get_mode_masks(),
                load_demand)
 
+    # nodes are numbered in the order of node.csv by default. otherwise, they
+    # are renumbered for memory locality (see Network.reorder_nodes()).
+    if node_order:
+        network.reorder_nodes(node_order)
+
     network.update()
     assignm.network = network
 
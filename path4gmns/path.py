@@ -1,11 +1,14 @@
 """ The Python interface connecting the C++ path engine and other Python APIs """
 import ctypes
 import platform
-from os import path
+import weakref
+from collections import OrderedDict
+from os import cpu_count, path
 from time import time
 
-from .consts import MAX_LABEL_COST
-from .utils import _convert_str_to_int, InvalidRecord
+from .consts import DYNAMIC_SP_AFFECTED_RATIO, DYNAMIC_SP_MEMORY, LANDMARK_NUM, \
+                    MAX_LABEL_COST, MAX_SP_BATCH_SIZE, SP_TREE_CACHE_MEMORY
+from .utils import _convert_str_to_int, _import_numpy, InvalidRecord
 
 
 _os = platform.system()
@@ -25,67 +28,1190 @@ else:
 
 _cdll = ctypes.cdll.LoadLibrary(_dll_file)
 
-# set up the argument types for the shortest path function in dll.
-_cdll.shortest_path_n.argtypes = [
+# set up the argument types for the shortest path functions in dll.
+_cdll.create_graph.argtypes = [
     ctypes.c_int,
     ctypes.c_int,
     ctypes.POINTER(ctypes.c_int),
     ctypes.POINTER(ctypes.c_int),
     ctypes.POINTER(ctypes.c_int),
     ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_uint),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int,
+    ctypes.c_uint
+]
+_cdll.create_graph.restype = ctypes.c_void_p
+
+_cdll.delete_graph.argtypes = [ctypes.c_void_p]
+
+_cdll.shortest_path_graph.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_bool
+]
+
+_cdll.shortest_path_p2p.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
     ctypes.POINTER(ctypes.c_int),
-    ctypes.POINTER(ctypes.c_wchar_p),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_double
+]
+
+_cdll.astar_heuristic_scale.argtypes = [
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_double),
     ctypes.POINTER(ctypes.c_double),
     ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int
+]
+_cdll.astar_heuristic_scale.restype = ctypes.c_double
+
+_cdll.shortest_path_batch.argtypes = [
+    ctypes.c_void_p,
     ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
     ctypes.POINTER(ctypes.c_int),
     ctypes.POINTER(ctypes.c_int),
-    ctypes.c_wchar_p,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int,
     ctypes.c_int,
     ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_bool
+]
+
+_cdll.backtrace_paths.argtypes = [
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double)
+]
+_cdll.backtrace_paths.restype = ctypes.c_int
+
+_cdll.repair_shortest_path_batch.argtypes = [
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_double,
+    ctypes.c_double
+]
+_cdll.repair_shortest_path_batch.restype = ctypes.c_int
+
+_cdll.load_shortest_path_tree.argtypes = [
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double)
+]
+_cdll.load_shortest_path_tree.restype = ctypes.c_double
+
+_cdll.isochrone.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_double,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int,
+    ctypes.c_bool
+]
+_cdll.isochrone.restype = ctypes.c_int
+
+_cdll.isochrone_batch.argtypes = [
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_bool
+]
+
+_cdll.create_ch.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_double)]
+_cdll.create_ch.restype = ctypes.c_void_p
+
+_cdll.load_ch.argtypes = [ctypes.c_char_p]
+_cdll.load_ch.restype = ctypes.c_void_p
+
+_cdll.save_ch.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+_cdll.save_ch.restype = ctypes.c_bool
+
+_cdll.delete_ch.argtypes = [ctypes.c_void_p]
+
+_cdll.is_ch_valid.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_double)
+]
+_cdll.is_ch_valid.restype = ctypes.c_bool
+
+_cdll.shortest_path_ch.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
     ctypes.c_int
 ]
 
+_cdll.shortest_path_ch_p2p.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int
+]
 
-# simple caching for _single_source_shortest_path()
-_prev_cost_type = 'time'
+_cdll.shortest_path_ch_batch.argtypes = [
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double)
+]
 
+_cdll.create_landmarks.argtypes = [
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.c_int
+]
+_cdll.create_landmarks.restype = ctypes.c_void_p
 
-def _optimal_label_correcting_CAPI(G, origin_node_no, departure_time=0):
-    """ call the deque implementation of MLC written in cpp
+_cdll.delete_landmarks.argtypes = [ctypes.c_void_p]
 
-    node_label_cost, node_predecessor, and link_predecessor are still
-    initialized in shortest_path_n() even the source node has no outgoing links.
-    """
-    _cdll.shortest_path_n(origin_node_no,
-                          G.get_node_size(),
-                          G.get_from_node_no_arr(),
-                          G.get_to_node_no_arr(),
-                          G.get_first_links(),
-                          G.get_last_links(),
-                          G.get_sorted_link_no_arr(),
-                          G.get_allowed_uses(),
-                          G.get_link_costs(),
-                          G.get_node_label_costs(),
-                          G.get_node_preds(),
-                          G.get_link_preds(),
-                          G.get_queue_next(),
-                          G.get_agent_type_name(),
-                          MAX_LABEL_COST,
-                          G.get_last_thru_node(),
-                          departure_time)
-
-
-def single_source_shortest_path(G, orig_node_id, cost_type='time'):
+_cdll.are_landmarks_valid.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_double)
+]
+_cdll.are_landmarks_valid.restype = ctypes.c_bool
+
+_cdll.shortest_path_alt.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_double),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int
+]
+
+
+# number of threads used by shortest_path_batch() in cpp. as a foreign function
+# called through ctypes.cdll, it releases the GIL during its execution.
+_thread_num = cpu_count() or 1
+
+
+# shortest path algorithms in the C++ path engine (i.e., enum SPEngine)
+_sp_engines = {'mlc': 0, 'dijkstra': 1, 'dial': 2}
+# the ones to find the shortest path between two nodes only
+_p2p_engines = {'dijkstra': 1, 'bidirectional': 3, 'astar': 4}
+# queries on the contraction hierarchy of the graph, which is built on demand
+_ch_engine = 'ch'
+# A* search using landmarks of the graph, which are built on demand
+_alt_engine = 'alt'
+
+
+class EngineGraph:
+    """ handle to the graph object built by the C++ path engine
+
+    the graph object holds the network topology (i.e., forward star) of G in the
+    engine, which is pruned to links open to mode_mask. it is built only once
+    and released when this handle is garbage collected. subsequent shortest
+    path calls only pass the handle rather than the topology arrays.
+    """
+    def __init__(self, G, mode_mask):
+        self.handle = _cdll.create_graph(G.get_node_size(),
+                                         G.get_link_size(),
+                                         G.get_to_node_no_arr(),
+                                         G.get_first_links(),
+                                         G.get_last_links(),
+                                         G.get_sorted_link_no_arr(),
+                                         G.get_allowed_use_masks(),
+                                         G.get_link_costs(),
+                                         G.get_last_thru_node(),
+                                         mode_mask)
+
+        # key: cost type, value: EngineCH built on this graph
+        self.chs = {}
+        # key: cost type, value: EngineLandmarks built on this graph
+        self.landmarks = {}
+        # key: network on this graph, value: its link cost key and the scale of
+        # the heuristic in A* search under them
+        self.astar_scales = weakref.WeakKeyDictionary()
+
+    def __del__(self):
+        _cdll.delete_graph(self.handle)
+
+    def get_astar_scale(self, G, coord_x, coord_y):
+        """ the scale of the heuristic in A* search under the link costs of G
+
+        it takes a sweep over all links and is only computed once the link
+        costs of G change.
+        """
+        key = G.get_link_cost_key()
+        try:
+            k, scale = self.astar_scales[G]
+            if k == key:
+                return scale
+        except KeyError:
+            pass
+
+        scale = _cdll.astar_heuristic_scale(self.handle,
+                                            G.get_link_costs(),
+                                            coord_x,
+                                            coord_y,
+                                            MAX_LABEL_COST)
+        self.astar_scales[G] = key, scale
+        return scale
+
+
+class EngineCH:
+    """ handle to the contraction hierarchy (CH) built by the C++ path engine
+
+    CH is built on an EngineGraph under the link costs at that time and answers
+    repeated queries much faster as long as the link costs stay the same. it
+    keeps a copy of these link costs to tell if it is still valid, which takes
+    a sweep over all links and is only checked once per link cost key of each
+    network (see Network.get_link_cost_key()).
+    """
+    def __init__(self, handle):
+        self.handle = handle
+        # key: network, value: its link cost key and whether CH is valid to it
+        self.checks = weakref.WeakKeyDictionary()
+
+    def __del__(self):
+        _cdll.delete_ch(self.handle)
+
+    def is_valid(self, G):
+        key = G.get_link_cost_key()
+        try:
+            k, valid = self.checks[G]
+            if k == key:
+                return valid
+        except KeyError:
+            pass
+
+        valid = _cdll.is_ch_valid(self.handle,
+                                  G.get_graph().handle,
+                                  G.get_link_costs())
+        self.checks[G] = key, valid
+        return valid
+
+
+def _get_engine_no(engine, engines=_sp_engines):
+    try:
+        return engines[engine]
+    except KeyError:
+        raise Exception(
+            f'{engine} is not a valid shortest path engine! '
+            f'Please choose one from {list(engines)}'
+        )
+
+
+class EngineLandmarks:
+    """ handle to the landmarks built by the C++ path engine for the ALT search
+
+    the landmarks hold the shortest path costs from and to each of them under
+    the link costs at that time. they remain valid as long as no link cost
+    drops below that, which is the case for free-flow travel time against any
+    congested travel time. like EngineCH, it is only checked once per link cost
+    key of each network.
+    """
+    def __init__(self, G, landmark_num):
+        self.handle = _cdll.create_landmarks(G.get_graph().handle,
+                                             G.get_link_costs(),
+                                             landmark_num)
+        # key: network, value: its link cost key and whether landmarks are valid
+        self.checks = weakref.WeakKeyDictionary()
+
+    def __del__(self):
+        _cdll.delete_landmarks(self.handle)
+
+    def is_valid(self, G):
+        key = G.get_link_cost_key()
+        try:
+            k, valid = self.checks[G]
+            if k == key:
+                return valid
+        except KeyError:
+            pass
+
+        valid = _cdll.are_landmarks_valid(self.handle,
+                                          G.get_graph().handle,
+                                          G.get_link_costs())
+        self.checks[G] = key, valid
+        return valid
+
+
+def build_landmarks(G, cost_type, landmark_num=LANDMARK_NUM):
+    """ select landmarks and compute their shortest path costs under cost_type
+
+    the landmarks are shared by any network (e.g., SPNetwork) on the same graph
+    and used with cost_type. build them under free-flow conditions before
+    link costs are updated by traffic assignment.
+    """
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+    G.get_graph().landmarks[cost_type] = EngineLandmarks(G, landmark_num)
+
+
+def _get_landmarks(G, cost_type):
+    """ get the landmarks of G under cost_type, which are built on demand """
+    landmarks = G.get_graph().landmarks
+    if cost_type not in landmarks:
+        landmarks[cost_type] = EngineLandmarks(G, LANDMARK_NUM)
+
+    return landmarks[cost_type]
+
+
+def _get_ch(G, cost_type):
+    """ get the CH of G under cost_type
+
+    it is built on the first request. if the link costs have changed since then,
+    the outdated one is discarded and a new one is built.
+    """
+    graph = G.get_graph()
+    ch = graph.chs.get(cost_type)
+    if ch is None or not ch.is_valid(G):
+        ch = EngineCH(_cdll.create_ch(graph.handle, G.get_link_costs()))
+        graph.chs[cost_type] = ch
+
+    return ch
+
+
+def build_contraction_hierarchy(G, cost_type, file_path):
+    """ prepare the CH of G under cost_type and persist it to file_path
+
+    the existing one in file_path is reused if it is still valid to G and the
+    current link costs. otherwise, a new one is built and saved to file_path.
+    """
     G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+
+    handle = _cdll.load_ch(file_path.encode())
+    if handle:
+        ch = EngineCH(handle)
+        if ch.is_valid(G):
+            G.get_graph().chs[cost_type] = ch
+            return
+
+    ch = _get_ch(G, cost_type)
+    if not _cdll.save_ch(ch.handle, file_path.encode()):
+        raise Exception(f'failed to save contraction hierarchy to {file_path}')
+
+
+def _optimal_label_correcting_CAPI(G, origin_node_no, departure_time=0,
+                                   engine='mlc', reverse=False):
+    """ call the shortest path engine written in cpp
+
+    engine is the deque implementation of MLC by default. It can also be
+    'dijkstra' (binary heap) or 'dial' (buckets).
 
-    global _prev_cost_type
-    if _prev_cost_type != cost_type:
+    node_label_cost, node_predecessor, and link_predecessor are still
+    initialized in shortest_path_graph() even the source node has no outgoing
+    links.
+
+    if reverse is True, the shortest path tree to origin_node_no is built on
+    the incoming links instead (see single_source_shortest_path()).
+    """
+    _cdll.shortest_path_graph(G.get_graph().handle,
+                              origin_node_no,
+                              G.get_link_costs(),
+                              G.get_node_label_costs(),
+                              G.get_node_preds(),
+                              G.get_link_preds(),
+                              G.get_queue_next(),
+                              _get_engine_no(engine),
+                              MAX_LABEL_COST,
+                              departure_time,
+                              None,
+                              0,
+                              None,
+                              not reverse)
+
+
+def _shortest_path_p2p_CAPI(G, orig_node_no, dest_node_no, departure_time=0,
+                            engine='dijkstra'):
+    """ call Dijkstra's algorithm in cpp which stops once dest is reached
+
+    engine can be 'dijkstra', 'bidirectional' (i.e., bidirectional Dijkstra's
+    algorithm), or 'astar' (i.e., A* search using node coordinates). only labels
+    and predecessors of the nodes along the shortest path to dest_node_no are
+    guaranteed to be final.
+    """
+    coord_x, coord_y = None, None
+    scale = -1
+    if engine == 'astar':
+        coord_x, coord_y = G.get_node_coords()
+        if coord_x is None:
+            raise Exception('A* search requires valid coordinates of all nodes')
+        scale = G.get_graph().get_astar_scale(G, coord_x, coord_y)
+
+    _cdll.shortest_path_p2p(G.get_graph().handle,
+                            orig_node_no,
+                            dest_node_no,
+                            G.get_link_costs(),
+                            coord_x,
+                            coord_y,
+                            G.get_node_label_costs(),
+                            G.get_node_preds(),
+                            G.get_link_preds(),
+                            _get_engine_no(engine, _p2p_engines),
+                            MAX_LABEL_COST,
+                            departure_time,
+                            scale)
+
+
+def _get_attr_args(G, attrs):
+    """ link attributes, their number, and the buffer for secondary labels """
+    if not attrs:
+        return None, 0, None
+
+    return G.get_link_attrs(attrs), len(attrs), G.batch_attr_labels
+
+
+def _optimal_label_correcting_batch_CAPI(G, orig_node_nos, departure_time=0,
+                                         engine='mlc', attrs=(), reverse=False):
+    """ call shortest_path_batch() in cpp for multiple source nodes at once
+
+    the shortest path tree from orig_node_nos[i] is stored in the batch buffers
+    of G starting from i * G.get_node_size(). the source nodes are spread over
+    up to _thread_num threads, each of which works on its own deque.
+
+    link attributes in attrs are accumulated along each tree into the
+    batch_attr_labels of G in the same call. the trees are built to rather than
+    from orig_node_nos if reverse is True.
+    """
+    orig_size = len(orig_node_nos)
+    thread_num = min(_thread_num, orig_size)
+    G.allocate_for_batch(orig_size, thread_num, len(attrs))
+
+    _cdll.shortest_path_batch(G.get_graph().handle,
+                              (ctypes.c_int * orig_size)(*orig_node_nos),
+                              orig_size,
+                              G.get_link_costs(),
+                              G.batch_label_costs,
+                              G.batch_node_preds,
+                              G.batch_link_preds,
+                              G.batch_queue_next,
+                              _get_engine_no(engine),
+                              MAX_LABEL_COST,
+                              departure_time,
+                              thread_num,
+                              *_get_attr_args(G, attrs),
+                              not reverse)
+
+
+def _shortest_path_ch_CAPI(G, orig_node_no, cost_type, departure_time=0):
+    """ call shortest_path_ch() in cpp to build the shortest path tree using CH """
+    _cdll.shortest_path_ch(_get_ch(G, cost_type).handle,
+                           orig_node_no,
+                           G.get_node_label_costs(),
+                           G.get_node_preds(),
+                           G.get_link_preds(),
+                           MAX_LABEL_COST,
+                           departure_time)
+
+
+def _shortest_path_ch_p2p_CAPI(G, orig_node_no, dest_node_no, cost_type,
+                               departure_time=0):
+    """ call shortest_path_ch_p2p() in cpp to find the shortest path using CH
+
+    only labels and predecessors of the nodes along the shortest path to
+    dest_node_no are valid.
+    """
+    _cdll.shortest_path_ch_p2p(_get_ch(G, cost_type).handle,
+                               orig_node_no,
+                               dest_node_no,
+                               G.get_node_label_costs(),
+                               G.get_node_preds(),
+                               G.get_link_preds(),
+                               MAX_LABEL_COST,
+                               departure_time)
+
+
+def _shortest_path_alt_CAPI(G, orig_node_no, dest_node_no, cost_type,
+                            departure_time=0):
+    """ call shortest_path_alt() in cpp to find the shortest path using landmarks
+
+    it falls back to Dijkstra's algorithm if the current link costs of G are
+    less than the ones upon the construction of landmarks. only labels and
+    predecessors of the nodes along the shortest path to dest_node_no are
+    guaranteed to be final.
+    """
+    landmarks = _get_landmarks(G, cost_type)
+    _cdll.shortest_path_alt(G.get_graph().handle,
+                            landmarks.handle,
+                            orig_node_no,
+                            dest_node_no,
+                            G.get_link_costs(),
+                            G.get_node_label_costs(),
+                            G.get_node_preds(),
+                            G.get_link_preds(),
+                            MAX_LABEL_COST,
+                            departure_time,
+                            landmarks.is_valid(G))
+
+
+def _shortest_path_ch_batch_CAPI(G, orig_node_nos, cost_type, departure_time=0,
+                                 attrs=()):
+    """ counterpart of _optimal_label_correcting_batch_CAPI() using CH """
+    orig_size = len(orig_node_nos)
+    thread_num = min(_thread_num, orig_size)
+    G.allocate_for_batch(orig_size, thread_num, len(attrs))
+
+    _cdll.shortest_path_ch_batch(_get_ch(G, cost_type).handle,
+                                 (ctypes.c_int * orig_size)(*orig_node_nos),
+                                 orig_size,
+                                 G.batch_label_costs,
+                                 G.batch_node_preds,
+                                 G.batch_link_preds,
+                                 MAX_LABEL_COST,
+                                 departure_time,
+                                 thread_num,
+                                 *_get_attr_args(G, attrs))
+
+
+class SPTreeCache:
+    """ LRU cache of shortest path trees shared by all networks
+
+    a tree is keyed by network, root node, mode, link costs (see
+    Network.get_link_cost_key()), and direction. the engine is not part of the
+    key as every engine (i.e., MLC, Dijkstra's algorithm, Dial's algorithm, and
+    CH) yields the same label costs. its label costs, node predecessors, and
+    link predecessors are kept as raw bytes, which take 16 * node_size bytes in
+    total. the least recently used trees are evicted once max_memory is
+    exceeded.
+    """
+    def __init__(self, max_memory=SP_TREE_CACHE_MEMORY):
+        self.trees = OrderedDict()
+        self.max_memory = max_memory
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        # key: id of network with trees cached, value: its finalizer
+        self.networks = {}
+
+    def _discard_network(self, network_id):
+        for k in [k for k in self.trees if k[0] == network_id]:
+            self.memory -= sum(len(x) for x in self.trees.pop(k))
+
+        self.networks.pop(network_id, None)
+
+    def _evict(self):
+        while self.memory > self.max_memory:
+            _, tree = self.trees.popitem(last=False)
+            self.memory -= sum(len(x) for x in tree)
+
+    def get(self, G, key):
+        """ load the cached tree into the buffers of G if there is one """
+        key = (id(G),) + key
+        try:
+            tree = self.trees[key]
+        except KeyError:
+            self.misses += 1
+            return False
+
+        self.trees.move_to_end(key)
+        for buf, x in zip((G.node_label_cost, G.node_preds, G.link_preds), tree):
+            ctypes.memmove(buf, x, len(x))
+
+        self.hits += 1
+        return True
+
+    def put(self, G, key):
+        """ cache the tree in the buffers of G """
+        tree = (bytes(G.node_label_cost), bytes(G.node_preds), bytes(G.link_preds))
+        if sum(len(x) for x in tree) > self.max_memory:
+            return
+
+        # purge the trees of G once it is garbage collected as its id might be
+        # taken by another network
+        if id(G) not in self.networks:
+            self.networks[id(G)] = weakref.finalize(
+                G, self._discard_network, id(G)
+            )
+
+        key = (id(G),) + key
+        if key in self.trees:
+            self.memory -= sum(len(x) for x in self.trees.pop(key))
+
+        self.trees[key] = tree
+        self.memory += sum(len(x) for x in tree)
+        self._evict()
+
+    def clear(self):
+        for f in self.networks.values():
+            f.detach()
+
+        self.networks.clear()
+        self.trees.clear()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, max_memory):
+        self.max_memory = max_memory
+        self._evict()
+
+    def get_info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'trees': len(self.trees),
+            'memory': self.memory,
+            'max_memory': self.max_memory
+        }
+
+
+_sp_tree_cache = SPTreeCache()
+
+
+class DynamicSPTrees:
+    """ shortest path trees from multiple source nodes kept for repair
+
+    the trees are stored in a row as the batch buffers of a network do, along
+    with the link costs they are built on and the key of them (see
+    Network.get_link_cost_key()). they are built from scratch by the first
+    update() and only repaired for the links with their costs changed
+    afterwards (see repair_shortest_path_batch() in the C++ path engine), which
+    also brings link_costs up to date. they can not be repaired under link
+    costs of another kind (e.g., another cost type).
+    """
+    def __init__(self, G, orig_node_nos):
+        node_size = G.get_node_size()
+        buffer_size = len(orig_node_nos) * node_size
+
+        self.graph = G.get_graph()
+        self.orig_node_nos = tuple(orig_node_nos)
+        self.orig_nodes = (ctypes.c_int * len(orig_node_nos))(*orig_node_nos)
+        self.label_costs = (ctypes.c_double * buffer_size)()
+        self.node_preds = (ctypes.c_int * buffer_size)()
+        self.link_preds = (ctypes.c_int * buffer_size)()
+        self.link_costs = None
+        self.link_cost_key = G.get_link_cost_key()
+        # number of trees repaired rather than rebuilt by the latest update()
+        self.repaired = 0
+
+    def is_valid(self, G, orig_node_nos):
+        return (
+            self.graph is G.get_graph()
+            and self.orig_node_nos == tuple(orig_node_nos)
+            and self.link_cost_key[0] == G.get_link_cost_key()[0]
+        )
+
+    def update(self, G, engine, max_affected_ratio, tolerance):
+        """ bring the trees up to date with the current link costs of G
+
+        nothing is done if the link cost version of G is still the same.
+        """
+        if self.link_costs is not None:
+            if self.link_cost_key == G.get_link_cost_key():
+                self.repaired = 0
+                return
+
+        self.link_cost_key = G.get_link_cost_key()
+        orig_size = len(self.orig_node_nos)
+        thread_num = min(_thread_num, orig_size)
+        # only the deques of the batch buffers are needed
+        G.allocate_for_batch(1, thread_num)
+
+        if self.link_costs is None:
+            _cdll.shortest_path_batch(self.graph.handle,
+                                      self.orig_nodes,
+                                      orig_size,
+                                      G.get_link_costs(),
+                                      self.label_costs,
+                                      self.node_preds,
+                                      self.link_preds,
+                                      G.batch_queue_next,
+                                      _get_engine_no(engine),
+                                      MAX_LABEL_COST,
+                                      0,
+                                      thread_num,
+                                      None,
+                                      0,
+                                      None,
+                                      True)
+            self.link_costs = (ctypes.c_double * G.get_link_size())()
+            ctypes.memmove(self.link_costs, G.get_link_costs(),
+                           ctypes.sizeof(self.link_costs))
+            self.repaired = 0
+        else:
+            self.repaired = _cdll.repair_shortest_path_batch(
+                self.graph.handle,
+                self.orig_nodes,
+                orig_size,
+                self.link_costs,
+                G.get_link_costs(),
+                self.label_costs,
+                self.node_preds,
+                self.link_preds,
+                G.batch_queue_next,
+                _get_engine_no(engine),
+                MAX_LABEL_COST,
+                thread_num,
+                max_affected_ratio,
+                tolerance
+            )
+
+
+def set_sp_tree_cache(max_memory=SP_TREE_CACHE_MEMORY, clear=False):
+    """ set the maximum memory of the cached shortest path trees in bytes
+
+    caching is disabled if max_memory is 0. the cached trees and the hit and
+    miss counters are reset if clear is True.
+    """
+    if clear:
+        _sp_tree_cache.clear()
+
+    _sp_tree_cache.resize(max_memory)
+
+
+def get_sp_tree_cache_info():
+    return _sp_tree_cache.get_info()
+
+
+def _init_link_costs(G, cost_type):
+    """ switch the link costs of G only if cost_type is different
+
+    the generalized link costs for accessibility evaluation count as 'time'.
+    """
+    if G.get_cost_type() != cost_type:
         G.init_link_costs(cost_type)
-        _prev_cost_type = cost_type
+
+
+def _check_reverse_engine(engine, reverse):
+    if reverse and engine == _ch_engine:
+        raise Exception(
+            'shortest path trees on the reverse graph are not supported by CH'
+        )
+
+
+def single_source_shortest_path(G, orig_node_id, cost_type='time', engine='mlc',
+                                reverse=False):
+    """ compute the shortest path tree from orig_node_id
+
+    if reverse is True, the tree is built to orig_node_id on the reverse graph
+    (i.e., using the incoming links). the label cost of node i is then the cost
+    from node i to orig_node_id, and the node and link predecessors of node i
+    are the next node and link from node i towards orig_node_id.
+    """
+    _check_reverse_engine(engine, reverse)
+
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
 
     orig_node_no = G.get_node_no(orig_node_id)
-    _optimal_label_correcting_CAPI(G, orig_node_no)
+    if engine == _ch_engine:
+        _shortest_path_ch_CAPI(G, orig_node_no, cost_type)
+    else:
+        _optimal_label_correcting_CAPI(G, orig_node_no, engine=engine,
+                                       reverse=reverse)
+
+
+def cached_single_source_shortest_path(G, orig_node_id, cost_type='time',
+                                        engine='mlc', reverse=False):
+    """ single_source_shortest_path() with the tree served from _sp_tree_cache
+
+    the cached trees are outdated once the link costs are rebuilt or updated
+    (e.g., by column generation), which bumps the link cost version of G. Note
+    that link costs modified in place by the caller (e.g., through
+    G.get_link_costs()) require G.update_link_cost_version() to be tracked.
+    """
+    _check_reverse_engine(engine, reverse)
+
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+
+    key = (
+        G.get_node_no(orig_node_id),
+        G.get_agent_type_name(),
+        G.get_link_cost_key(),
+        reverse
+    )
+    if _sp_tree_cache.get(G, key):
+        return
+
+    single_source_shortest_path(G, orig_node_id, cost_type, engine, reverse)
+    _sp_tree_cache.put(G, key)
+
+
+def single_pair_shortest_path(G, orig_node_id, dest_node_id, cost_type='time',
+                              engine='dijkstra'):
+    """ compute the shortest path from orig_node_id to dest_node_id only
+
+    it terminates once the shortest path to dest_node_id is found rather than
+    finding the whole shortest path tree.
+    """
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+
+    orig_node_no = G.get_node_no(orig_node_id)
+    dest_node_no = G.get_node_no(dest_node_id)
+    if engine == _ch_engine:
+        _shortest_path_ch_p2p_CAPI(G, orig_node_no, dest_node_no, cost_type)
+    elif engine == _alt_engine:
+        _shortest_path_alt_CAPI(G, orig_node_no, dest_node_no, cost_type)
+    else:
+        _shortest_path_p2p_CAPI(G, orig_node_no, dest_node_no, engine=engine)
+
+
+def multi_source_shortest_path(G, orig_node_ids, cost_type='time', engine='mlc',
+                               attrs=None, reverse=False):
+    """ compute the shortest path trees from multiple source nodes
+
+    the source nodes are processed in batches of up to MAX_SP_BATCH_SIZE and
+    each batch only takes one call to the C++ path engine. it yields the label
+    costs, node predecessors, and link predecessors of each shortest path tree
+    following the order of orig_node_ids.
+
+    attrs is a sequence of link attributes (i.e., 'distance', 'toll', and
+    'time' as free-flow travel time) to be accumulated along each tree in the
+    same call. if it is given, the secondary labels are yielded as the fourth
+    array, where the one of attrs[k] at node i is at k * G.get_node_size() + i.
+    it is MAX_LABEL_COST if node i is not reachable.
+
+    if reverse is True, the trees are built to orig_node_ids on the reverse
+    graph as single_source_shortest_path() does, which takes one tree per
+    destination rather than one per origin for many-to-few problems.
+
+    Note that the yielded arrays are views on the batch buffers of G, which are
+    only valid until the next batch is computed.
+    """
+    _check_reverse_engine(engine, reverse)
+
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+
+    orig_node_ids = list(orig_node_ids)
+    attrs = tuple(attrs) if attrs else ()
+    node_size = G.get_node_size()
+    double_arr_node = ctypes.c_double * node_size
+    int_arr_node = ctypes.c_int * node_size
+    double_arr_attr = ctypes.c_double * (len(attrs) * node_size)
+
+    for i in range(0, len(orig_node_ids), MAX_SP_BATCH_SIZE):
+        batch = orig_node_ids[i:i+MAX_SP_BATCH_SIZE]
+        orig_node_nos = [G.get_node_no(x) for x in batch]
+        if engine == _ch_engine:
+            _shortest_path_ch_batch_CAPI(G, orig_node_nos, cost_type, attrs=attrs)
+        else:
+            _optimal_label_correcting_batch_CAPI(G, orig_node_nos,
+                                                 engine=engine, attrs=attrs,
+                                                 reverse=reverse)
+
+        for j in range(len(batch)):
+            sp_tree = (
+                double_arr_node.from_buffer(
+                    G.batch_label_costs,
+                    j * ctypes.sizeof(double_arr_node)
+                ),
+                int_arr_node.from_buffer(
+                    G.batch_node_preds,
+                    j * ctypes.sizeof(int_arr_node)
+                ),
+                int_arr_node.from_buffer(
+                    G.batch_link_preds,
+                    j * ctypes.sizeof(int_arr_node)
+                )
+            )
+
+            if not attrs:
+                yield sp_tree
+            else:
+                yield sp_tree + (
+                    double_arr_attr.from_buffer(
+                        G.batch_attr_labels,
+                        j * ctypes.sizeof(double_arr_attr)
+                    ),
+                )
+
+
+def dynamic_multi_source_shortest_path(G, orig_node_ids, cost_type='time',
+                                       engine='mlc',
+                                       max_affected_ratio=DYNAMIC_SP_AFFECTED_RATIO,
+                                       tolerance=0):
+    """ multi_source_shortest_path() with the trees repaired from the last call
+
+    the trees from orig_node_ids are kept in G.dynamic_sp_trees. the next call
+    with the same source nodes only repairs them for the links with their costs
+    changed since then, where a tree with more than max_affected_ratio of its
+    nodes affected is rebuilt by engine. it yields the label costs, node
+    predecessors, and link predecessors of each tree following the order of
+    orig_node_ids, which are views on G.dynamic_sp_trees.
+
+    the trees are repaired once the link cost version of G changes, i.e., link
+    costs modified in place require G.update_link_cost_version(). they are
+    rebuilt if the link costs are of another kind (e.g., another cost type).
+
+    a link cost change no more than tolerance (relative) is ignored until it
+    accumulates beyond that. the trees are exact if tolerance is 0 by default.
+    otherwise, they are the shortest ones under link costs within tolerance of
+    the current ones.
+
+    it falls back to multi_source_shortest_path() if the trees take more than
+    DYNAMIC_SP_MEMORY.
+    """
+    if engine == _ch_engine:
+        raise Exception('shortest path trees from CH can not be repaired')
+
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+
+    orig_node_ids = list(orig_node_ids)
+    orig_node_nos = [G.get_node_no(x) for x in orig_node_ids]
+    node_size = G.get_node_size()
+    # label costs in double and predecessors in int
+    if len(orig_node_nos) * node_size * 16 > DYNAMIC_SP_MEMORY:
+        yield from multi_source_shortest_path(G, orig_node_ids, cost_type, engine)
+        return
+
+    trees = G.dynamic_sp_trees
+    if trees is None or not trees.is_valid(G, orig_node_nos):
+        trees = G.dynamic_sp_trees = DynamicSPTrees(G, orig_node_nos)
+
+    trees.update(G, engine, max_affected_ratio, tolerance)
+
+    double_arr_node = ctypes.c_double * node_size
+    int_arr_node = ctypes.c_int * node_size
+    for i in range(len(orig_node_nos)):
+        yield (
+            double_arr_node.from_buffer(
+                trees.label_costs, i * ctypes.sizeof(double_arr_node)
+            ),
+            int_arr_node.from_buffer(
+                trees.node_preds, i * ctypes.sizeof(int_arr_node)
+            ),
+            int_arr_node.from_buffer(
+                trees.link_preds, i * ctypes.sizeof(int_arr_node)
+            )
+        )
+
+
+def backtrace_shortest_paths(G, dest_node_nos, label_costs, node_preds,
+                             link_preds):
+    """ retrieve the shortest paths to dest_node_nos from a shortest path tree
+
+    label_costs, node_preds, and link_preds are the shortest path tree from
+    single_source_shortest_path() or multi_source_shortest_path(). all paths
+    are retrieved in one call to the C++ path engine. it returns the path
+    buffers of G, i.e., path_offsets, path_links, path_costs, and path_dists.
+    the links along the i-th path are path_links[path_offsets[i]] to
+    path_links[path_offsets[i+1]-1], which run from dest_node_nos[i] back to
+    the origin.
+
+    Note that the returned arrays are only valid until the next call.
+    """
+    dest_size = len(dest_node_nos)
+    dest_node_nos = (ctypes.c_int * dest_size)(*dest_node_nos)
+    G.allocate_for_paths(dest_size, dest_size)
+
+    while True:
+        link_num = _cdll.backtrace_paths(label_costs,
+                                         node_preds,
+                                         link_preds,
+                                         G.get_link_lengths(),
+                                         dest_node_nos,
+                                         dest_size,
+                                         G.path_offsets,
+                                         G.path_links,
+                                         G.path_link_size,
+                                         G.path_costs,
+                                         G.path_dists)
+        if link_num <= G.path_link_size:
+            break
+
+        # retry with a buffer large enough
+        G.allocate_for_paths(dest_size, link_num)
+
+    return G.path_offsets, G.path_links, G.path_costs, G.path_dists
+
+
+def find_isochrone(G, orig_node_id, budget, cost_type='time', reverse=False):
+    """ find the nodes within budget from orig_node_id in one engine call
+
+    the search never expands labels beyond budget, i.e., it only touches the
+    nodes within budget rather than the whole network. it returns the node
+    numbers of these nodes (excluding orig_node_id) in ascending order and
+    their predecessor links. if reverse is True, they are the nodes from which
+    orig_node_id can be reached within budget along with the next links towards
+    orig_node_id.
+    """
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+
+    node_num = _cdll.isochrone(G.get_graph().handle,
+                               G.get_node_no(orig_node_id),
+                               G.get_link_costs(),
+                               budget,
+                               G.isochrone_nodes,
+                               G.isochrone_links,
+                               None,
+                               0,
+                               not reverse)
+
+    return G.isochrone_nodes[:node_num], G.isochrone_links[:node_num]
+
+
+def multi_source_isochrones(G, orig_node_ids, budgets, cost_type='time',
+                            reverse=False):
+    """ find the nodes within each of budgets from multiple source nodes
+
+    each source node takes one search under the largest budget, where the source
+    nodes are processed in batches of up to MAX_SP_BATCH_SIZE over multiple
+    threads. the batch buffers of G hold the nodes and their predecessor links
+    of each source node in the order of being settled.
+
+    it returns offsets, counts, nodes, and links as NumPy arrays. the node no's
+    within budgets[k] from orig_node_ids[i] are
+    nodes[offsets[i]:offsets[i]+counts[i, k]], and links are their predecessor
+    links. reverse works in the same way as find_isochrone().
+    """
+    np = _import_numpy()
+
+    if not budgets:
+        raise Exception('at least one budget is required')
+
+    G.allocate_for_CAPI()
+    _init_link_costs(G, cost_type)
+
+    orig_node_ids = list(orig_node_ids)
+    budget_num = len(budgets)
+    budgets = (ctypes.c_double * budget_num)(*budgets)
+    node_size = G.get_node_size()
+
+    counts = np.zeros((len(orig_node_ids), budget_num), dtype=np.int32)
+    nodes = []
+    links = []
+
+    for i in range(0, len(orig_node_ids), MAX_SP_BATCH_SIZE):
+        orig_node_nos = [
+            G.get_node_no(x) for x in orig_node_ids[i:i+MAX_SP_BATCH_SIZE]
+        ]
+        orig_size = len(orig_node_nos)
+        thread_num = min(_thread_num, orig_size)
+        G.allocate_for_batch(orig_size, thread_num)
+
+        cutoffs = (ctypes.c_int * (orig_size * budget_num))()
+        _cdll.isochrone_batch(G.get_graph().handle,
+                              (ctypes.c_int * orig_size)(*orig_node_nos),
+                              orig_size,
+                              G.get_link_costs(),
+                              budgets,
+                              budget_num,
+                              cutoffs,
+                              G.batch_node_preds,
+                              G.batch_link_preds,
+                              0,
+                              thread_num,
+                              not reverse)
+
+        counts[i:i+orig_size] = np.ctypeslib.as_array(cutoffs).reshape(
+            orig_size, budget_num
+        )
+        batch_nodes = np.ctypeslib.as_array(G.batch_node_preds)
+        batch_links = np.ctypeslib.as_array(G.batch_link_preds)
+        for j in range(orig_size):
+            start = j * node_size
+            end = start + counts[i+j].max()
+            nodes.append(batch_nodes[start:end].copy())
+            links.append(batch_links[start:end].copy())
+
+    offsets = np.zeros(len(orig_node_ids) + 1, dtype=np.int64)
+    if not orig_node_ids:
+        return (offsets, counts, np.empty(0, dtype=np.int32),
+                np.empty(0, dtype=np.int32))
+
+    np.cumsum(counts.max(axis=1), out=offsets[1:])
+    return offsets, counts, np.concatenate(nodes), np.concatenate(links)
+
+
+def load_shortest_path_tree(G, label_costs, node_preds, link_preds,
+                            dest_node_nos, dest_vols, link_flows):
+    """ all-or-nothing loading of dest_vols onto a shortest path tree
+
+    dest_node_nos and dest_vols are ctypes arrays of the same size. the link
+    flows are accumulated to link_flows (a ctypes array indexed by link seq no)
+    in one call to the C++ path engine. it returns the total cost of loaded
+    volumes, where destinations not reachable are skipped.
+    """
+    return _cdll.load_shortest_path_tree(label_costs,
+                                         node_preds,
+                                         link_preds,
+                                         G.get_node_size(),
+                                         dest_node_nos,
+                                         dest_vols,
+                                         len(dest_node_nos),
+                                         link_flows)
 
 
 def output_path_sequence(G, to_node_id, seq_type='node'):
@@ -116,13 +1242,23 @@ def output_path_sequence(G, to_node_id, seq_type='node'):
             yield G.links[link_no].get_link_id()
 
 
-def find_shortest_path(G, from_node_id, to_node_id, seq_type, cost_type):
+def find_shortest_path(G, from_node_id, to_node_id, seq_type, cost_type,
+                       engine='mlc'):
+    """ find the shortest path between from_node_id and to_node_id
+
+    engine 'dijkstra', 'bidirectional', 'astar', 'alt', and 'ch' stop as soon
+    as the shortest path to to_node_id is found. others build the whole shortest
+    path tree from from_node_id.
+    """
     if from_node_id not in G.map_id_to_no:
         raise Exception(f'Node ID: {from_node_id} not in the network')
     if to_node_id not in G.map_id_to_no:
         raise Exception(f'Node ID: {to_node_id} not in the network')
 
-    single_source_shortest_path(G, from_node_id, cost_type)
+    if engine in _p2p_engines or engine in (_alt_engine, _ch_engine):
+        single_pair_shortest_path(G, from_node_id, to_node_id, cost_type, engine)
+    else:
+        cached_single_source_shortest_path(G, from_node_id, cost_type, engine)
 
     path_cost = G.get_path_cost(to_node_id, cost_type)
     if path_cost >= MAX_LABEL_COST:
@@ -140,7 +1276,84 @@ def find_shortest_path(G, from_node_id, to_node_id, seq_type, cost_type):
         return f'path {cost_type}: {path_cost:.4f} {unit} | link path: {path}'
 
 
-def find_path_for_agents(G, column_pool, cost_type):
+def find_shortest_paths(G, od_pairs, cost_type, engine='mlc'):
+    """ find the shortest paths between many OD pairs grouped by origin
+
+    the shortest path tree from each distinct origin is built only once, where
+    the origins are processed in batches by multi_source_shortest_path() and
+    all the paths from one origin are retrieved by backtrace_shortest_paths().
+
+    it returns costs, offsets, and links as NumPy arrays. costs[i] is the
+    shortest path cost of od_pairs[i] (inf if not connected). the link seq no's
+    along its path are links[offsets[i]:offsets[i+1]] from origin to
+    destination (i.e., compressed sparse row).
+    """
+    np = _import_numpy()
+
+    # key: origin node id, value: indices of od pairs from it
+    od_groups = {}
+    dest_node_nos = []
+    for i, (from_node_id, to_node_id) in enumerate(od_pairs):
+        from_node_id = str(from_node_id)
+        to_node_id = str(to_node_id)
+        if from_node_id not in G.map_id_to_no:
+            raise Exception(f'Node ID: {from_node_id} not in the network')
+        if to_node_id not in G.map_id_to_no:
+            raise Exception(f'Node ID: {to_node_id} not in the network')
+
+        od_groups.setdefault(from_node_id, []).append(i)
+        dest_node_nos.append(G.map_id_to_no[to_node_id])
+
+    od_size = len(dest_node_nos)
+    costs = np.empty(od_size)
+    # the paths are retrieved backward in the order of od_groups
+    pair_indices = []
+    path_lengths = []
+    path_links = []
+
+    sp_trees = multi_source_shortest_path(G, od_groups.keys(), cost_type, engine)
+    for indices, (label_costs, node_preds, link_preds) in zip(od_groups.values(),
+                                                               sp_trees):
+        offsets, links, costs_, _ = backtrace_shortest_paths(
+            G, [dest_node_nos[i] for i in indices], label_costs, node_preds,
+            link_preds
+        )
+
+        offsets = np.ctypeslib.as_array(offsets)[:len(indices)+1]
+        costs[indices] = np.ctypeslib.as_array(costs_)[:len(indices)]
+        pair_indices.extend(indices)
+        path_lengths.append(np.diff(offsets))
+        path_links.append(np.ctypeslib.as_array(links)[:offsets[-1]].copy())
+
+    costs[costs >= MAX_LABEL_COST] = np.inf
+    if cost_type != 'time':
+        costs *= G.len_unit_cf
+
+    if not od_size:
+        return costs, np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+    pair_indices = np.array(pair_indices)
+    path_lengths = np.concatenate(path_lengths)
+    path_links = np.concatenate(path_links)
+
+    lengths = np.empty(od_size, dtype=np.int64)
+    lengths[pair_indices] = path_lengths
+    offsets = np.zeros(od_size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # reverse each path from path_links into its slot in links
+    starts = np.zeros(od_size, dtype=np.int64)
+    np.cumsum(path_lengths[:-1], out=starts[1:])
+    steps = np.arange(path_links.size) - np.repeat(starts, path_lengths)
+    links = np.empty(path_links.size, dtype=np.int32)
+    links[np.repeat(offsets[pair_indices], path_lengths) + steps] = (
+        path_links[np.repeat(starts + path_lengths - 1, path_lengths) - steps]
+    )
+
+    return costs, offsets, links
+
+
+def find_path_for_agents(G, column_pool, cost_type, engine='mlc'):
     """ find and set up shortest path for each agent
 
     the internal node and links will be used to set up the node sequence and
@@ -173,7 +1386,7 @@ def find_path_for_agents(G, column_pool, cost_type):
         # then there is no need to redo shortest path calculation.
         if from_node_id != from_node_id_prev:
             from_node_id_prev = from_node_id
-            single_source_shortest_path(G, from_node_id, cost_type)
+            single_source_shortest_path(G, from_node_id, cost_type, engine)
 
         # set up the cost
         agent.path_cost = G.get_path_cost(to_node_id, cost_type)
@@ -202,7 +1415,8 @@ def _get_path_sequence_str(G, to_node_id, seq_type):
     return ';'.join(str(x) for x in output_path_sequence(G, to_node_id, seq_type))
 
 
-def get_shortest_path_tree(G, from_node_id, seq_type, cost_type, integer_node_id):
+def get_shortest_path_tree(G, from_node_id, seq_type, cost_type, integer_node_id,
+                           engine='mlc'):
     """ compute the shortest path tree from the source node (from_node_id)
 
     it returns a dictionary, where key is to_node_id and value is the
@@ -213,7 +1427,7 @@ def get_shortest_path_tree(G, from_node_id, seq_type, cost_type, integer_node_id
     if from_node_id not in G.map_id_to_no:
         raise Exception(f'Node ID: {from_node_id} not in the network')
 
-    single_source_shortest_path(G, from_node_id, cost_type)
+    cached_single_source_shortest_path(G, from_node_id, cost_type, engine)
 
     if integer_node_id:
         sp_tree = {}
@@ -242,14 +1456,40 @@ def get_shortest_path_tree(G, from_node_id, seq_type, cost_type, integer_node_id
         }
 
 
-def benchmark_apsp(G):
+def get_shortest_path_tree_arrays(G, from_node_id, cost_type, engine='mlc'):
+    """ compute the shortest path tree from from_node_id as NumPy arrays
+
+    it returns node ids along with zero-copy views on the label costs, node
+    predecessors, and link predecessors of G, which are only valid until the
+    next shortest path calculation on G.
+    """
+    np = _import_numpy()
+
+    if from_node_id not in G.map_id_to_no:
+        raise Exception(f'Node ID: {from_node_id} not in the network')
+
+    cached_single_source_shortest_path(G, from_node_id, cost_type, engine)
+
+    return (
+        np.array([G.map_no_to_id[i] for i in range(G.get_node_size())]),
+        np.ctypeslib.as_array(G.get_node_label_costs()),
+        np.ctypeslib.as_array(G.get_node_preds()),
+        np.ctypeslib.as_array(G.get_link_preds())
+    )
+
+
+def benchmark_apsp(G, engine='mlc'):
     st = time()
 
-    for k in G.map_id_to_no:
-        # do not include centroids
-        if G.map_id_to_no[k] >= G.get_last_thru_node():
-            break
-        
-        single_source_shortest_path(G, k)
+    # do not include centroids
+    orig_node_ids = [
+        k for k, v in G.map_id_to_no.items() if v < G.get_last_thru_node()
+    ]
+
+    for _ in multi_source_shortest_path(G, orig_node_ids, engine=engine):
+        pass
 
-    print(f'processing time of finding all-pairs shortest paths: {time()-st:.4f} s')
+    print(
+        f'processing time of finding all-pairs shortest paths ({engine}): '
+        f'{time()-st:.4f} s'
+    )
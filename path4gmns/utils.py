@@ -1,10 +1,13 @@
+import ctypes
 import os
 import requests
+from array import array
 from datetime import timedelta
 from sys import version_info
 from threading import Thread
 
-from .consts import GITHUB_API_URL, MILE_TO_METER, MPH_TO_KPH
+from .consts import ALLOWED_USES_ALL_MASK, GITHUB_API_URL, MILE_TO_METER, \
+                   MODE_ALL_MASK, MPH_TO_KPH
 
 
 __all__ = [
@@ -20,6 +23,35 @@ class InvalidRecord(Exception):
     pass
 
 
+# typecodes of array.array for the ctypes used by the C++ path engine
+_ctypes_typecodes = {ctypes.c_int: 'i', ctypes.c_uint: 'I', ctypes.c_double: 'd'}
+
+
+def _make_ctypes_array(ctype, values):
+    """ ctypes array of values without materializing a Python list first
+
+    values are packed into array.array in C, whose buffer is shared with the
+    returned ctypes array.
+    """
+    buf = array(_ctypes_typecodes[ctype], values)
+    return (ctype * len(buf)).from_buffer(buf)
+
+
+def _make_full_ctypes_array(ctype, size, value):
+    """ ctypes array of size with every element as value """
+    buf = array(_ctypes_typecodes[ctype], [value]) * size
+    return (ctype * size).from_buffer(buf)
+
+
+def _import_numpy():
+    """ NumPy is only required by the APIs working with NumPy arrays """
+    try:
+        import numpy as np
+        return np
+    except ImportError:
+        raise Exception('Please install numpy to work with NumPy arrays!')
+
+
 # a little bit ugly
 def _convert_str_to_int(s):
     if not s:
@@ -103,6 +135,43 @@ def _convert_boundaries(bs):
     return U, D, L, R
 
 
+def _convert_allowed_uses(allowed_uses, mode_masks):
+    """a helper function to convert allowed uses of a link to bit mask
+
+    a mode is allowed if its name is part of allowed_uses, which is consistent
+    with the string match on allowed uses in the legacy path engine.
+    """
+    if 'all' in allowed_uses:
+        return ALLOWED_USES_ALL_MASK
+
+    mask = MODE_ALL_MASK
+    for mode, m in mode_masks.items():
+        if mode in allowed_uses:
+            mask |= m
+
+    return mask
+
+
+def _get_hilbert_index(order, x, y):
+    """ the index of cell (x, y) along the Hilbert curve on a 2^order grid """
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # rotate the quadrant
+        if not ry:
+            if rx:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+
+    return d
+
+
 def _get_time_stamp(minute):
     """ covert minute into HH:MM:SS as string """
     s = minute * 60
@@ -35,6 +35,7 @@ setup(
     packages=[_package_name],
     package_dir={_package_name: _package_name},
     package_data={_package_name: ['bin/*']},
+    extras_require={'numpy': ['numpy']},
     license='Apache License 2.0',
     classifiers=[
         'Programming Language :: Python :: 3',
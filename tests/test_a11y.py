@@ -1,4 +1,10 @@
-from path4gmns.accessibility import evaluate_accessibility, evaluate_equity
+from os.path import join
+
+import pytest
+
+from path4gmns.accessibility import compute_skims, evaluate_accessibility, \
+                                   evaluate_equity, load_skims, save_skims
+from path4gmns.consts import MPH_TO_KPH
 from path4gmns.io import read_network
 
 
@@ -67,4 +73,58 @@ def test_unimodal_equity(sample_data_dir, tmp_output_dir):
                     single_mode=True,
                     mode='auto',
                     time_budget=30,
-                    output_dir=tmp_output_dir)
\ No newline at end of file
+                    output_dir=tmp_output_dir)
+
+
+def test_skims(sample_data_dir, tmp_output_dir):
+    pytest.importorskip('numpy')
+
+    network = read_network(input_dir=sample_data_dir)
+    zone_ids, skims = compute_skims(network, attrs=['distance', 'toll'])
+
+    zone_size = len(zone_ids)
+    for k in ['time', 'distance', 'toll']:
+        assert skims[k].shape == (zone_size, zone_size)
+        assert not skims[k].diagonal().any()
+
+    file_path = join(tmp_output_dir, 'skims.npz')
+    save_skims(zone_ids, skims, file_path)
+    zone_ids_, skims_ = load_skims(file_path)
+
+    assert zone_ids_ == zone_ids
+    for k, v in skims.items():
+        assert (skims_[k] == v).all()
+
+
+def test_skims_in_length_unit(sample_data_dir):
+    pytest.importorskip('numpy')
+
+    network = read_network(input_dir=sample_data_dir)
+    _, skims = compute_skims(network, cost_type='distance')
+
+    # link lengths are converted from km upon reading and back in the skims
+    network_ = read_network(length_unit='km', input_dir=sample_data_dir)
+    G = network_._base_assignment.get_network()
+    assert G.get_link(0).get_length() == pytest.approx(
+        network._base_assignment.get_network().get_link(0).get_length()
+        / MPH_TO_KPH
+    )
+    _, skims_ = compute_skims(network_, cost_type='distance')
+    assert skims_['distance'] == pytest.approx(skims['distance'])
+
+    # the same as find_shortest_path()
+    path = network_.find_shortest_path(1, 2, cost_type='distance')
+    dist = float(path.split(':')[1].split()[0])
+    assert skims_['distance'][0, 1] == pytest.approx(dist, abs=1e-4)
+
+
+def test_skims_with_conflicting_args(sample_data_dir):
+    pytest.importorskip('numpy')
+
+    network = read_network(input_dir=sample_data_dir)
+
+    with pytest.raises(Exception):
+        compute_skims(network, attrs=['time'])
+
+    with pytest.raises(Exception):
+        compute_skims(network, cost_type='distance', time_dependent=True)
@@ -1,7 +1,18 @@
-from os.path import isfile
+import ctypes
+import struct
+from os.path import isfile, join
 from random import randint
 
+import pytest
+
+from path4gmns.classes import AccessNetwork
 from path4gmns.io import output_agent_paths, read_demand, read_network
+from path4gmns.path import _cdll, backtrace_shortest_paths, \
+                           build_contraction_hierarchy, \
+                           dynamic_multi_source_shortest_path, find_isochrone, \
+                           load_shortest_path_tree, multi_source_isochrones, \
+                           multi_source_shortest_path, single_pair_shortest_path, \
+                           single_source_shortest_path
 
 
 def test_routing_engine(sample_data_dir):
@@ -9,6 +20,15 @@ def test_routing_engine(sample_data_dir):
     network.benchmark_apsp()
 
 
+def test_routing_engine_selection(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    network.benchmark_apsp(engine='dijkstra')
+    network.benchmark_apsp(engine='dial')
+
+    with pytest.raises(Exception):
+        network.find_shortest_path(1, 2, engine='bellman-ford')
+
+
 def test_find_shortest_path(sample_data_dir):
     network = read_network(input_dir=sample_data_dir)
 
@@ -113,3 +133,655 @@ def test_get_shortest_path_tree(sample_data_dir):
     sp_tree_dist['3']
     sp_tree_dist['4']
     sp_tree_dist['5']
+
+
+def test_multi_source_shortest_path(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    orig_node_ids = ['1', '2', '3', '4', '5']
+    sp_trees = multi_source_shortest_path(G, orig_node_ids)
+
+    # batch results shall be identical to those from single-source calls
+    for node_id, (label_costs, _, link_preds) in zip(orig_node_ids, sp_trees):
+        single_source_shortest_path(G, node_id)
+        assert list(label_costs) == list(G.get_node_label_costs())
+        assert list(link_preds) == list(G.get_link_preds())
+
+
+def test_multi_source_shortest_path_multithreading(sample_data_dir, monkeypatch):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    # spread the source nodes over more threads than available cores
+    monkeypatch.setattr('path4gmns.path._thread_num', 4)
+
+    orig_node_ids = [str(i) for i in range(1, 11)]
+    sp_trees = multi_source_shortest_path(G, orig_node_ids)
+
+    for node_id, (label_costs, _, link_preds) in zip(orig_node_ids, sp_trees):
+        single_source_shortest_path(G, node_id)
+        assert list(label_costs) == list(G.get_node_label_costs())
+        assert list(link_preds) == list(G.get_link_preds())
+
+
+@pytest.mark.parametrize('engine', ['mlc', 'ch'])
+def test_multi_source_shortest_path_with_attrs(sample_data_dir, engine):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    orig_node_ids = ['1', '100', '500']
+    node_size = G.get_node_size()
+    sp_trees = multi_source_shortest_path(G, orig_node_ids, 'distance', engine,
+                                          attrs=['time', 'distance'])
+
+    for label_costs, node_preds, link_preds, attr_labels in sp_trees:
+        # distance as the secondary label shall be the same as the label cost
+        dists = list(attr_labels[node_size:])
+        assert dists == pytest.approx(list(label_costs))
+
+        # free-flow travel time along the shortest path
+        for node_no in [0, 99, 499]:
+            time = 0
+            i = node_no
+            while link_preds[i] >= 0:
+                time += G.get_link(link_preds[i]).get_free_flow_travel_time()
+                i = node_preds[i]
+
+            assert attr_labels[node_no] == pytest.approx(time)
+
+    with pytest.raises(Exception):
+        next(multi_source_shortest_path(G, orig_node_ids, attrs=['speed']))
+
+
+@pytest.mark.parametrize('engine', ['dijkstra', 'dial'])
+def test_shortest_path_engines(sample_data_dir, engine):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    # label setting engines shall give the same path costs as MLC
+    for cost_type in ['time', 'distance']:
+        for node_id in ['1', '100', '500']:
+            single_source_shortest_path(G, node_id, cost_type)
+            label_costs = list(G.get_node_label_costs())
+
+            single_source_shortest_path(G, node_id, cost_type, engine)
+            assert list(G.get_node_label_costs()) == pytest.approx(label_costs)
+
+
+def test_find_shortest_path_early_termination(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+
+    for cost_type in ['time', 'distance']:
+        for from_node_id, to_node_id in [(1, 2), (100, 500), (500, 100)]:
+            path = network.find_shortest_path(from_node_id, to_node_id,
+                                              cost_type=cost_type)
+            # the same path cost
+            for engine in ['dijkstra', 'bidirectional', 'astar', 'alt']:
+                path_p2p = network.find_shortest_path(from_node_id, to_node_id,
+                                                      cost_type=cost_type,
+                                                      engine=engine)
+                assert path.split('|')[0] == path_p2p.split('|')[0]
+
+
+def test_astar_heuristic_scale(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    single_pair_shortest_path(G, '100', '500', engine='astar')
+    astar_scales = G.get_graph().astar_scales
+    key, scale = astar_scales[G]
+    assert key == G.get_link_cost_key() and scale > 0
+
+    # the scale follows the link costs
+    link_costs = G.get_link_costs()
+    for i in range(G.get_link_size()):
+        link_costs[i] *= 0.5
+    G.update_link_cost_version()
+
+    single_pair_shortest_path(G, '100', '500', engine='astar')
+    assert astar_scales[G] == (G.get_link_cost_key(), pytest.approx(scale / 2))
+    label_cost = G.get_node_label_cost(G.get_node_no('500'))
+
+    single_source_shortest_path(G, '100')
+    assert label_cost == pytest.approx(G.get_node_label_cost(G.get_node_no('500')))
+
+    G.invalidate_link_costs()
+
+
+def test_backtrace_shortest_paths(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    single_source_shortest_path(G, '1')
+    dest_node_nos = [G.get_node_no(x) for x in ['1', '2', '100', '500']]
+    offsets, links, costs, dists = backtrace_shortest_paths(
+        G,
+        dest_node_nos,
+        G.get_node_label_costs(),
+        G.get_node_preds(),
+        G.get_link_preds()
+    )
+
+    for i, node_no in enumerate(dest_node_nos):
+        link_path = []
+        curr_node_no = node_no
+        while G.get_link_preds()[curr_node_no] >= 0:
+            link_path.append(G.get_link_preds()[curr_node_no])
+            curr_node_no = G.get_node_preds()[curr_node_no]
+
+        assert links[offsets[i]:offsets[i+1]] == link_path
+        assert costs[i] == G.get_node_label_cost(node_no)
+        assert dists[i] == pytest.approx(
+            sum(G.get_link(x).get_length() for x in link_path)
+        )
+
+
+def test_load_shortest_path_tree(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    single_source_shortest_path(G, '1')
+    dest_node_ids = ['1', '2', '100', '500']
+    dest_node_nos = (ctypes.c_int * 4)(*[G.get_node_no(x) for x in dest_node_ids])
+    dest_vols = (ctypes.c_double * 4)(10, 20, 30, 40)
+    link_flows = (ctypes.c_double * G.get_link_size())()
+
+    total_cost = load_shortest_path_tree(G,
+                                         G.get_node_label_costs(),
+                                         G.get_node_preds(),
+                                         G.get_link_preds(),
+                                         dest_node_nos,
+                                         dest_vols,
+                                         link_flows)
+
+    # load each path one by one
+    flows = [0] * G.get_link_size()
+    offsets, links, costs, _ = backtrace_shortest_paths(
+        G,
+        list(dest_node_nos),
+        G.get_node_label_costs(),
+        G.get_node_preds(),
+        G.get_link_preds()
+    )
+
+    cost = 0
+    for i, vol in enumerate(dest_vols):
+        if offsets[i] == offsets[i+1]:
+            continue
+
+        cost += vol * costs[i]
+        for j in links[offsets[i]:offsets[i+1]]:
+            flows[j] += vol
+
+    assert total_cost == pytest.approx(cost)
+    assert list(link_flows) == pytest.approx(flows)
+
+
+def test_landmarks_under_congestion(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    network.build_landmarks()
+
+    G = network._base_assignment.get_network()
+    link_costs = G.get_link_costs()
+    # landmarks from free-flow travel times remain valid for congested ones
+    for i in range(G.get_link_size()):
+        link_costs[i] *= 1 + i % 3
+    G.update_link_cost_version()
+
+    for from_node_id, to_node_id in [('1', '2'), ('100', '500'), ('500', '100')]:
+        single_source_shortest_path(G, from_node_id)
+        path_cost = G.get_path_cost(to_node_id)
+
+        single_pair_shortest_path(G, from_node_id, to_node_id, engine='alt')
+        assert G.get_path_cost(to_node_id) == pytest.approx(path_cost)
+
+    landmarks = G.get_graph().landmarks['time']
+    assert landmarks.checks[G] == (G.get_link_cost_key(), True)
+
+    # fall back to Dijkstra's algorithm once any link cost drops
+    for i in range(G.get_link_size()):
+        link_costs[i] *= 0.25
+    G.update_link_cost_version()
+
+    single_source_shortest_path(G, '100')
+    path_cost = G.get_path_cost('500')
+    single_pair_shortest_path(G, '100', '500', engine='alt')
+    assert G.get_path_cost('500') == pytest.approx(path_cost)
+    assert landmarks.checks[G] == (G.get_link_cost_key(), False)
+
+    G.invalidate_link_costs()
+
+
+def test_contraction_hierarchy(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    network.build_contraction_hierarchy(cost_type='distance',
+                                        input_dir=sample_data_dir)
+    assert isfile(join(sample_data_dir, 'ch_all_distance.bin'))
+
+    # reuse the saved one
+    network = read_network(input_dir=sample_data_dir)
+    network.build_contraction_hierarchy(cost_type='distance',
+                                        input_dir=sample_data_dir)
+
+    for cost_type in ['distance', 'time']:
+        for from_node_id, to_node_id in [(1, 2), (100, 500), (500, 100)]:
+            path = network.find_shortest_path(from_node_id, to_node_id,
+                                              cost_type=cost_type)
+            path_ch = network.find_shortest_path(from_node_id, to_node_id,
+                                                 cost_type=cost_type,
+                                                 engine='ch')
+            assert path.split('|')[0] == path_ch.split('|')[0]
+
+        sp_tree = network.get_shortest_path_tree(1, cost_type=cost_type)
+        sp_tree_ch = network.get_shortest_path_tree(1, cost_type=cost_type,
+                                                    engine='ch')
+        for k, v in sp_tree.items():
+            assert v[0] == pytest.approx(sp_tree_ch[k][0])
+
+
+def test_contraction_hierarchy_with_corrupted_file(sample_data_dir, tmp_path):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+    file_path = str(tmp_path / 'ch.bin')
+    build_contraction_hierarchy(G, 'distance', file_path)
+
+    # the validity is only checked once under the same link costs
+    single_pair_shortest_path(G, '1', '2', 'distance', 'ch')
+    ch = G.get_graph().chs['distance']
+    assert ch.checks[G] == (G.get_link_cost_key(), True)
+    single_pair_shortest_path(G, '100', '500', 'distance', 'ch')
+    assert G.get_graph().chs['distance'] is ch
+
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    header = struct.unpack('6i', data[:24])
+    node_size = header[1]
+    # the first original edge with its head out of range
+    bad_edge = bytearray(data)
+    pos = 24 + 4 * (node_size + 1) + 4
+    bad_edge[pos:pos+4] = struct.pack('i', node_size + 1)
+
+    for corrupted in [
+        struct.pack('6i', header[0], 2**31 - 1, *header[2:5], 2**31 - 1) + data[24:],
+        struct.pack('6i', *header[:5], -1) + data[24:],
+        data[:len(data) // 2],
+        bytes(bad_edge)
+    ]:
+        with open(file_path, 'wb') as f:
+            f.write(corrupted)
+        assert _cdll.load_ch(file_path.encode()) is None
+
+    # the corrupted one is replaced
+    build_contraction_hierarchy(G, 'distance', file_path)
+    with open(file_path, 'rb') as f:
+        assert f.read() == data
+
+
+def test_sp_tree_cache(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    network.set_sp_tree_cache(clear=True)
+
+    path = network.find_shortest_path(1, 200)
+    path_dist = network.find_shortest_path(1, 200, cost_type='distance')
+    # served from the cache
+    assert network.find_shortest_path(1, 200) == path
+    assert network.find_shortest_path(1, 200, cost_type='distance') == path_dist
+
+    info = network.get_sp_tree_cache_info()
+    assert info['hits'] == 2 and info['misses'] == 2 and info['trees'] == 2
+
+    # one tree only
+    network.set_sp_tree_cache(info['memory'] // 2 + 1)
+    assert network.get_sp_tree_cache_info()['trees'] == 1
+    assert network.find_shortest_path(1, 200) == path
+
+    network.set_sp_tree_cache(0, True)
+    assert network.find_shortest_path(1, 200) == path
+    assert network.get_sp_tree_cache_info()['trees'] == 0
+
+    network.set_sp_tree_cache()
+
+
+def test_sp_tree_cache_with_link_cost_updates(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    network.set_sp_tree_cache(clear=True)
+
+    path = network.find_shortest_path(1, 200, seq_type='link')
+    # every engine shares the same cached tree
+    assert network.find_shortest_path(1, 200, seq_type='link',
+                                      engine='dial') == path
+    assert network.get_sp_tree_cache_info()['hits'] == 1
+
+    # block the last link along the path
+    G = network._base_assignment.get_network()
+    link_no = G.get_link_no(path.split(';')[-1])
+    G.get_link_costs()[link_no] = 1e6
+    G.update_link_cost_version()
+    assert network.find_shortest_path(1, 200, seq_type='link') != path
+    assert network.get_sp_tree_cache_info()['misses'] == 2
+
+    network.set_sp_tree_cache(clear=True)
+
+
+def test_resident_link_costs(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+    G.allocate_for_CAPI()
+
+    G.init_link_costs('distance')
+    link_costs_dist = G.get_link_costs()
+    G.init_link_costs('time')
+    link_costs_time = G.get_link_costs()
+
+    # switching cost types does not rebuild link costs
+    G.init_link_costs('distance')
+    assert G.get_link_costs() is link_costs_dist
+    G.init_link_costs('time')
+    assert G.get_link_costs() is link_costs_time
+
+    G.invalidate_link_costs()
+    assert G.get_link_costs() is not link_costs_time
+    assert list(G.get_link_costs()) == list(link_costs_time)
+
+    # the cost type of one network does not affect the others
+    network.set_sp_tree_cache(0, True)
+    nodes = network._base_assignment.get_accessible_nodes(1, 15, 'a', False, 0)
+    network.find_shortest_path(1, 2, cost_type='distance')
+    assert network._base_assignment.get_accessible_nodes(1, 15, 'a', False, 0) == nodes
+
+    network.set_sp_tree_cache()
+
+
+def test_resident_generalized_link_costs(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    A = network._base_assignment
+    G = A.get_network()
+    G.allocate_for_CAPI()
+
+    an = AccessNetwork(G, False)
+    at = A.get_agent_type('a')
+    an.init_link_costs('distance')
+    an.update_generalized_link_cost(at, False, 0)
+    # the generalized link costs count as time
+    assert an.get_cost_type() == 'time'
+    link_costs = an.get_link_costs()
+    cost = link_costs[0]
+
+    # keyed by value of time
+    vot = at.vot
+    at.vot = vot / 2
+    an.update_generalized_link_cost(at, False, 0)
+    assert an.get_link_costs() is not link_costs
+    at.vot = vot
+    an.update_generalized_link_cost(at, False, 0)
+    assert an.get_link_costs() is link_costs
+
+    # rebuilt once any link attribute changes
+    G.get_link(0).toll += 1
+    G.invalidate_link_costs()
+    an.update_generalized_link_cost(at, False, 0)
+    assert an.get_link_costs()[0] == pytest.approx(cost + 60 / vot)
+
+
+def test_get_shortest_path_tree_arrays(sample_data_dir):
+    pytest.importorskip('numpy')
+
+    network = read_network(input_dir=sample_data_dir)
+
+    sp_tree = network.get_shortest_path_tree(1, cost_type='distance')
+    node_ids, label_costs, node_preds, link_preds = (
+        network.get_shortest_path_tree_arrays(1, cost_type='distance')
+    )
+
+    assert len(node_ids) == len(label_costs) == len(node_preds) == len(link_preds)
+    for node_id, label_cost in zip(node_ids, label_costs):
+        if node_id == '1':
+            continue
+
+        assert sp_tree[int(node_id)][0] == pytest.approx(label_cost)
+
+    # the starting node
+    i = list(node_ids).index('1')
+    assert node_preds[i] == -1 and link_preds[i] == -1
+
+
+def test_spnetworks_sharing_topology(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    read_demand(network, input_dir=sample_data_dir)
+
+    A = network._base_assignment
+    A.setup_spnetwork()
+    base = A.get_network()
+
+    for sp in A.get_spnetworks():
+        assert sp.from_node_no_array is base.from_node_no_array
+        assert sp.sorted_link_no_array is base.sorted_link_no_array
+        assert sp.allowed_use_masks is base.allowed_use_masks
+        # each one has its own link costs and labels
+        assert sp.get_link_costs() is not base.get_link_costs()
+        assert sp.get_node_label_costs() is not base.get_node_label_costs()
+
+
+def test_find_shortest_paths(sample_data_dir):
+    pytest.importorskip('numpy')
+
+    network = read_network(input_dir=sample_data_dir)
+
+    od_pairs = [(1, 2), (100, 500), (1, 500), (500, 100), (1, 1)]
+    costs, offsets, links, link_ids = network.find_shortest_paths(od_pairs)
+    assert len(costs) == len(od_pairs) and len(offsets) == len(od_pairs) + 1
+
+    for i, (from_node_id, to_node_id) in enumerate(od_pairs):
+        path = network.find_shortest_path(from_node_id, to_node_id,
+                                          seq_type='link')
+        link_path = ';'.join(link_ids[j] for j in links[offsets[i]:offsets[i+1]])
+        assert path.endswith(f'link path: {link_path}')
+        assert f'{costs[i]:.4f}' in path.split('|')[0]
+
+    with pytest.raises(Exception):
+        network.find_shortest_paths([(1, 'x')])
+
+
+@pytest.mark.parametrize('engine', ['mlc', 'dijkstra', 'dial'])
+def test_reverse_shortest_path_tree(sample_data_dir, engine):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    dest_node_id = '500'
+    dest_node_no = G.get_node_no(dest_node_id)
+    single_source_shortest_path(G, dest_node_id, engine=engine, reverse=True)
+    label_costs = list(G.get_node_label_costs())
+    node_succs = list(G.get_node_preds())
+    link_succs = list(G.get_link_preds())
+
+    for orig_node_id in ['1', '100', '700']:
+        single_source_shortest_path(G, orig_node_id)
+        orig_node_no = G.get_node_no(orig_node_id)
+        assert label_costs[orig_node_no] == pytest.approx(
+            G.get_node_label_costs()[dest_node_no]
+        )
+
+        # the path to dest_node_id along the next links
+        cost = 0
+        i = orig_node_no
+        while link_succs[i] >= 0:
+            cost += G.get_link_costs()[link_succs[i]]
+            i = node_succs[i]
+
+        assert i == dest_node_no
+        assert cost == pytest.approx(label_costs[orig_node_no])
+
+    # one batch call gives the same trees
+    sp_tree = next(multi_source_shortest_path(G, [dest_node_id], engine=engine,
+                                              reverse=True))
+    assert list(sp_tree[0]) == label_costs
+
+    with pytest.raises(Exception):
+        single_source_shortest_path(G, dest_node_id, engine='ch', reverse=True)
+
+
+def test_reverse_accessible_nodes(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    A = network._base_assignment
+
+    node_id, time_budget = '500', 15
+    nodes = A.get_accessible_nodes(node_id, time_budget, 'auto', False, 0,
+                                   reverse=True)
+    assert nodes
+
+    # node_id is accessible from each of them within time_budget
+    for x in nodes[:20]:
+        assert node_id in A.get_accessible_nodes(x, time_budget, 'auto', False, 0)
+
+    links = A.get_accessible_links(node_id, time_budget, 'auto', False, 0,
+                                   reverse=True)
+    assert len(links) == len(nodes)
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_find_isochrone(sample_data_dir, reverse):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    orig_node_id, budget = '500', 10
+    node_nos, link_nos = find_isochrone(G, orig_node_id, budget, reverse=reverse)
+
+    # the same nodes as those within budget on the whole shortest path tree
+    single_source_shortest_path(G, orig_node_id, reverse=reverse)
+    orig_node_no = G.get_node_no(orig_node_id)
+    label_costs = G.get_node_label_costs()
+    assert node_nos == [
+        i for i in range(G.get_node_size())
+        if i != orig_node_no and label_costs[i] <= budget
+    ]
+    assert len(link_nos) == len(node_nos)
+
+    assert find_isochrone(G, orig_node_id, 0, reverse=reverse) == ([], [])
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_multi_source_isochrones(sample_data_dir, reverse):
+    pytest.importorskip('numpy')
+
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    orig_node_ids = [str(x) for x in range(1, 934, 7)]
+    budgets = [10, 5, 15]
+    offsets, counts, nodes, links = multi_source_isochrones(
+        G, orig_node_ids, budgets, reverse=reverse
+    )
+    assert counts.shape == (len(orig_node_ids), len(budgets))
+    assert offsets[-1] == len(nodes) == len(links)
+
+    for i, orig_node_id in enumerate(orig_node_ids):
+        for k, budget in enumerate(budgets):
+            node_nos, link_nos = find_isochrone(G, orig_node_id, budget,
+                                                reverse=reverse)
+            j = offsets[i]
+            assert sorted(nodes[j:j+counts[i, k]]) == node_nos
+
+
+def test_get_isochrones(sample_data_dir):
+    pytest.importorskip('numpy')
+
+    network = read_network(input_dir=sample_data_dir)
+
+    offsets, counts, nodes, links, node_ids, link_ids = network.get_isochrones(
+        [1, 500], [5, 15], 'w'
+    )
+    for i, node_id in enumerate([1, 500]):
+        j = offsets[i]
+        accessible_nodes = network._base_assignment.get_accessible_nodes(
+            node_id, 15, 'w', False, 0
+        )
+        assert sorted(node_ids[x] for x in nodes[j:j+counts[i, 1]]) == \
+               sorted(accessible_nodes)
+
+    with pytest.raises(Exception):
+        network.get_isochrones(['x'], [5])
+
+
+def test_dynamic_multi_source_shortest_path(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    G = network._base_assignment.get_network()
+
+    orig_node_ids = [str(x) for x in range(1, 388)]
+    for _ in dynamic_multi_source_shortest_path(G, orig_node_ids):
+        pass
+
+    # change link costs in place, where most trees are only repaired
+    link_costs = G.get_link_costs()
+    for i in range(0, G.get_link_size(), 997):
+        link_costs[i] *= 2
+    for i in range(1, G.get_link_size(), 1009):
+        link_costs[i] *= 0.5
+    G.update_link_cost_version()
+
+    sp_trees = dynamic_multi_source_shortest_path(G, orig_node_ids)
+    label_costs = [list(x[0]) for x in sp_trees]
+    assert G.dynamic_sp_trees.repaired > 0
+
+    for i, (costs, _, _) in enumerate(
+        multi_source_shortest_path(G, orig_node_ids)
+    ):
+        assert label_costs[i] == pytest.approx(list(costs))
+
+    # the trees under another cost type are rebuilt rather than repaired
+    sp_trees = G.dynamic_sp_trees
+    sp_trees_dist = dynamic_multi_source_shortest_path(G, orig_node_ids,
+                                                       'distance')
+    label_costs = [list(x[0]) for x in sp_trees_dist]
+    assert G.dynamic_sp_trees is not sp_trees
+
+    for i, (costs, _, _) in enumerate(
+        multi_source_shortest_path(G, orig_node_ids, 'distance')
+    ):
+        assert label_costs[i] == pytest.approx(list(costs))
+
+    G.invalidate_link_costs()
+
+
+@pytest.mark.parametrize('node_order', ['rcm', 'hilbert'])
+def test_reorder_nodes(sample_data_dir, node_order):
+    network = read_network(input_dir=sample_data_dir)
+    network_ = read_network(input_dir=sample_data_dir, node_order=node_order)
+    G = network._base_assignment.get_network()
+    G_ = network_._base_assignment.get_network()
+
+    assert G_.map_id_to_no != G.map_id_to_no
+    for node in G_.get_nodes():
+        node_no = node.get_node_no()
+        assert G_.get_nodes()[node_no] is node
+        assert G_.map_no_to_id[node_no] == node.get_node_id()
+        assert G_.map_id_to_no[node.get_node_id()] == node_no
+
+    for link in G_.get_links():
+        assert G_.map_no_to_id[link.from_node_no] == link.from_node_id
+        assert G_.map_no_to_id[link.to_node_no] == link.to_node_id
+
+    # the same label costs by node id
+    for node_id in ['1', '100', '500']:
+        single_source_shortest_path(G, node_id)
+        single_source_shortest_path(G_, node_id)
+        for node in G.get_nodes():
+            i = node.get_node_no()
+            j = G_.get_node_no(node.get_node_id())
+            assert G_.get_node_label_costs()[j] == pytest.approx(
+                G.get_node_label_costs()[i]
+            )
+
+    # centroids still come after all other nodes
+    network_._base_assignment.setup_spnetwork()
+    last_thru_node = G_.get_last_thru_node()
+    assert all(c.get_node_no() >= last_thru_node for c in G_.get_centroids())
+
+    with pytest.raises(Exception):
+        G_.reorder_nodes(node_order)
+
+
+def test_reorder_nodes_with_invalid_order(sample_data_dir):
+    with pytest.raises(Exception):
+        read_network(input_dir=sample_data_dir, node_order='random')
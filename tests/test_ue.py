@@ -1,3 +1,5 @@
+import pytest
+
 from path4gmns.colgen import find_ue
 from path4gmns.fw import find_ue_fw
 from path4gmns.io import load_columns, output_columns,\
@@ -17,6 +19,29 @@ def test_finding_ue(sample_data_dir, tmp_output_dir):
     output_link_performance(network, output_dir=tmp_output_dir)
 
 
+def test_finding_ue_with_dynamic_sp(sample_data_dir):
+    network = read_network(input_dir=sample_data_dir)
+    read_demand(network, input_dir=sample_data_dir)
+
+    rel_gap = find_ue(network, 5, 5, dynamic_sp=True)
+    for spn in network._base_assignment.get_spnetworks():
+        assert spn.dynamic_sp_trees is not None
+
+    network_ = read_network(input_dir=sample_data_dir)
+    read_demand(network_, input_dir=sample_data_dir)
+    assert rel_gap == pytest.approx(find_ue(network_, 5, 5))
+
+    # the repaired trees are exact so that the columns are the same
+    column_pool = network._base_assignment.get_column_pool()
+    column_pool_ = network_._base_assignment.get_column_pool()
+    assert column_pool.keys() == column_pool_.keys()
+    for k, cv in column_pool.items():
+        assert (
+            sorted(col.links for col in cv.get_columns())
+            == sorted(col.links for col in column_pool_[k].get_columns())
+        )
+
+
 def test_finding_ue_with_rel_gap_tolerance(sample_data_dir):
     network = read_network(input_dir=sample_data_dir)
     read_demand(network, input_dir=sample_data_dir)